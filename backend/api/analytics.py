@@ -0,0 +1,37 @@
+"""Generation analytics endpoints."""
+
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.database import get_session
+from backend.schemas.analytics import AnalyticsResponse
+from backend.services.analytics import query_analytics, rebuild_rollups
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/", response_model=AnalyticsResponse)
+async def generation_analytics(
+    granularity: Literal["hour", "day"] = "day",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    variant: str | None = None,
+    language: str | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """Generations, characters, audio and generation time per UTC bucket × variant × language.
+
+    Served from rollups maintained as history is written, so the cost
+    depends on the number of buckets, not generations. ``since`` / ``until``
+    select whole buckets (naive times are UTC); ``rtf`` is generation time per second of audio.
+    """
+    return await query_analytics(session, granularity, since, until, variant, language)
+
+
+@router.post("/rebuild")
+async def rebuild_analytics():
+    """Recompute the rollups from the full history."""
+    return {"ok": True, "generations": await rebuild_rollups()}
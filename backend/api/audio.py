@@ -1,6 +1,8 @@
-"""Audio file serving endpoint."""
+"""Audio file serving endpoints."""
 
-from fastapi import APIRouter
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Response
 from fastapi.responses import FileResponse
 
 from backend.dependencies import get_audio_store
@@ -14,6 +16,31 @@ async def serve_audio(filename: str):
     store = get_audio_store()
     path = store.generated_path(filename)
     if not path.exists():
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Audio file not found")
     return FileResponse(path, media_type="audio/wav", filename=filename)
+
+
+@router.get("/{filename}/peaks")
+async def serve_peaks(filename: str, min_peaks: int | None = Query(None, ge=1)):
+    """Serve precomputed min/max waveform peaks for a generated file.
+
+    Binary format, see ``backend.services.waveform_peaks``. With
+    ``min_peaks`` only the coarsest resolution with at least that many
+    peaks is returned. Peaks missing for older files are computed on demand.
+    """
+    store = get_audio_store()
+    if not store.generated_path(filename).exists():
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    path = store.peaks_path(filename)
+    if not path.exists():
+        await asyncio.get_event_loop().run_in_executor(None, store.write_peaks, filename)
+    data = path.read_bytes()
+    if min_peaks:
+        from backend.services.waveform_peaks import select_level
+
+        data = select_level(data, min_peaks)
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
@@ -0,0 +1,87 @@
+"""Cluster coordination endpoints."""
+
+import hmac
+
+from fastapi import APIRouter, Request
+
+from backend.config import CLUSTER_TOKEN, CLUSTER_WORKERS, COORDINATOR_URL, LOQUI_ROLE
+from backend.dependencies import get_coordinator, get_worker_agent
+from backend.schemas.cluster import ClusterStatusResponse, WorkerHeartbeat
+from backend.services.cluster import CLUSTER_TOKEN_HEADER
+from backend.utils.exceptions import LoquiError
+
+router = APIRouter(prefix="/cluster", tags=["cluster"])
+
+
+def _require_coordinator():
+    coordinator = get_coordinator()
+    if coordinator is None:
+        raise LoquiError("This node is not a coordinator", status_code=409)
+    return coordinator
+
+
+def _check_token(request: Request) -> None:
+    """Require ``X-Loqui-Cluster-Token`` to match ``LOQUI_CLUSTER_TOKEN`` when one is set."""
+    if CLUSTER_TOKEN is None:
+        return
+    token = request.headers.get(CLUSTER_TOKEN_HEADER, "")
+    if not hmac.compare_digest(token.encode(), CLUSTER_TOKEN.encode()):
+        raise LoquiError("Invalid cluster token", status_code=401)
+
+
+def _require_worker_url(request: Request, url: str) -> str:
+    """Authenticate a worker registering or leaving as ``url``.
+
+    Without ``LOQUI_CLUSTER_TOKEN`` nothing can register, so an open port
+    can't redirect generations to an arbitrary host. With
+    ``LOQUI_CLUSTER_WORKERS`` set, only those URLs are accepted.
+    """
+    if CLUSTER_TOKEN is None:
+        raise LoquiError("Worker registration is disabled; set LOQUI_CLUSTER_TOKEN", status_code=403)
+    _check_token(request)
+    url = url.rstrip("/")
+    if CLUSTER_WORKERS and url not in CLUSTER_WORKERS:
+        raise LoquiError(f"{url} is not in LOQUI_CLUSTER_WORKERS", status_code=403)
+    return url
+
+
+@router.post("/workers")
+async def register_worker(heartbeat: WorkerHeartbeat, request: Request):
+    """Register a worker or refresh its state (sent periodically by workers)."""
+    coordinator = _require_coordinator()
+    coordinator.registry.heartbeat(
+        _require_worker_url(request, heartbeat.url),
+        heartbeat.variants,
+        heartbeat.queue_depth,
+        heartbeat.memory_available_bytes,
+    )
+    return {"status": "ok"}
+
+
+@router.delete("/workers")
+async def deregister_worker(url: str, request: Request):
+    """Remove a worker (sent by workers on shutdown)."""
+    coordinator = _require_coordinator()
+    coordinator.registry.remove(_require_worker_url(request, url))
+    return {"status": "ok"}
+
+
+@router.get("/node", response_model=WorkerHeartbeat)
+async def node_state(request: Request):
+    """A worker's heartbeat payload, for coordinators that poll (``LOQUI_CLUSTER_WORKERS``)."""
+    worker = get_worker_agent()
+    if worker is None:
+        raise LoquiError("This node is not a worker", status_code=409)
+    _check_token(request)
+    return worker.payload()
+
+
+@router.get("/status", response_model=ClusterStatusResponse)
+async def cluster_status():
+    """This node's role and, on a coordinator, the registered workers."""
+    coordinator = get_coordinator()
+    return {
+        "role": LOQUI_ROLE,
+        "coordinator_url": COORDINATOR_URL if LOQUI_ROLE == "worker" else None,
+        "workers": coordinator.registry.status() if coordinator else [],
+    }
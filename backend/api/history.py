@@ -1,41 +1,92 @@
 """History endpoints."""
 
-from fastapi import APIRouter, Depends
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.db.database import get_session
-from backend.dependencies import get_history_service
+from backend.dependencies import get_audio_store, get_history_service
 from backend.schemas.history import HistoryEntryResponse, HistoryListResponse
+from backend.services.history_archive import export_history, import_history
 from backend.utils.exceptions import HistoryNotFoundError
+from backend.utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/history", tags=["history"])
 
+# Columns returned as is, and fields derived from audio_filename
+_COLUMN_FIELDS = [f for f in HistoryEntryResponse.model_fields if f not in ("audio_url", "peaks_url")]
+_URL_FIELDS = ("audio_url", "peaks_url")
+
 
 @router.get("/", response_model=HistoryListResponse)
 async def list_history(
     limit: int = 50,
     offset: int = 0,
+    fields: str | None = None,
+    text_limit: int | None = Query(None, ge=1),
     session: AsyncSession = Depends(get_session),
 ):
-    """List generation history (newest first)."""
+    """List generation history (newest first).
+
+    ``fields`` (comma-separated, e.g. ``id,created_at,duration_seconds``)
+    returns only those fields; ``text_limit`` truncates ``text``. Rows are
+    read as plain dicts and serialized in one pass.
+    """
+    wanted = fields.split(",") if fields else [*_COLUMN_FIELDS, *_URL_FIELDS]
+    unknown = [f for f in wanted if f not in _COLUMN_FIELDS and f not in _URL_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    columns = [f for f in wanted if f in _COLUMN_FIELDS]
+    urls = [f for f in wanted if f in _URL_FIELDS]
     svc = get_history_service()
-    records, total = await svc.list(session, limit=limit, offset=offset)
-    items = [
-        HistoryEntryResponse(
-            id=r.id,
-            text=r.text,
-            model_variant=r.model_variant,
-            language=r.language,
-            exaggeration=r.exaggeration,
-            cfg_weight=r.cfg_weight,
-            duration_seconds=r.duration_seconds,
-            generation_time_seconds=r.generation_time_seconds,
-            audio_url=f"/api/audio/{r.audio_filename}",
-            created_at=r.created_at,
-        )
-        for r in records
-    ]
-    return HistoryListResponse(items=items, total=total)
+    rows, total = await svc.list_columns(
+        session,
+        columns + ["audio_filename"] if urls else columns,
+        limit=limit,
+        offset=offset,
+        text_limit=text_limit,
+    )
+    if urls:
+        for row in rows:
+            filename = row.pop("audio_filename")
+            if "audio_url" in urls:
+                row["audio_url"] = f"/api/audio/{filename}"
+            if "peaks_url" in urls:
+                row["peaks_url"] = f"/api/audio/{filename}/peaks"
+    return FastJSONResponse({"items": rows, "total": total})
+
+
+@router.get("/export")
+async def export_history_archive():
+    """Stream all history, with its generated and reference audio, as a tar archive.
+
+    The archive is produced incrementally: records are read in batches and
+    audio files in chunks, so memory use doesn't grow with history size.
+    """
+    filename = f"loqui-history-{datetime.now():%Y%m%d-%H%M%S}.tar"
+    return StreamingResponse(
+        export_history(get_audio_store()),
+        media_type="application/x-tar",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import")
+async def import_history_archive(request: Request):
+    """Ingest an archive from ``/history/export``, sent as the raw request body.
+
+    The body is parsed as it arrives and committed in batches. Records whose
+    id already exists are skipped, as are audio files already on disk, so
+    re-running an interrupted import is safe.
+    """
+    try:
+        stats = await import_history(request.stream(), get_audio_store())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"ok": True, **stats}
 
 
 @router.delete("/{record_id}")
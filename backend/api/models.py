@@ -1,22 +1,35 @@
 """Model management endpoints."""
 
-import os
-import signal
-
 from fastapi import APIRouter, BackgroundTasks
 
-from backend.dependencies import get_model_manager
+from backend.config import HOST_MODELS
+from backend.dependencies import get_coordinator, get_drain_controller, get_model_manager, get_quality_router
 from backend.schemas.models import DeviceInfoResponse, ModelStatusResponse
 from backend.services.device_detector import detect_device
+from backend.utils.exceptions import LoquiError
+from backend.utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/models", tags=["models"])
 
 
 @router.get("/", response_model=list[ModelStatusResponse])
 async def list_models():
-    """List all model variant statuses."""
+    """List all model variant statuses (polled by the UI).
+
+    On a coordinator, variants its workers host count as loaded, and
+    without a local model the one requests default to is active.
+    """
     mm = get_model_manager()
-    return mm.get_all_statuses()
+    statuses = mm.get_all_statuses()
+    if coordinator := get_coordinator():
+        remote = coordinator.registry.resident_variants()
+        preferred = get_quality_router().preferred()
+        for status in statuses:
+            if status["variant"] in remote:
+                status["status"] = "loaded"
+            if mm.get_loaded_variant() is None:
+                status["active"] = status["variant"] == preferred and preferred in remote
+    return FastJSONResponse(statuses)
 
 
 @router.get("/device", response_model=DeviceInfoResponse)
@@ -27,17 +40,34 @@ async def get_device():
 
 @router.post("/{variant}/load", response_model=ModelStatusResponse)
 async def load_model(variant: str, background_tasks: BackgroundTasks):
-    """Download (if needed) and load a model variant."""
+    """Download (if needed), load and switch to a model variant.
+
+    Runs in the background; the currently active variant keeps serving
+    until the new one is loaded and warmed. Refused with 503 while the
+    system is under memory pressure.
+    """
     mm = get_model_manager()
     if variant not in mm.VARIANTS:
-        from backend.utils.exceptions import LoquiError
         raise LoquiError(f"Unknown variant: {variant}", status_code=404)
+    if not HOST_MODELS:
+        coordinator = get_coordinator()
+        if coordinator and variant in coordinator.registry.resident_variants():
+            return {**mm.get_status(variant), "status": "loaded"}
+        raise LoquiError(f"No worker hosts {variant}; this process doesn't load models", status_code=409)
+    if variant not in mm.resident_variants():
+        mm.check_memory(variant)
     background_tasks.add_task(mm.download_and_load, variant)
     return mm.get_status(variant)
 
 
 @router.post("/shutdown")
-async def shutdown_server():
-    """Gracefully shut down the server."""
-    os.kill(os.getpid(), signal.SIGINT)
-    return {"status": "shutting_down"}
+async def shutdown_server(background_tasks: BackgroundTasks):
+    """Gracefully shut down the server.
+
+    New generations are refused right away; the server exits once the
+    in-flight ones have finished (or the grace period has passed).
+    """
+    drain = get_drain_controller()
+    drain.drain()
+    background_tasks.add_task(drain.shutdown)
+    return {"status": "draining", "in_flight": drain.in_flight}
@@ -0,0 +1,177 @@
+"""Long-form project endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.database import get_session
+from backend.db.models import Project
+from backend.dependencies import (
+    generation_slot,
+    get_job_registry,
+    get_project_service,
+    get_quality_router,
+    get_rate_limiter,
+)
+from backend.schemas.projects import (
+    ProjectCreateRequest,
+    ProjectRenderResponse,
+    ProjectResponse,
+    ProjectSegmentResponse,
+    ProjectSummaryResponse,
+    ProjectUpdateRequest,
+)
+from backend.services.project_service import split_paragraphs
+from backend.utils.cancellation import GenerationCancelled, GenerationLimitExceeded
+from backend.utils.exceptions import (
+    GenerationCancelledError,
+    GenerationLimitError,
+    LoquiError,
+    ModelNotLoadedError,
+    ProjectNotFoundError,
+)
+
+router = APIRouter(prefix="/projects", tags=["projects"])
+
+
+def _audio_url(project: Project) -> str | None:
+    return f"/api/audio/{project.audio_filename}" if project.audio_filename else None
+
+
+async def _load(session: AsyncSession, project_id: str) -> Project:
+    project = await get_project_service().get(session, project_id)
+    if project is None:
+        raise ProjectNotFoundError(project_id)
+    return project
+
+
+async def _response(session: AsyncSession, project: Project, **extra):
+    segments = await get_project_service().segments(session, project.id)
+    cls = ProjectRenderResponse if extra else ProjectResponse
+    return cls(
+        id=project.id,
+        name=project.name,
+        model_variant=project.model_variant,
+        language=project.language,
+        exaggeration=project.exaggeration,
+        cfg_weight=project.cfg_weight,
+        temperature=project.temperature,
+        speed=project.speed,
+        reference_filename=project.reference_filename,
+        audio_url=_audio_url(project),
+        duration_seconds=project.duration_seconds,
+        segments=[
+            ProjectSegmentResponse(
+                id=s.id,
+                position=s.position,
+                text=s.text,
+                rendered=s.chunk_key is not None,
+                duration_seconds=s.duration_seconds,
+            )
+            for s in segments
+        ],
+        created_at=project.created_at,
+        updated_at=project.updated_at,
+        **extra,
+    )
+
+
+@router.post("/", response_model=ProjectResponse)
+async def create_project(body: ProjectCreateRequest, session: AsyncSession = Depends(get_session)):
+    """Create a project from a document (split on blank lines) or a list of segments."""
+    fields = body.model_dump(exclude={"text", "segments"}, exclude_none=True)
+    fields.setdefault("model_variant", get_quality_router().preferred())
+    texts = body.segments if body.segments is not None else split_paragraphs(body.text)
+    try:
+        project = await get_project_service().create(session, texts, **fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await _response(session, project)
+
+
+@router.get("/", response_model=list[ProjectSummaryResponse])
+async def list_projects(session: AsyncSession = Depends(get_session)):
+    """List projects (most recently updated first)."""
+    return [
+        ProjectSummaryResponse(
+            id=p.id,
+            name=p.name,
+            model_variant=p.model_variant,
+            audio_url=_audio_url(p),
+            duration_seconds=p.duration_seconds,
+            updated_at=p.updated_at,
+        )
+        for p in await get_project_service().list(session)
+    ]
+
+
+@router.get("/{project_id}", response_model=ProjectResponse)
+async def get_project(project_id: str, session: AsyncSession = Depends(get_session)):
+    return await _response(session, await _load(session, project_id))
+
+
+@router.patch("/{project_id}", response_model=ProjectResponse)
+async def update_project(
+    project_id: str, body: ProjectUpdateRequest, session: AsyncSession = Depends(get_session),
+):
+    """Edit a project's text or settings.
+
+    Segments whose text is unchanged keep their rendered audio; changing a
+    voice or generation setting marks every segment for re-rendering.
+    """
+    project = await _load(session, project_id)
+    fields = body.model_dump(exclude={"text", "segments"}, exclude_none=True)
+    texts = body.segments
+    if body.text is not None:
+        texts = split_paragraphs(body.text)
+    try:
+        project = await get_project_service().update(session, project, texts, **fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await _response(session, project)
+
+
+@router.post("/{project_id}/render", response_model=ProjectRenderResponse, dependencies=[Depends(generation_slot)])
+async def render_project(project_id: str, request: Request, session: AsyncSession = Depends(get_session)):
+    """Render segments that changed since the last render and re-assemble the audio.
+
+    Runs as a job: progress is published as ``job_progress`` events and it
+    can be cancelled via ``POST /tts/jobs/{job_id}/cancel``. Segments that
+    finished before a cancel or failure are kept.
+
+    Counts against the client's rate limit as one request plus the text of
+    the segments still to render.
+    """
+    project = await _load(session, project_id)
+    pending = await get_project_service().segments(session, project.id)
+    limiter = get_rate_limiter()
+    limiter.acquire(limiter.client_id(request), sum(len(s.text) for s in pending if not s.chunk_key))
+    jobs = get_job_registry()
+    job = jobs.start(project.model_variant)
+    outcome = "failed"
+    try:
+        stats = await get_project_service().render(session, project, cancel=job.token, job_id=job.id)
+        outcome = "completed"
+    except GenerationCancelled:
+        outcome = "cancelled"
+        raise GenerationCancelledError(job.id)
+    except GenerationLimitExceeded as e:
+        jobs.record_limit(e.limit)
+        raise GenerationLimitError(e.limit, str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except RuntimeError as e:
+        if "not loaded" in str(e):
+            raise ModelNotLoadedError(project.model_variant)
+        if "already rendering" in str(e):
+            raise LoquiError(str(e), status_code=409)
+        raise
+    finally:
+        jobs.finish(job, outcome)
+    return await _response(session, project, job_id=job.id, **stats)
+
+
+@router.delete("/{project_id}")
+async def delete_project(project_id: str, session: AsyncSession = Depends(get_session)):
+    """Delete a project and audio no other project uses."""
+    await get_project_service().delete(session, await _load(session, project_id))
+    return {"ok": True}
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from backend.api import audio, history, models, system, tts
+from backend.api import analytics, audio, cluster, history, models, projects, system, tts
 from backend.dependencies import get_ws_manager
 
 api_router = APIRouter(prefix="/api")
@@ -10,16 +10,21 @@ api_router = APIRouter(prefix="/api")
 api_router.include_router(models.router)
 api_router.include_router(tts.router)
 api_router.include_router(history.router)
+api_router.include_router(analytics.router)
+api_router.include_router(projects.router)
 api_router.include_router(audio.router)
 api_router.include_router(system.router)
+api_router.include_router(cluster.router)
 
 
 @api_router.websocket("/ws")
-async def websocket_endpoint(ws: WebSocket):
+async def websocket_endpoint(ws: WebSocket, topics: str | None = None):
     manager = get_ws_manager()
-    await manager.connect(ws)
+    await manager.connect(ws, set(topics.split(",")) if topics else None)
     try:
         while True:
-            await ws.receive_text()
+            manager.handle_message(ws, await ws.receive_text())
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(ws)
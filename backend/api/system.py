@@ -1,140 +1,50 @@
-"""System information endpoint."""
+"""System information endpoints."""
 
-import os
-import platform
-import subprocess
-import sys
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
 
-import psutil
-from fastapi import APIRouter
-
-from backend.dependencies import get_model_manager
+from backend.config import SYSTEM_READY_TIMEOUT
+from backend.dependencies import get_drain_controller, get_model_manager, get_system_monitor
+from backend.utils.exceptions import LoquiError
+from backend.utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/system", tags=["system"])
 
 
-def _get_chip_name() -> str:
-    """Get Apple Silicon chip name via sysctl."""
-    try:
-        result = subprocess.run(
-            ["sysctl", "-n", "machdep.cpu.brand_string"],
-            capture_output=True, text=True, timeout=2,
-        )
-        return result.stdout.strip() or "Apple Silicon"
-    except Exception:
-        return "Apple Silicon"
-
-
-def _get_gpu_cores() -> int | None:
-    """Get GPU core count from system_profiler."""
-    try:
-        result = subprocess.run(
-            ["system_profiler", "SPDisplaysDataType"],
-            capture_output=True, text=True, timeout=5,
-        )
-        for line in result.stdout.splitlines():
-            if "Total Number of Cores" in line:
-                return int(line.split(":")[-1].strip())
-    except Exception:
-        pass
-    return None
+@router.get("/health")
+async def health():
+    """Liveness check. Served before the ML runtime has finished importing."""
+    mm = get_model_manager()
+    return {
+        "status": "ok",
+        "runtime": "ready" if mm.runtime_ready else "loading",
+        "loaded_variant": mm.get_loaded_variant(),
+    }
 
 
-def _get_neural_engine_cores() -> int | None:
-    """Estimate Neural Engine cores based on chip."""
-    chip = _get_chip_name().lower()
-    if "m4" in chip:
-        return 16
-    if "m3" in chip or "m2" in chip:
-        return 16
-    if "m1" in chip:
-        return 16
-    return None
+@router.get("/ready")
+async def readiness():
+    """Readiness check: 503 once the server is draining for shutdown."""
+    status = get_drain_controller().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
 
 
 @router.get("/info")
 async def get_system_info():
-    """Return comprehensive system information."""
-    import mlx.core as mx
-
-    # CPU
-    cpu_count_physical = psutil.cpu_count(logical=False) or 0
-    cpu_count_logical = psutil.cpu_count(logical=True) or 0
-    cpu_freq = psutil.cpu_freq()
-    cpu_percent = psutil.cpu_percent(interval=0.1)
-
-    # Memory
-    mem = psutil.virtual_memory()
-
-    # Disk
-    disk = psutil.disk_usage("/")
-
-    # GPU / Metal
-    gpu_cores = _get_gpu_cores()
-    neural_cores = _get_neural_engine_cores()
-
-    # MLX memory (prefer new API, fall back to deprecated)
-    try:
-        metal_active = mx.get_active_memory() / (1024 ** 3)
-        metal_peak = mx.get_peak_memory() / (1024 ** 3)
-        metal_cache = mx.get_cache_memory() / (1024 ** 3)
-    except AttributeError:
-        try:
-            metal_active = mx.metal.get_active_memory() / (1024 ** 3)
-            metal_peak = mx.metal.get_peak_memory() / (1024 ** 3)
-            metal_cache = mx.metal.get_cache_memory() / (1024 ** 3)
-        except Exception:
-            metal_active = metal_peak = metal_cache = 0
-
-    # Software versions
-    try:
-        import mlx_audio
-        mlx_audio_version = getattr(mlx_audio, "__version__", "unknown")
-    except Exception:
-        mlx_audio_version = "unknown"
-
-    try:
-        mlx_version = mx.__version__
-    except Exception:
-        mlx_version = "unknown"
-
-    # Loaded model
-    mm = get_model_manager()
-    loaded_variant = mm.get_loaded_variant()
-
-    return {
-        "chip": _get_chip_name(),
-        "os": f"macOS {platform.mac_ver()[0]}",
-        "cpu": {
-            "cores_physical": cpu_count_physical,
-            "cores_logical": cpu_count_logical,
-            "frequency_mhz": round(cpu_freq.current) if cpu_freq else None,
-            "usage_percent": cpu_percent,
-        },
-        "memory": {
-            "total_gb": round(mem.total / (1024 ** 3), 1),
-            "available_gb": round(mem.available / (1024 ** 3), 1),
-            "used_gb": round(mem.used / (1024 ** 3), 1),
-            "percent": mem.percent,
-        },
-        "gpu": {
-            "cores": gpu_cores,
-            "neural_engine_cores": neural_cores,
-            "metal_active_gb": round(metal_active, 2),
-            "metal_peak_gb": round(metal_peak, 2),
-            "metal_cache_gb": round(metal_cache, 2),
-        },
-        "disk": {
-            "total_gb": round(disk.total / (1024 ** 3), 1),
-            "free_gb": round(disk.free / (1024 ** 3), 1),
-            "percent": disk.percent,
-        },
-        "software": {
-            "python": platform.python_version(),
-            "mlx": mlx_version,
-            "mlx_audio": mlx_audio_version,
-        },
-        "model": {
-            "loaded_variant": loaded_variant,
-        },
-    }
+    """Return comprehensive system information from the latest sample.
+
+    503 if no sample has been taken within ``SYSTEM_READY_TIMEOUT`` seconds.
+    """
+    monitor = get_system_monitor()
+    if not await monitor.wait_ready(SYSTEM_READY_TIMEOUT):
+        raise LoquiError("System stats are not available yet", 503, {"Retry-After": "5"})
+    info = monitor.snapshot()
+    info["model"] = {"loaded_variant": get_model_manager().get_loaded_variant()}
+    return FastJSONResponse(info)
+
+
+@router.get("/history")
+async def get_system_history(limit: int | None = Query(None, ge=1)):
+    """Return sampled CPU / memory / MLX stats for charting (oldest first)."""
+    monitor = get_system_monitor()
+    return FastJSONResponse({"interval_seconds": monitor.interval, "samples": monitor.history(limit)})
@@ -1,80 +1,312 @@
 """TTS generation endpoint."""
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+import asyncio
+import time
+from typing import Literal
+
+import aiofiles
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.config import (
+    DEFAULT_GENERATION_DEADLINE_SECONDS,
+    DEFAULT_ON_LIMIT,
+    DEFAULT_OUTPUT_PROFILE,
+    DISCONNECT_POLL_INTERVAL,
+    HOST_MODELS,
+    MAX_GENERATION_DEADLINE_SECONDS,
+    MAX_SPEED,
+    MIN_SPEED,
+    POSTPROCESS_ENABLED,
+    REFERENCE_MAX_SECONDS,
+    TARGET_LOUDNESS_LUFS,
+    is_qwen_variant,
+)
 from backend.db.database import get_session
-from backend.dependencies import get_audio_store, get_history_service, get_tts_engine
+from backend.dependencies import (
+    generation_slot,
+    get_audio_store,
+    get_coordinator,
+    get_history_service,
+    get_job_registry,
+    get_quality_router,
+    get_rate_limiter,
+    get_tts_engine,
+)
 from backend.schemas.tts import GenerateResponse
-from backend.utils.exceptions import ModelNotLoadedError
+from backend.services.jobs import Job
+from backend.utils.cancellation import GenerationCancelled, GenerationLimitExceeded
+from backend.utils.exceptions import (
+    GenerationCancelledError,
+    GenerationLimitError,
+    LoquiError,
+    ModelNotLoadedError,
+)
 
 router = APIRouter(prefix="/tts", tags=["tts"])
 
 
-@router.post("/generate", response_model=GenerateResponse)
+async def _cancel_on_disconnect(request: Request, job: Job):
+    """Cancel ``job`` if the client goes away before it finishes."""
+    while not job.token.cancelled:
+        if await request.is_disconnected():
+            job.token.cancel("client_disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+@router.post(
+    "/generate",
+    response_model=GenerateResponse,
+    responses={200: {"content": {"audio/wav": {}}}},
+    dependencies=[Depends(generation_slot)],
+)
 async def generate_speech(
+    request: Request,
     text: str = Form(...),
-    variant: str = Form("turbo-4bit"),
+    variant: str | None = Form(None),
     language: str | None = Form(None),
     exaggeration: float = Form(0.5),
     cfg_weight: float = Form(0.5),
     temperature: float = Form(0.8),
-    speed: float = Form(1.0),
+    speed: float = Form(1.0, ge=MIN_SPEED, le=MAX_SPEED),
     ref_text: str | None = Form(None),
+    use_phrase_cache: bool = Form(False),
+    return_mode: Literal["json", "inline"] = Form("json", alias="return"),
+    persist: bool | None = Form(None),
+    output_profile: str = Form(DEFAULT_OUTPUT_PROFILE),
+    postprocess: bool = Form(POSTPROCESS_ENABLED),
+    target_lufs: float = Form(TARGET_LOUDNESS_LUFS, ge=-40.0, le=-5.0),
+    job_id: str | None = Form(None),
+    deadline_seconds: float = Form(DEFAULT_GENERATION_DEADLINE_SECONDS, gt=0, le=MAX_GENERATION_DEADLINE_SECONDS),
+    on_limit: Literal["error", "partial"] = Form(DEFAULT_ON_LIMIT),
     reference_audio: UploadFile | None = File(None),
     session: AsyncSession = Depends(get_session),
 ):
-    """Generate speech from text."""
+    """Generate speech from text.
+
+    ``return=inline`` responds with the WAV bytes directly (metadata in
+    ``X-Loqui-*`` headers) and, unless ``persist=true``, skips the disk
+    write and history entry entirely.
+
+    On a coordinator the request runs on the least-loaded worker that has
+    ``variant`` loaded; audio and history are stored here. Without a
+    ``variant`` the currently active one is used. ``variant=auto`` uses it
+    too, unless the latency SLO is at risk: then a faster resident variant
+    of the same family serves the request. ``model_variant`` reports the
+    variant that ran, ``requested_variant`` the one asked for.
+
+    Each request runs as a job (``job_id``, generated if not given) that
+    is cancelled when the client disconnects or via
+    ``POST /tts/jobs/{job_id}/cancel``; cancelled work is not persisted.
+
+    Generation is bounded by ``deadline_seconds`` and by a maximum audio
+    length per input character (runaway output). On a breach
+    ``on_limit=error`` fails with 504 (deadline) or 422 (length);
+    ``on_limit=partial`` returns the audio so far and reports the limit in
+    ``limit_reached``.
+
+    Requests and characters are rate limited per API key (``X-API-Key``)
+    or client address; over the limit the request fails with 429 and a
+    ``Retry-After`` header. While the server drains for shutdown, new
+    requests fail with 503.
+    """
+    limiter = get_rate_limiter()
+    limiter.acquire(limiter.client_id(request), len(text))
+
+    quality = get_quality_router()
+    requested_variant = variant
+    variant = quality.resolve(variant)
+    inline = return_mode == "inline"
+    persist = True if not inline else bool(persist)
+
     engine = get_tts_engine()
     audio_store = get_audio_store()
     history = get_history_service()
 
     ref_filename = None
+    reference = None
     if reference_audio and reference_audio.filename:
         data = await reference_audio.read()
-        ref_filename = await audio_store.save_reference(data, reference_audio.filename)
+        # A transcript (ref_text) must match the whole clip, so don't shorten it
+        family = "qwen" if is_qwen_variant(variant) else "turbo"
+        max_seconds = None if ref_text else REFERENCE_MAX_SECONDS[family]
+        ref_filename = await audio_store.save_reference(data, reference_audio.filename, max_seconds)
+        if get_coordinator():
+            # Workers get the canonical clip rather than the original upload
+            async with aiofiles.open(audio_store.reference_path(ref_filename), "rb") as f:
+                data = await f.read()
+        reference = (reference_audio.filename, data)
+    # Without a history entry nothing refers to the stored clip afterwards
+    discard_reference = ref_filename is not None and not persist
+
+    params = dict(
+        text=text,
+        language=language,
+        exaggeration=exaggeration,
+        cfg_weight=cfg_weight,
+        temperature=temperature,
+        speed=speed,
+        ref_text=ref_text,
+        use_phrase_cache=use_phrase_cache,
+        output_profile=output_profile,
+        postprocess=postprocess,
+        target_lufs=target_lufs,
+        deadline_seconds=deadline_seconds,
+        on_limit=on_limit,
+    )
 
+    jobs = get_job_registry()
     try:
-        result = await engine.generate(
-            text=text,
-            variant=variant,
-            language=language,
-            exaggeration=exaggeration,
-            cfg_weight=cfg_weight,
-            temperature=temperature,
-            speed=speed,
-            reference_audio_path=ref_filename,
-            ref_text=ref_text,
-        )
+        job = jobs.start(variant, job_id)
+    except ValueError as e:
+        if discard_reference:
+            await audio_store.delete_reference(ref_filename)
+        raise LoquiError(str(e), status_code=409)
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, job))
+
+    outcome = "failed"
+    latency = None
+    started = time.monotonic()
+    handed_off = False  # the engine deletes a discarded reference once it's done with it
+    quality.begin()
+    try:
+        result = None
+        if coordinator := get_coordinator():
+            result = await coordinator.generate(
+                variant, params, reference, persist=persist, inline=inline, cancel=job.token,
+            )
+        if result is None:
+            if not HOST_MODELS:
+                raise LoquiError(f"No worker hosts {variant}", status_code=503)
+            handed_off = True
+            result = await engine.generate(
+                variant=variant,
+                reference_audio_path=ref_filename,
+                persist=persist,
+                inline=inline,
+                cancel=job.token,
+                discard_reference=discard_reference,
+                **params,
+            )
+        outcome = "completed"
+        latency = time.monotonic() - started
+        if result.limit_reached:
+            jobs.record_limit(result.limit_reached)
+    except GenerationCancelled:
+        outcome = "cancelled"
+        raise GenerationCancelledError(job.id)
+    except GenerationLimitExceeded as e:
+        # Counts as slow: a breached deadline is what the SLO guards against
+        latency = time.monotonic() - started
+        jobs.record_limit(e.limit)
+        raise GenerationLimitError(e.limit, str(e))
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except RuntimeError as e:
         if "not loaded" in str(e):
             raise ModelNotLoadedError(variant)
         raise
+    finally:
+        watcher.cancel()
+        quality.end(latency)
+        jobs.finish(job, outcome)
+        if discard_reference and not handed_off:
+            await audio_store.delete_reference(ref_filename)
 
-    record = await history.create(
-        session,
-        text=text,
-        model_variant=variant,
-        language=language,
-        exaggeration=exaggeration,
-        cfg_weight=cfg_weight,
-        temperature=temperature,
-        duration_seconds=result.duration_seconds,
-        generation_time_seconds=result.generation_time_seconds,
-        audio_filename=result.audio_filename,
-        reference_filename=ref_filename,
-        sample_rate=result.sample_rate,
-    )
+    record = None
+    if persist:
+        record = await history.create(
+            session,
+            text=text,
+            model_variant=variant,
+            requested_variant=requested_variant,
+            language=language,
+            exaggeration=exaggeration,
+            cfg_weight=cfg_weight,
+            temperature=temperature,
+            duration_seconds=result.duration_seconds,
+            generation_time_seconds=result.generation_time_seconds,
+            audio_filename=result.audio_filename,
+            reference_filename=ref_filename,
+            sample_rate=result.sample_rate,
+            audio_format=result.audio_format,
+        )
+
+    if inline:
+        headers = {
+            "X-Loqui-Model-Variant": variant,
+            "X-Loqui-Requested-Variant": requested_variant or variant,
+            "X-Loqui-Job-Id": job.id,
+            "X-Loqui-Duration-Seconds": str(result.duration_seconds),
+            "X-Loqui-Generation-Time-Seconds": str(result.generation_time_seconds),
+            "X-Loqui-Sample-Rate": str(result.sample_rate),
+            "X-Loqui-Audio-Format": result.audio_format,
+        }
+        if result.cache_hit_ratio is not None:
+            headers["X-Loqui-Cache-Hit-Ratio"] = str(result.cache_hit_ratio)
+        if result.worker:
+            headers["X-Loqui-Worker"] = result.worker
+        if result.postprocess_ms:
+            headers["X-Loqui-Postprocess-Ms"] = ",".join(f"{k}={v}" for k, v in result.postprocess_ms.items())
+        if result.limit_reached:
+            headers["X-Loqui-Limit-Reached"] = result.limit_reached
+        if record:
+            headers["X-Loqui-Id"] = record.id
+            headers["X-Loqui-Audio-Url"] = f"/api/audio/{result.audio_filename}"
+        return Response(content=result.audio_bytes, media_type="audio/wav", headers=headers)
 
     return GenerateResponse(
         id=record.id,
+        job_id=job.id,
         audio_url=f"/api/audio/{result.audio_filename}",
+        peaks_url=f"/api/audio/{result.audio_filename}/peaks",
         text=text,
         model_variant=variant,
+        requested_variant=requested_variant,
         language=language,
         duration_seconds=result.duration_seconds,
         generation_time_seconds=result.generation_time_seconds,
         sample_rate=result.sample_rate,
+        audio_format=result.audio_format,
+        segments_total=result.segments_total,
+        segments_cached=result.segments_cached,
+        cache_hit_ratio=result.cache_hit_ratio,
+        postprocess_ms=result.postprocess_ms,
+        limit_reached=result.limit_reached,
     )
+
+
+@router.get("/jobs")
+async def list_jobs():
+    """Generations currently in flight."""
+    return get_job_registry().active()
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel an in-flight generation. It stops at the model's next yield."""
+    if not get_job_registry().cancel(job_id):
+        raise LoquiError(f"Job '{job_id}' is not running", status_code=404)
+    return {"job_id": job_id, "status": "cancelling"}
+
+
+@router.get("/usage")
+async def client_usage(session: AsyncSession = Depends(get_session)):
+    """Cumulative requests, characters and rate-limit rejections per client."""
+    return await get_rate_limiter().usage(session)
+
+
+@router.get("/metrics")
+async def generation_metrics():
+    """Counts of started / completed / failed / cancelled generations and limit breaches.
+
+    ``coalesced`` counts requests that were served by an identical
+    concurrent request's generation instead of running their own;
+    ``auto_variant`` shows the current ``variant=auto`` tier and latency.
+    """
+    return {
+        **get_job_registry().metrics(),
+        "coalesced": get_tts_engine().coalesced,
+        "auto_variant": get_quality_router().status(),
+    }
@@ -1,36 +1,188 @@
-"""WebSocket manager for progress events."""
+"""WebSocket manager for progress events.
+
+Publishing never awaits a socket: ``publish`` appends to a shared outbox in
+O(1) and a single dispatcher task fans messages out to per-connection queues.
+Each connection has its own writer task, so a stalled browser tab only ever
+delays itself.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import Any
+from collections import OrderedDict, deque
+from itertools import count
+from typing import Any, Callable, Hashable
 
 from fastapi import WebSocket
 
+from backend.config import WS_QUEUE_SIZE, WS_SEND_TIMEOUT
+
 logger = logging.getLogger(__name__)
 
+# Topic each event is delivered under. Clients subscribe to topics.
+EVENT_TOPICS: dict[str, str] = {
+    "model_status": "models",
+    "download_progress": "models",
+    "job_status": "jobs",
+    "job_progress": "jobs",
+    "system_stats": "system",
+}
+TOPICS = frozenset(EVENT_TOPICS.values())
+
+# High-frequency events where only the latest value per subject matters.
+COALESCED_EVENTS = frozenset({"download_progress", "job_progress", "system_stats"})
+
+
+def _coalesce_key(message: dict[str, Any]) -> Hashable | None:
+    event = message.get("event")
+    if event not in COALESCED_EVENTS:
+        return None
+    return (event, message.get("variant"), message.get("job_id"))
+
+
+class _Client:
+    """A connection with a bounded, coalescing outbound queue."""
+
+    def __init__(self, ws: WebSocket, topics: set[str]):
+        self.ws = ws
+        self.topics = topics
+        self.task: asyncio.Task | None = None
+        self._pending: OrderedDict[Hashable, str] = OrderedDict()
+        self._seq = count()
+        self._wakeup = asyncio.Event()
+
+    def enqueue(self, key: Hashable | None, data: str) -> bool:
+        """Queue a message. Returns False if the client is too far behind."""
+        if key is not None and key in self._pending:
+            # Replace in place: the client only ever sees the latest value.
+            self._pending[key] = data
+            return True
+        if len(self._pending) >= WS_QUEUE_SIZE:
+            return False
+        self._pending[next(self._seq) if key is None else key] = data
+        self._wakeup.set()
+        return True
+
+    async def run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                _, data = self._pending.popitem(last=False)
+                await asyncio.wait_for(self.ws.send_text(data), WS_SEND_TIMEOUT)
+
 
 class WebSocketManager:
     def __init__(self):
-        self._connections: list[WebSocket] = []
+        self._clients: dict[WebSocket, _Client] = {}
+        self._outbox: deque[tuple[str | None, Hashable | None, str]] = deque()
+        self._outbox_ready: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._actions: dict[str, Callable[[dict[str, Any]], None]] = {}
 
-    async def connect(self, ws: WebSocket):
+    def register_action(self, action: str, handler: Callable[[dict[str, Any]], None]):
+        """Handle client messages with ``{"action": action, ...}``."""
+        self._actions[action] = handler
+
+    async def connect(self, ws: WebSocket, topics: set[str] | None = None):
         await ws.accept()
-        self._connections.append(ws)
-        logger.info(f"WebSocket connected ({len(self._connections)} total)")
+        client = _Client(ws, (set(topics) & TOPICS) if topics else set(TOPICS))
+        client.task = asyncio.create_task(self._write(client))
+        self._clients[ws] = client
+        self._ensure_dispatcher()
+        logger.info(f"WebSocket connected ({len(self._clients)} total)")
 
     def disconnect(self, ws: WebSocket):
-        self._connections.remove(ws)
-        logger.info(f"WebSocket disconnected ({len(self._connections)} total)")
+        client = self._clients.pop(ws, None)
+        if client is None:
+            return
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+        logger.info(f"WebSocket disconnected ({len(self._clients)} total)")
+
+    def handle_message(self, ws: WebSocket, text: str):
+        """Apply a client control message, e.g. topic (un)subscription.
+
+        ``{"action": "subscribe", "topics": ["models", "jobs"]}``. Other
+        actions go to handlers added with ``register_action``.
+        """
+        client = self._clients.get(ws)
+        if client is None:
+            return
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(msg, dict):
+            return
+        topics = msg.get("topics") or []
+        if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+            return
+        topics = set(topics) & TOPICS
+        action = msg.get("action")
+        if not isinstance(action, str):
+            return
+        if action == "subscribe":
+            client.topics |= topics
+        elif action == "unsubscribe":
+            client.topics -= topics
+        elif handler := self._actions.get(action):
+            handler(msg)
+
+    def publish(self, message: dict[str, Any]):
+        """Queue a message for delivery. O(1), never blocks.
+
+        Must be called from the event loop thread; use
+        ``loop.call_soon_threadsafe`` from worker threads.
+        """
+        if not self._clients:
+            return
+        topic = EVENT_TOPICS.get(message.get("event"))
+        self._outbox.append((topic, _coalesce_key(message), json.dumps(message)))
+        self._ensure_dispatcher()
+        self._outbox_ready.set()
 
     async def broadcast(self, message: dict[str, Any]):
-        data = json.dumps(message)
-        dead: list[WebSocket] = []
-        for ws in self._connections:
-            try:
-                await ws.send_text(data)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self._connections.remove(ws)
+        self.publish(message)
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._outbox_ready = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        while True:
+            await self._outbox_ready.wait()
+            self._outbox_ready.clear()
+            while self._outbox:
+                topic, key, data = self._outbox.popleft()
+                for ws, client in list(self._clients.items()):
+                    if topic is not None and topic not in client.topics:
+                        continue
+                    if not client.enqueue(key, data):
+                        logger.warning("Dropping slow WebSocket consumer")
+                        self._drop(ws, code=1013)
+                # Let writers drain between messages so a burst from one
+                # publisher doesn't overflow healthy clients.
+                await asyncio.sleep(0)
+
+    async def _write(self, client: _Client):
+        try:
+            await client.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._drop(client.ws, code=1011)
+
+    def _drop(self, ws: WebSocket, code: int):
+        self.disconnect(ws)
+        asyncio.create_task(self._close(ws, code))
+
+    @staticmethod
+    async def _close(ws: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(ws.close(code=code), WS_SEND_TIMEOUT)
+        except Exception:
+            pass
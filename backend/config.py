@@ -1,13 +1,18 @@
 """Application configuration."""
 
+import os
+import platform
+import sys
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 REF_DIR = ROOT_DIR / "ref"
-DATA_DIR = ROOT_DIR / "data"
+DATA_DIR = Path(os.environ.get("LOQUI_DATA_DIR", ROOT_DIR / "data"))
 AUDIO_DIR = DATA_DIR / "audio"
 GENERATED_DIR = AUDIO_DIR / "generated"
 REFERENCES_DIR = AUDIO_DIR / "references"
+PHRASE_CACHE_DIR = AUDIO_DIR / "segments"
+PROJECT_CHUNKS_DIR = AUDIO_DIR / "chunks"
 DB_PATH = DATA_DIR / "loqui.db"
 FRONTEND_DIST_DIR = ROOT_DIR / "frontend-dist"
 
@@ -17,12 +22,92 @@ DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
 DEFAULT_CFG_WEIGHT = 0.5
 DEFAULT_EXAGGERATION = 0.5
 MAX_TEXT_LENGTH = 5000
+MIN_SPEED = 0.5
+MAX_SPEED = 2.0
 SAMPLE_RATE = 24000
 QWEN_SAMPLE_RATE = 24000
 DEFAULT_REF_AUDIO = "default_ref.wav"
 
+# Reference clips are decoded once on upload, stored as mono PCM at the model
+# rate with silence trimmed, and capped to what each model family conditions on
+REFERENCE_TRIM_THRESHOLD_DB = -45.0
+REFERENCE_MAX_SECONDS = {"turbo": 10.0, "qwen": 15.0}
+
+# Output profiles: sample rate (None = model rate) and WAV encoding
+OUTPUT_PROFILES: dict[str, dict] = {
+    "native": {"sample_rate": None, "encoding": "pcm16"},
+    "wideband-16k-pcm16": {"sample_rate": 16000, "encoding": "pcm16"},
+    "telephony-8k-pcm16": {"sample_rate": 8000, "encoding": "pcm16"},
+    "telephony-8k-ulaw": {"sample_rate": 8000, "encoding": "ulaw"},
+    "telephony-8k-alaw": {"sample_rate": 8000, "encoding": "alaw"},
+}
+DEFAULT_OUTPUT_PROFILE = "native"
+
+# Phrase cache (segment-level audio reuse)
+PHRASE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+PHRASE_CROSSFADE_MS = 15.0
+
+# Projects (long-form documents rendered per segment)
+PROJECT_SEGMENT_GAP_MS = 400.0  # silence inserted between segments on assembly
+
+# History export / import archives
+HISTORY_ARCHIVE_BATCH = 500  # records per JSONL member and per import commit
+HISTORY_ARCHIVE_CHUNK = 1024 * 1024  # bytes read or written at a time
+
+# Rate limiting: token buckets per API key (X-API-Key) or client IP, refilled
+# continuously over the window. 0 disables a limit. Workers don't limit:
+# their coordinator already has.
+RATE_LIMIT_WINDOW_SECONDS = float(os.environ.get("LOQUI_RATE_LIMIT_WINDOW_SECONDS", 60))
+RATE_LIMIT_REQUESTS = int(os.environ.get("LOQUI_RATE_LIMIT_REQUESTS", 30))
+RATE_LIMIT_CHARACTERS = int(os.environ.get("LOQUI_RATE_LIMIT_CHARACTERS", 50000))
+USAGE_FLUSH_INTERVAL = 30.0  # seconds between usage counter writes to SQLite
+
+# Graceful shutdown: on SIGTERM / SIGINT or /models/shutdown the server stops
+# admitting generations (readiness turns false, new ones get 503) and waits
+# this long for in-flight ones before cancelling them, then unloads models
+SHUTDOWN_GRACE_SECONDS = float(os.environ.get("LOQUI_SHUTDOWN_GRACE_SECONDS", 60))
+DRAIN_CANCEL_SECONDS = 5.0  # after the grace period, time for cancelled jobs to unwind
+DRAIN_RETRY_AFTER_SECONDS = 5
+
+# Generation jobs
+DISCONNECT_POLL_INTERVAL = 0.5  # seconds between client disconnect checks
+
+# Generation limits (checked between model yields)
+DEFAULT_GENERATION_DEADLINE_SECONDS = 120.0
+MAX_GENERATION_DEADLINE_SECONDS = 600.0
+MAX_AUDIO_SECONDS_PER_CHAR = 0.3  # ~4x normal speech rate
+MIN_AUDIO_SECONDS_ALLOWANCE = 5.0  # headroom for very short inputs
+DEFAULT_ON_LIMIT = "error"  # or "partial": return the audio generated so far
+
+# Post-processing (applied after generation, before output encoding)
+POSTPROCESS_ENABLED = True
+TRIM_SILENCE_THRESHOLD_DB = -50.0
+TARGET_LOUDNESS_LUFS = -16.0
+PEAK_CEILING_DB = -1.0
+
+# Cluster: "standalone", "coordinator" (routes generations to workers) or
+# "worker" (registers with LOQUI_COORDINATOR_URL, advertising LOQUI_WORKER_URL)
+LOQUI_ROLE = os.environ.get("LOQUI_ROLE", "standalone")
+COORDINATOR_URL = os.environ.get("LOQUI_COORDINATOR_URL", "http://127.0.0.1:8000")
+WORKER_URL = os.environ.get("LOQUI_WORKER_URL", "http://127.0.0.1:8001")
+WORKER_HEARTBEAT_INTERVAL = 2.0
+WORKER_TTL = 10.0  # seconds without a heartbeat before a worker is ignored
+WORKER_REQUEST_TIMEOUT = 300.0
+# Workers a coordinator polls for their state rather than waiting for their
+# heartbeats (start.py --production)
+CLUSTER_WORKERS = [u.strip().rstrip("/") for u in os.environ.get("LOQUI_CLUSTER_WORKERS", "").split(",") if u.strip()]
+# Shared secret workers send with their heartbeats (X-Loqui-Cluster-Token).
+# A coordinator without one accepts no registrations, only CLUSTER_WORKERS.
+CLUSTER_TOKEN = os.environ.get("LOQUI_CLUSTER_TOKEN") or None
+
+# WebSocket fan-out
+WS_QUEUE_SIZE = 256  # pending messages per connection before it is dropped
+WS_SEND_TIMEOUT = 5.0  # seconds a single send may stall
+
 # Model variants
 MODEL_VARIANTS = ["turbo-fp16", "turbo-8bit", "turbo-4bit", "qwen-0.6b", "qwen-1.7b"]
+DEFAULT_VARIANT = "turbo-4bit"  # used by requests without a variant until one is loaded
+WARMUP_TEXT = "Hello."  # generated once by a newly loaded model before it takes traffic
 
 # HuggingFace repo IDs for each variant
 MODEL_REPOS: dict[str, str] = {
@@ -33,12 +118,76 @@ MODEL_REPOS: dict[str, str] = {
     "qwen-1.7b": "mlx-community/Qwen3-TTS-12Hz-1.7B-Base-bf16",
 }
 
+# "auto" variant: while the latency SLO is at risk, requests are served by a
+# faster resident variant of the same family, stepping back once load subsides
+LATENCY_SLO_SECONDS = float(os.environ.get("LOQUI_LATENCY_SLO_SECONDS", 10))
+FASTER_VARIANTS: dict[str, list[str]] = {  # fastest last
+    "turbo-fp16": ["turbo-8bit", "turbo-4bit"],
+    "turbo-8bit": ["turbo-4bit"],
+    "qwen-1.7b": ["qwen-0.6b"],
+}
+AUTO_RISK_FRACTION = 0.8  # p95 latency above this share of the SLO degrades
+AUTO_RECOVER_FRACTION = 0.5  # and below this share (with no queue) recovers
+AUTO_QUEUE_DEPTH = 4  # requests in flight that count as overload by themselves
+AUTO_WINDOW_SECONDS = 30.0  # latency samples considered
+AUTO_DWELL_SECONDS = 15.0  # minimum time between tier changes
+AUTO_MIN_SAMPLES = 5
+
+# Inference backends: "mlx" (Apple Silicon) or "cpu" (PyTorch, any machine).
+# LOQUI_BACKEND sets the default and LOQUI_BACKEND_<VARIANT> overrides it for
+# one variant, e.g. LOQUI_BACKEND_QWEN_0_6B=cpu.
+DEFAULT_BACKEND = os.environ.get(
+    "LOQUI_BACKEND", "mlx" if sys.platform == "darwin" and platform.machine() == "arm64" else "cpu",
+)
+MODEL_BACKENDS: dict[str, str] = {
+    v: os.environ.get("LOQUI_BACKEND_" + v.upper().replace("-", "_").replace(".", "_"), DEFAULT_BACKEND)
+    for v in MODEL_VARIANTS
+}
+CPU_THREADS = int(os.environ.get("LOQUI_CPU_THREADS", 0))  # 0: PyTorch's default
+
+# PyTorch checkpoints for the CPU backend. They aren't quantized, so the
+# turbo variants share one.
+CPU_MODEL_REPOS: dict[str, str] = {
+    "turbo-fp16": "ResembleAI/chatterbox-turbo",
+    "turbo-8bit": "ResembleAI/chatterbox-turbo",
+    "turbo-4bit": "ResembleAI/chatterbox-turbo",
+    "qwen-0.6b": "Qwen/Qwen3-TTS-12Hz-0.6B-Base",
+    "qwen-1.7b": "Qwen/Qwen3-TTS-12Hz-1.7B-Base",
+}
+
+
+def model_repo(variant: str) -> str:
+    """HuggingFace repo of a variant's weights for its configured backend."""
+    return CPU_MODEL_REPOS[variant] if MODEL_BACKENDS[variant] == "cpu" else MODEL_REPOS[variant]
+
+
+# Model residency: idle variants are unloaded, and under memory pressure
+# resident variants are evicted and new loads refused
+MODEL_IDLE_UNLOAD_SECONDS = float(os.environ.get("LOQUI_MODEL_IDLE_UNLOAD_SECONDS", 1800))  # 0 disables
+MEMORY_PRESSURE_PERCENT = float(os.environ.get("LOQUI_MEMORY_PRESSURE_PERCENT", 90))
+MODEL_WATCHDOG_INTERVAL = 10.0
+# Whether this process loads models at all (front processes of the production
+# layout don't, and never import the ML stack), and a variant to load at startup
+HOST_MODELS = os.environ.get("LOQUI_HOST_MODELS", "1") != "0"
+PRELOAD_VARIANT = os.environ.get("LOQUI_PRELOAD_VARIANT") or None
+
+# System telemetry
+SYSTEM_SAMPLE_INTERVAL = 2.0  # seconds between CPU / memory / MLX samples
+SYSTEM_HISTORY_SIZE = 300  # samples kept for charting (10 min at 2s)
+SYSTEM_READY_TIMEOUT = 5.0  # seconds /system/info waits for the first sample
+
+# Model downloads
+HF_ENDPOINT = os.environ.get("HF_ENDPOINT", "https://huggingface.co")
+PREFETCH_CONCURRENCY = 4  # files downloaded in parallel
+PREFETCH_CHUNK_SIZE = 1024 * 1024
+PREFETCH_RETRIES = 3  # resumed attempts per file before giving up
+
 
 def is_qwen_variant(variant: str) -> bool:
     return variant.startswith("qwen")
 
 
-# Approximate model sizes in bytes (for download progress estimation)
+# Approximate model sizes in bytes (for memory budgeting)
 MODEL_SIZES_BYTES: dict[str, int] = {
     "turbo-fp16": 4_000_000_000,
     "turbo-8bit": 2_000_000_000,
@@ -46,6 +195,9 @@ MODEL_SIZES_BYTES: dict[str, int] = {
     "qwen-0.6b": 1_200_000_000,
     "qwen-1.7b": 3_400_000_000,
 }
+# Memory a process needs besides model weights (start.py --production capacity check)
+MODEL_PROCESS_OVERHEAD_BYTES = 1_000_000_000  # interpreter, ML runtime, buffers
+FRONT_PROCESS_BYTES = 250_000_000  # API process that doesn't host models
 
 
 # Qwen3-TTS supported languages (full names as expected by the model)
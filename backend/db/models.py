@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Float, Integer, String, Text
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -19,6 +19,8 @@ class GenerationRecord(Base):
     )
     text: Mapped[str] = mapped_column(Text, nullable=False)
     model_variant: Mapped[str] = mapped_column(String(20), nullable=False)
+    # As asked for ("auto" may have been served by a faster variant)
+    requested_variant: Mapped[str | None] = mapped_column(String(20), nullable=True)
     language: Mapped[str | None] = mapped_column(String(5), nullable=True)
     exaggeration: Mapped[float | None] = mapped_column(Float, nullable=True)
     cfg_weight: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -28,6 +30,84 @@ class GenerationRecord(Base):
     audio_filename: Mapped[str] = mapped_column(String(255), nullable=False)
     reference_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
     sample_rate: Mapped[int] = mapped_column(Integer, default=24000)
+    audio_format: Mapped[str | None] = mapped_column(String(10), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+
+
+class Project(Base):
+    """A long-form document rendered segment by segment."""
+
+    __tablename__ = "projects"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    model_variant: Mapped[str] = mapped_column(String(20), nullable=False)
+    language: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    exaggeration: Mapped[float] = mapped_column(Float, default=0.5)
+    cfg_weight: Mapped[float] = mapped_column(Float, default=0.5)
+    temperature: Mapped[float] = mapped_column(Float, default=0.8)
+    speed: Mapped[float] = mapped_column(Float, default=1.0)
+    reference_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    audio_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class ProjectSegment(Base):
+    __tablename__ = "project_segments"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    project_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("projects.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Content hash of text + variant + voice + params; names the rendered chunk
+    chunk_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class ClientUsage(Base):
+    """Cumulative generation usage per rate-limited client."""
+
+    __tablename__ = "client_usage"
+
+    # "key:<sha256 prefix>" for API keys, "ip:<address>" otherwise
+    client_id: Mapped[str] = mapped_column(String(80), primary_key=True)
+    requests: Mapped[int] = mapped_column(Integer, default=0)
+    characters: Mapped[int] = mapped_column(Integer, default=0)
+    rejected: Mapped[int] = mapped_column(Integer, default=0)
+    last_seen: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class GenerationRollup(Base):
+    """Generation totals per time bucket, variant and language.
+
+    Kept in step with ``generations`` by ``services.analytics`` so
+    dashboards read one row per bucket instead of every generation.
+    """
+
+    __tablename__ = "generation_rollups"
+
+    granularity: Mapped[str] = mapped_column(String(4), primary_key=True)  # "hour" or "day"
+    # UTC bucket start: "YYYY-MM-DDTHH" (hour) or "YYYY-MM-DD" (day)
+    bucket: Mapped[str] = mapped_column(String(13), primary_key=True)
+    model_variant: Mapped[str] = mapped_column(String(20), primary_key=True)
+    language: Mapped[str] = mapped_column(String(5), primary_key=True, default="")  # "" when unset
+    generations: Mapped[int] = mapped_column(Integer, default=0)
+    characters: Mapped[int] = mapped_column(Integer, default=0)
+    audio_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    generation_seconds: Mapped[float] = mapped_column(Float, default=0.0)
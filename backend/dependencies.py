@@ -1,9 +1,18 @@
 """Dependency injection - singleton service instances."""
 
 from backend.api.ws import WebSocketManager
+from backend.config import LOQUI_ROLE
 from backend.services.audio_store import AudioStore
+from backend.services.cluster import Coordinator, WorkerAgent
+from backend.services.drain import DrainController
 from backend.services.history_service import HistoryService
+from backend.services.jobs import JobRegistry
 from backend.services.model_manager import ModelManager
+from backend.services.phrase_cache import PhraseCache
+from backend.services.project_service import ProjectService
+from backend.services.quality_router import QualityRouter
+from backend.services.rate_limiter import RateLimiter
+from backend.services.system_monitor import SystemMonitor
 from backend.services.tts_engine import TTSEngine
 
 # Singletons
@@ -12,18 +21,44 @@ _model_manager: ModelManager | None = None
 _audio_store: AudioStore | None = None
 _tts_engine: TTSEngine | None = None
 _history_service: HistoryService | None = None
+_project_service: ProjectService | None = None
+_system_monitor: SystemMonitor | None = None
+_job_registry: JobRegistry | None = None
+_rate_limiter: RateLimiter | None = None
+_quality_router: QualityRouter | None = None
+_drain_controller: DrainController | None = None
+_coordinator: Coordinator | None = None
+_worker_agent: WorkerAgent | None = None
 
 
 def init_services():
     """Initialize all singleton services."""
-    global _ws_manager, _model_manager, _audio_store, _tts_engine, _history_service
+    global _ws_manager, _model_manager, _audio_store, _tts_engine, _history_service, _system_monitor
+    global _job_registry, _coordinator, _worker_agent, _project_service, _rate_limiter, _quality_router
+    global _drain_controller
 
     _ws_manager = WebSocketManager()
     _model_manager = ModelManager()
     _model_manager.set_ws_manager(_ws_manager)
     _audio_store = AudioStore()
-    _tts_engine = TTSEngine(_model_manager, _audio_store)
+    _tts_engine = TTSEngine(_model_manager, _audio_store, PhraseCache())
     _history_service = HistoryService(_audio_store)
+    _project_service = ProjectService(_audio_store, _tts_engine)
+    _project_service.set_ws_manager(_ws_manager)
+    _system_monitor = SystemMonitor()
+    _system_monitor.set_ws_manager(_ws_manager)
+    _job_registry = JobRegistry()
+    _job_registry.set_ws_manager(_ws_manager)
+    # {"action": "cancel", "job_id": "..."} over the WebSocket
+    _ws_manager.register_action("cancel", lambda msg: _job_registry.cancel(str(msg.get("job_id"))))
+    _rate_limiter = RateLimiter()
+    if LOQUI_ROLE == "coordinator":
+        _coordinator = Coordinator(_audio_store)
+        _project_service.set_coordinator(_coordinator)
+    elif LOQUI_ROLE == "worker":
+        _worker_agent = WorkerAgent(_model_manager, _tts_engine)
+    _quality_router = QualityRouter(_model_manager, _coordinator)
+    _drain_controller = DrainController(_job_registry, _worker_agent)
 
 
 def get_ws_manager() -> WebSocketManager:
@@ -44,3 +79,47 @@ def get_tts_engine() -> TTSEngine:
 
 def get_history_service() -> HistoryService:
     return _history_service
+
+
+def get_project_service() -> ProjectService:
+    return _project_service
+
+
+def get_system_monitor() -> SystemMonitor:
+    return _system_monitor
+
+
+def get_job_registry() -> JobRegistry:
+    return _job_registry
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _rate_limiter
+
+
+def get_quality_router() -> QualityRouter:
+    return _quality_router
+
+
+def get_drain_controller() -> DrainController:
+    return _drain_controller
+
+
+async def generation_slot():
+    """Dependency admitting a generation request; 503 while the server drains."""
+    drain = get_drain_controller()
+    drain.admit()
+    try:
+        yield
+    finally:
+        drain.release()
+
+
+def get_coordinator() -> Coordinator | None:
+    """The coordinator, if this node runs with ``LOQUI_ROLE=coordinator``."""
+    return _coordinator
+
+
+def get_worker_agent() -> WorkerAgent | None:
+    """The heartbeat agent, if this node runs with ``LOQUI_ROLE=worker``."""
+    return _worker_agent
@@ -4,7 +4,7 @@
 import sys
 import time
 
-from backend.config import MODEL_REPOS
+from backend.config import MODEL_REPOS, model_repo
 
 PURPLE = "\033[0;35m"
 GREEN = "\033[0;32m"
@@ -15,33 +15,49 @@ DIM = "\033[2m"
 BOLD = "\033[1m"
 NC = "\033[0m"
 
-SIZES = {
-    "turbo-fp16": "~4GB",
-    "turbo-8bit": "~2GB",
-    "turbo-4bit": "~1GB",
-    "qwen-0.6b": "~1.2GB",
-    "qwen-1.7b": "~3.4GB",
-}
+
+def _format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.2f}GB"
+
+
+def _progress_bar(done: int, total: int) -> None:
+    frac = done / total if total else 1.0
+    filled = int(frac * 30)
+    bar = "█" * filled + "░" * (30 - filled)
+    print(
+        f"\r{PURPLE}│{NC} {CYAN}{bar}{NC} {frac * 100:5.1f}% "
+        f"{DIM}{_format_bytes(done)} / {_format_bytes(total)}{NC}",
+        end="",
+        flush=True,
+    )
 
 
 def download_model(variant: str):
-    """Download a model variant by loading then discarding it."""
-    from mlx_audio.tts.generate import load_model
+    """Prefetch a model variant's files into the HuggingFace cache."""
+    from backend.services.model_prefetch import ModelPrefetcher, PrefetchError
 
-    repo = MODEL_REPOS.get(variant)
+    repo = model_repo(variant) if variant in MODEL_REPOS else None
     if not repo:
         print(f"{RED}✗{NC} Unknown variant: {variant}", file=sys.stderr)
         print(f"{DIM}  Available: {', '.join(MODEL_REPOS.keys())}{NC}", file=sys.stderr)
         sys.exit(1)
 
-    print(f"{PURPLE}│{NC} Device: {CYAN}Apple Silicon (MLX){NC}")
-    print(f"{PURPLE}│{NC} Loading {BOLD}{variant}{NC} ({SIZES.get(variant, '?')})...")
+    print(f"{PURPLE}│{NC} Downloading {BOLD}{variant}{NC} from {DIM}{repo}{NC}...")
 
     start = time.time()
-    model = load_model(repo, lazy=False)
+    try:
+        ModelPrefetcher(repo, on_progress=_progress_bar).run()
+    except PrefetchError as e:
+        print()
+        print(f"{RED}✗{NC} {variant}: {e}", file=sys.stderr)
+        sys.exit(1)
     elapsed = time.time() - start
 
-    del model
+    print()
     print(f"{GREEN}✓{NC} {BOLD}{variant}{NC} model ready ({elapsed:.0f}s)")
 
 
@@ -10,15 +10,36 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from backend.api.router import api_router
-from backend.config import DATA_DIR, DEFAULT_REF_AUDIO, FRONTEND_DIST_DIR, REF_DIR, REFERENCES_DIR
+from backend.config import (
+    DATA_DIR,
+    DEFAULT_REF_AUDIO,
+    FRONTEND_DIST_DIR,
+    HOST_MODELS,
+    PRELOAD_VARIANT,
+    REF_DIR,
+    REFERENCES_DIR,
+)
 from backend.db.database import init_db
-from backend.dependencies import init_services, get_model_manager
+from backend.dependencies import (
+    get_audio_store,
+    get_coordinator,
+    get_drain_controller,
+    get_model_manager,
+    get_rate_limiter,
+    get_system_monitor,
+    get_worker_agent,
+    init_services,
+)
+from backend.services.analytics import reconcile_rollups
+from backend.utils.compression import CompressionMiddleware
 from backend.utils.exceptions import register_exception_handlers
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
 )
+# Cluster heartbeats would otherwise log every request
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
 @asynccontextmanager
@@ -43,20 +64,54 @@ async def lifespan(app: FastAPI):
     # Init services
     init_services()
 
-    # Scan HF cache to detect already-downloaded models
+    # Scan HF cache to detect already-downloaded models, and import the ML
+    # stack in the background so startup doesn't wait on it
     mm = get_model_manager()
     asyncio.create_task(mm.init_cache_states())
+    if HOST_MODELS:
+        asyncio.create_task(mm.preload_runtime())
+    if PRELOAD_VARIANT:
+        asyncio.create_task(mm.preload_variant(PRELOAD_VARIANT))
+
+    # Compute waveform peaks for audio generated before they were stored
+    asyncio.create_task(get_audio_store().backfill_peaks())
+    # Build analytics rollups for history written before they existed
+    asyncio.create_task(reconcile_rollups())
+    # Unload idle models and evict under memory pressure
+    await mm.start_watchdog()
+
+    # Persist per-client usage counters periodically
+    await get_rate_limiter().start()
+
+    # Sample system telemetry in the background for /system/info
+    await get_system_monitor().start()
+
+    # Cluster roles: workers heartbeat to the coordinator, which also polls
+    # statically configured workers
+    if worker := get_worker_agent():
+        await worker.start()
+    if coordinator := get_coordinator():
+        await coordinator.start()
+
+    # Drain in-flight generations before uvicorn stops on SIGTERM / SIGINT
+    get_drain_controller().install_signal_handlers()
 
     logging.getLogger(__name__).info("Loqui TTS started")
     yield
 
-    # Graceful shutdown: unload any loaded model to free memory
+    # Graceful shutdown: finish in-flight generations (no-op if already
+    # drained), flush usage counters, then unload resident models
+    await get_drain_controller().drain()
+    await get_system_monitor().stop()
+    await get_model_manager().stop_watchdog()
+    await get_rate_limiter().stop()
+    if worker := get_worker_agent():
+        await worker.stop()
+    if coordinator := get_coordinator():
+        await coordinator.close()
+
     try:
-        mm = get_model_manager()
-        loaded = mm.get_loaded_variant()
-        if loaded:
-            logging.getLogger(__name__).info(f"Unloading {loaded} model...")
-            await mm._unload_model(loaded)
+        await get_model_manager().unload_all()
     except Exception:
         pass
     logging.getLogger(__name__).info("Loqui TTS shut down cleanly")
@@ -78,6 +133,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip / brotli for JSON responses
+app.add_middleware(CompressionMiddleware)
+
 # Register exception handlers
 register_exception_handlers(app)
 
@@ -0,0 +1,23 @@
+"""Generation analytics schemas."""
+
+from pydantic import BaseModel
+
+
+class AnalyticsTotals(BaseModel):
+    model_variant: str
+    generations: int
+    characters: int
+    audio_seconds: float
+    generation_seconds: float
+    rtf: float | None = None
+
+
+class AnalyticsBucket(AnalyticsTotals):
+    bucket: str
+    language: str | None = None
+
+
+class AnalyticsResponse(BaseModel):
+    granularity: str
+    buckets: list[AnalyticsBucket]
+    totals: list[AnalyticsTotals]
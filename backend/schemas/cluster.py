@@ -0,0 +1,26 @@
+"""Cluster coordination schemas."""
+
+from pydantic import BaseModel
+
+
+class WorkerHeartbeat(BaseModel):
+    url: str
+    variants: list[str] = []
+    queue_depth: int = 0
+    memory_available_bytes: int = 0
+
+
+class WorkerStatusResponse(BaseModel):
+    url: str
+    variants: list[str]
+    queue_depth: int
+    routed: int
+    memory_available_gb: float
+    last_seen_seconds: float
+    alive: bool
+
+
+class ClusterStatusResponse(BaseModel):
+    role: str
+    coordinator_url: str | None = None
+    workers: list[WorkerStatusResponse] = []
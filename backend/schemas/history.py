@@ -9,12 +9,16 @@ class HistoryEntryResponse(BaseModel):
     id: str
     text: str
     model_variant: str
+    requested_variant: str | None = None
     language: str | None = None
     exaggeration: float | None = None
     cfg_weight: float | None = None
     duration_seconds: float
     generation_time_seconds: float
+    sample_rate: int | None = None
+    audio_format: str | None = None
     audio_url: str
+    peaks_url: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -5,9 +5,13 @@ from pydantic import BaseModel
 
 class ModelStatusResponse(BaseModel):
     variant: str
+    backend: str | None = None
     status: str
     error: str | None = None
     download_progress: float = 0.0
+    active: bool = False
+    in_flight: int = 0
+    idle_seconds: float | None = None
 
 
 class DeviceInfoResponse(BaseModel):
@@ -0,0 +1,84 @@
+"""Long-form project schemas."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field, model_validator
+
+from backend.config import MAX_SPEED, MIN_SPEED
+
+
+class ProjectSettings(BaseModel):
+    model_variant: str | None = None
+    language: str | None = None
+    exaggeration: float | None = None
+    cfg_weight: float | None = None
+    temperature: float | None = None
+    speed: float | None = Field(None, ge=MIN_SPEED, le=MAX_SPEED)
+    reference_filename: str | None = None
+
+
+class ProjectCreateRequest(ProjectSettings):
+    """A document given as ``text`` (split on blank lines) or as ``segments``."""
+
+    name: str
+    text: str | None = None
+    segments: list[str] | None = None
+
+    @model_validator(mode="after")
+    def _one_source(self):
+        if (self.text is None) == (self.segments is None):
+            raise ValueError("Provide exactly one of 'text' or 'segments'")
+        return self
+
+
+class ProjectUpdateRequest(ProjectSettings):
+    name: str | None = None
+    text: str | None = None
+    segments: list[str] | None = None
+
+    @model_validator(mode="after")
+    def _one_source(self):
+        if self.text is not None and self.segments is not None:
+            raise ValueError("Provide at most one of 'text' or 'segments'")
+        return self
+
+
+class ProjectSegmentResponse(BaseModel):
+    id: str
+    position: int
+    text: str
+    rendered: bool
+    duration_seconds: float | None = None
+
+
+class ProjectResponse(BaseModel):
+    id: str
+    name: str
+    model_variant: str
+    language: str | None = None
+    exaggeration: float
+    cfg_weight: float
+    temperature: float
+    speed: float
+    reference_filename: str | None = None
+    audio_url: str | None = None
+    duration_seconds: float | None = None
+    segments: list[ProjectSegmentResponse] = []
+    created_at: datetime
+    updated_at: datetime
+
+
+class ProjectSummaryResponse(BaseModel):
+    id: str
+    name: str
+    model_variant: str
+    audio_url: str | None = None
+    duration_seconds: float | None = None
+    updated_at: datetime
+
+
+class ProjectRenderResponse(ProjectResponse):
+    job_id: str
+    segments_rendered: int
+    segments_reused: int
+    render_time_seconds: float
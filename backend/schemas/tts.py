@@ -5,10 +5,19 @@ from pydantic import BaseModel
 
 class GenerateResponse(BaseModel):
     id: str
+    job_id: str | None = None
     audio_url: str
+    peaks_url: str | None = None
     text: str
     model_variant: str
+    requested_variant: str | None = None
     language: str | None = None
     duration_seconds: float
     generation_time_seconds: float
     sample_rate: int
+    audio_format: str = "pcm16"
+    segments_total: int | None = None
+    segments_cached: int | None = None
+    cache_hit_ratio: float | None = None
+    postprocess_ms: dict[str, float] | None = None
+    limit_reached: str | None = None
@@ -0,0 +1,185 @@
+"""Generation analytics served from rollup tables.
+
+Every generation adds to one ``generation_rollups`` row per granularity
+(hour and day, in UTC) for its variant and language, in the same
+transaction that inserts or deletes the history record. Queries then read
+O(buckets) rows however long the history grows.
+
+``reconcile_rollups`` runs at startup: if the rollups don't account for every
+generation (a database from before rollups existed, or an interrupted
+write), they are rebuilt from history in one ``GROUP BY``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.database import async_session
+from backend.db.models import GenerationRecord, GenerationRollup
+
+logger = logging.getLogger(__name__)
+
+# strftime formats shared by Python and SQLite, so incremental updates and
+# rebuilds produce the same bucket keys
+GRANULARITIES = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+_COUNTERS = ("generations", "characters", "audio_seconds", "generation_seconds")
+
+
+async def update_rollups(session: AsyncSession, records: Iterable[GenerationRecord], sign: int = 1) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) ``records`` from the rollups.
+
+    Runs in the caller's transaction; records must have ``created_at`` set
+    (flush first). Buckets left empty by a removal are deleted.
+    """
+    deltas: dict[tuple, list] = defaultdict(lambda: [0, 0, 0.0, 0.0])
+    for record in records:
+        for granularity, fmt in GRANULARITIES.items():
+            key = (granularity, record.created_at.strftime(fmt), record.model_variant, record.language or "")
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += sign * len(record.text)
+            delta[2] += sign * record.duration_seconds
+            delta[3] += sign * record.generation_time_seconds
+    if not deltas:
+        return
+
+    for (granularity, bucket, variant, language), values in deltas.items():
+        stmt = insert(GenerationRollup).values(
+            granularity=granularity,
+            bucket=bucket,
+            model_variant=variant,
+            language=language,
+            **dict(zip(_COUNTERS, values)),
+        )
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[
+                GenerationRollup.granularity,
+                GenerationRollup.bucket,
+                GenerationRollup.model_variant,
+                GenerationRollup.language,
+            ],
+            set_={name: getattr(GenerationRollup, name) + stmt.excluded[name] for name in _COUNTERS},
+        ))
+    if sign < 0:
+        await session.execute(delete(GenerationRollup).where(GenerationRollup.generations <= 0))
+
+
+async def clear_rollups(session: AsyncSession) -> None:
+    """Drop all rollups (history was cleared). Runs in the caller's transaction."""
+    await session.execute(delete(GenerationRollup))
+
+
+async def rebuild_rollups() -> int:
+    """Recompute every rollup from history. Returns the generations counted.
+
+    Delete and re-insert happen in one transaction, so generations written
+    concurrently are counted exactly once either way.
+    """
+    async with async_session() as session:
+        await session.execute(delete(GenerationRollup))
+        for granularity, fmt in GRANULARITIES.items():
+            bucket = func.strftime(fmt, GenerationRecord.created_at)
+            language = func.coalesce(GenerationRecord.language, "")
+            await session.execute(insert(GenerationRollup).from_select(
+                ["granularity", "bucket", "model_variant", "language", *_COUNTERS],
+                select(
+                    literal(granularity),
+                    bucket,
+                    GenerationRecord.model_variant,
+                    language,
+                    func.count(),
+                    func.coalesce(func.sum(func.length(GenerationRecord.text)), 0),
+                    func.coalesce(func.sum(GenerationRecord.duration_seconds), 0.0),
+                    func.coalesce(func.sum(GenerationRecord.generation_time_seconds), 0.0),
+                ).group_by(bucket, GenerationRecord.model_variant, language),
+            ))
+        total = await session.scalar(
+            select(func.coalesce(func.sum(GenerationRollup.generations), 0))
+            .where(GenerationRollup.granularity == "day")
+        )
+        await session.commit()
+    return total
+
+
+async def reconcile_rollups() -> None:
+    """Rebuild the rollups if they don't match the number of generations."""
+    async with async_session() as session:
+        rows = await session.scalar(select(func.count()).select_from(GenerationRecord))
+        counted = await session.scalar(
+            select(func.coalesce(func.sum(GenerationRollup.generations), 0))
+            .where(GenerationRollup.granularity == "day")
+        )
+    if rows == counted:
+        return
+    logger.info(f"Rebuilding analytics rollups ({counted} of {rows} generations counted)")
+    total = await rebuild_rollups()
+    logger.info(f"Analytics rollups rebuilt from {total} generations")
+
+
+def _rtf(row: dict) -> float | None:
+    """Generation time per second of audio (below 1 is faster than real time)."""
+    return round(row["generation_seconds"] / row["audio_seconds"], 3) if row["audio_seconds"] else None
+
+
+def _utc(dt: datetime) -> datetime:
+    """``dt`` in UTC, the timezone of the buckets; naive datetimes are taken as UTC."""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+async def query_analytics(
+    session: AsyncSession,
+    granularity: str = "day",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    variant: str | None = None,
+    language: str | None = None,
+) -> dict:
+    """Rollup rows in ``[since, until]``, oldest first, plus totals per variant."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity} (available: {', '.join(GRANULARITIES)})")
+    fmt = GRANULARITIES[granularity]
+    conditions = [GenerationRollup.granularity == granularity]
+    if since:
+        conditions.append(GenerationRollup.bucket >= _utc(since).strftime(fmt))
+    if until:
+        conditions.append(GenerationRollup.bucket <= _utc(until).strftime(fmt))
+    if variant:
+        conditions.append(GenerationRollup.model_variant == variant)
+    if language is not None:
+        conditions.append(GenerationRollup.language == language)
+
+    result = await session.execute(
+        select(
+            GenerationRollup.bucket,
+            GenerationRollup.model_variant,
+            GenerationRollup.language,
+            *(getattr(GenerationRollup, name) for name in _COUNTERS),
+        )
+        .where(*conditions)
+        .order_by(GenerationRollup.bucket, GenerationRollup.model_variant, GenerationRollup.language)
+    )
+    buckets = [dict(row) for row in result.mappings()]
+    totals: dict[str, dict] = {}
+    for row in buckets:
+        row["language"] = row["language"] or None
+        total = totals.setdefault(
+            row["model_variant"], {"model_variant": row["model_variant"], **dict.fromkeys(_COUNTERS, 0)}
+        )
+        for name in _COUNTERS:
+            total[name] += row[name]
+    for row in (*buckets, *totals.values()):
+        row["rtf"] = _rtf(row)
+        row["audio_seconds"] = round(row["audio_seconds"], 3)
+        row["generation_seconds"] = round(row["generation_seconds"], 3)
+    return {
+        "granularity": granularity,
+        "buckets": buckets,
+        "totals": sorted(totals.values(), key=lambda t: t["generations"], reverse=True),
+    }
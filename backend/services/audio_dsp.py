@@ -0,0 +1,170 @@
+"""Vectorized NumPy audio operations.
+
+Imported lazily (inside functions) by the services so that NumPy stays off
+the startup path.
+"""
+
+from __future__ import annotations
+
+import struct
+from math import gcd
+
+import numpy as np
+
+_ENCODE_BLOCK = 65536  # samples converted per step, bounds temporary memory
+
+# WAV format tag and bits per sample for each supported encoding.
+WAV_ENCODINGS: dict[str, tuple[int, int]] = {
+    "pcm16": (1, 16),
+    "alaw": (6, 8),
+    "ulaw": (7, 8),
+}
+
+# G.711 segment end points (Sun reference implementation).
+_ULAW_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEG_END = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+
+
+def to_mono_f32(audio) -> np.ndarray:
+    """View model output as a flat float32 array, copying only if needed.
+
+    ``np.asarray`` goes through the buffer protocol, so float32 MLX arrays
+    are wrapped without a copy (``np.array`` always copies).
+    """
+    samples = np.asarray(audio)
+    if samples.dtype != np.float32:
+        samples = samples.astype(np.float32)
+    return samples.reshape(-1)
+
+
+def ulaw_encode(pcm: np.ndarray) -> np.ndarray:
+    """G.711 \u03bc-law encode 16-bit PCM."""
+    x = pcm.astype(np.int32) >> 2
+    mask = np.where(x < 0, 0x7F, 0xFF)
+    x = np.minimum(np.abs(x), 8159) + (0x84 >> 2)
+    seg = np.searchsorted(_ULAW_SEG_END, x)
+    uval = (seg << 4) | ((x >> (seg + 1)) & 0xF)
+    uval = np.where(seg >= 8, 0x7F, uval)
+    return (uval ^ mask).astype(np.uint8)
+
+
+def alaw_encode(pcm: np.ndarray) -> np.ndarray:
+    """G.711 A-law encode 16-bit PCM."""
+    x = pcm.astype(np.int32) >> 3
+    mask = np.where(x >= 0, 0xD5, 0x55)
+    x = np.where(x >= 0, x, -x - 1)
+    seg = np.searchsorted(_ALAW_SEG_END, x)
+    aval = (seg << 4) | ((x >> np.maximum(seg, 1)) & 0xF)
+    aval = np.where(seg >= 8, 0x7F, aval)
+    return (aval ^ mask).astype(np.uint8)
+
+
+def _wav_header(n: int, sample_rate: int, encoding: str) -> bytes:
+    fmt_tag, bits = WAV_ENCODINGS[encoding]
+    width = bits // 8
+    data = n * width
+    if fmt_tag == 1:
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + data, b"WAVE", b"fmt ", 16,
+            fmt_tag, 1, sample_rate, sample_rate * width, width, bits, b"data", data,
+        )
+    # Non-PCM formats carry cbSize and a fact chunk with the sample count.
+    return struct.pack(
+        "<4sI4s4sIHHIIHHH4sII4sI", b"RIFF", 50 + data, b"WAVE", b"fmt ", 18,
+        fmt_tag, 1, sample_rate, sample_rate * width, width, bits, 0,
+        b"fact", 4, n, b"data", data,
+    )
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int, encoding: str = "pcm16") -> memoryview:
+    """Encode mono float32 samples as a WAV file in memory.
+
+    Samples are converted block by block straight into the output buffer,
+    so the only full-size allocation is the encoded file itself.
+    """
+    n = len(samples)
+    header = _wav_header(n, sample_rate, encoding)
+    buf = bytearray(header)
+    buf.extend(bytes(n * WAV_ENCODINGS[encoding][1] // 8))
+    out = np.frombuffer(buf, dtype="<i2" if encoding == "pcm16" else np.uint8, offset=len(header))
+    companders = {"ulaw": ulaw_encode, "alaw": alaw_encode}
+    tmp = np.empty(min(n, _ENCODE_BLOCK), dtype=np.float32)
+    for start in range(0, n, _ENCODE_BLOCK):
+        block = samples[start:start + _ENCODE_BLOCK]
+        scaled = tmp[:len(block)]
+        np.clip(block, -1.0, 1.0, out=scaled)
+        scaled *= 32767.0
+        np.rint(scaled, out=scaled)
+        if encoding == "pcm16":
+            out[start:start + len(block)] = scaled
+        else:
+            out[start:start + len(block)] = companders[encoding](scaled.astype(np.int16))
+    return memoryview(buf)
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int, zero_crossings: int = 16) -> np.ndarray:
+    """Band-limited rational resampling with a polyphase Kaiser-windowed sinc.
+
+    Each output sample is a dot product of one filter phase with the input
+    around it, computed for a block of outputs at a time, so cost is
+    O(n_out * taps_per_phase) for any ratio and temporary memory is bounded.
+    """
+    if src_rate == dst_rate:
+        return samples
+    g = gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    factor = max(up, down)
+
+    # Low-pass at the lower of the two Nyquist rates, on the upsampled grid.
+    n_taps = 2 * zero_crossings * factor + 1
+    t = np.arange(n_taps) - (n_taps - 1) / 2
+    h = (np.sinc(t / factor) / factor * np.kaiser(n_taps, 8.6) * up).astype(np.float32)
+
+    # bank[r, i] = h[r + i * up]: the taps that land on input samples for phase r.
+    per_phase = -(-n_taps // up)
+    bank = np.zeros(per_phase * up, dtype=np.float32)
+    bank[:n_taps] = h
+    bank = bank.reshape(per_phase, up).T
+
+    padded = np.concatenate([
+        np.zeros(per_phase, dtype=np.float32), samples, np.zeros(per_phase, dtype=np.float32),
+    ])
+    n_out = -(-len(samples) * up // down)
+    out = np.empty(n_out, dtype=np.float32)
+    offsets = per_phase - np.arange(per_phase)
+    for start in range(0, n_out, _ENCODE_BLOCK // 8):
+        k = np.arange(start, min(start + _ENCODE_BLOCK // 8, n_out))
+        pos = k * down + (n_taps - 1) // 2
+        idx = np.minimum((pos // up)[:, None] + offsets[None, :], len(padded) - 1)
+        out[start:start + len(k)] = np.einsum("ki,ki->k", bank[pos % up], padded[idx])
+    return out
+
+
+def crossfade_concat(chunks: list[np.ndarray], sample_rate: int, fade_ms: float) -> np.ndarray:
+    """Concatenate mono float32 chunks with short equal-power crossfades."""
+    chunks = [c for c in chunks if len(c)]
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    if len(chunks) == 1:
+        return chunks[0]
+
+    fade = int(sample_rate * fade_ms / 1000)
+    fade = min(fade, *(len(c) // 2 for c in chunks))
+    if fade <= 0:
+        return np.concatenate(chunks)
+
+    t = np.linspace(0.0, np.pi / 2, fade, dtype=np.float32)
+    fade_in, fade_out = np.sin(t), np.cos(t)
+
+    total = sum(len(c) for c in chunks) - fade * (len(chunks) - 1)
+    out = np.empty(total, dtype=np.float32)
+    pos = 0
+    for i, chunk in enumerate(chunks):
+        body = chunk
+        if i > 0:
+            # Overlap this chunk's head with the tail already written.
+            out[pos - fade:pos] = out[pos - fade:pos] * fade_out + chunk[:fade] * fade_in
+            body = chunk[fade:]
+        out[pos:pos + len(body)] = body
+        pos += len(body)
+    return out
@@ -0,0 +1,292 @@
+"""Post-processing stage for generated audio.
+
+Silence trimming, loudness normalization, peak limiting and pitch-preserving
+time-stretch, each vectorized over whole buffers. ``PostProcessor.stream``
+applies the same stages to a sequence of chunks (e.g. per-sentence model
+output) with state carried across chunk boundaries.
+
+Imported lazily, like ``audio_dsp``.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_EPS = 1e-10
+
+
+def _frame_energy_db(x: np.ndarray, frame: int) -> np.ndarray:
+    """RMS level in dBFS per non-overlapping frame (last frame zero-padded)."""
+    n_frames = -(-len(x) // frame)
+    padded = np.zeros(n_frames * frame, dtype=np.float32)
+    padded[:len(x)] = x
+    power = np.mean(np.square(padded.reshape(n_frames, frame)), axis=1)
+    return 10 * np.log10(power + _EPS)
+
+
+def voiced_bounds(
+    x: np.ndarray, sample_rate: int, threshold_db: float, frame_ms: float = 10.0,
+) -> tuple[int, int] | None:
+    """Sample range from the first to the last frame above ``threshold_db``."""
+    if not len(x):
+        return None
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    voiced = np.flatnonzero(_frame_energy_db(x, frame) > threshold_db)
+    if not len(voiced):
+        return None
+    return int(voiced[0]) * frame, min(len(x), (int(voiced[-1]) + 1) * frame)
+
+
+def trim_silence(x: np.ndarray, sample_rate: int, threshold_db: float = -50.0, pad_ms: float = 80.0) -> np.ndarray:
+    """Energy-based leading / trailing silence trim, keeping ``pad_ms`` of air.
+
+    A clip with no frame above ``threshold_db`` is returned whole: it is a
+    quiet take rather than silence.
+    """
+    bounds = voiced_bounds(x, sample_rate, threshold_db)
+    if bounds is None:
+        return x
+    pad = int(sample_rate * pad_ms / 1000)
+    return x[max(0, bounds[0] - pad):bounds[1] + pad]
+
+
+def trim_reference(
+    x: np.ndarray, sample_rate: int, threshold_db: float, max_seconds: float | None = None,
+) -> np.ndarray:
+    """Cut a voice reference clip down to the speech the model conditions on.
+
+    Leading and trailing silence is trimmed; past ``max_seconds`` the clip
+    ends at the quietest 10 ms frame of the last second before the cap, so
+    it isn't cut mid-word. A clip with no frame above ``threshold_db`` is
+    kept whole (a quiet recording rather than silence).
+    """
+    trimmed = trim_silence(x, sample_rate, threshold_db)
+    limit = int(max_seconds * sample_rate) if max_seconds else 0
+    if limit and len(trimmed) > limit:
+        frame = max(1, sample_rate // 100)
+        search = min(sample_rate, limit)
+        quietest = int(np.argmin(_frame_energy_db(trimmed[limit - search:limit], frame)))
+        trimmed = trimmed[:min(limit, limit - search + (quietest + 1) * frame)]
+    return trimmed
+
+
+def _biquad_response(b: np.ndarray, a: np.ndarray, w: np.ndarray) -> np.ndarray:
+    z = np.exp(-1j * w)
+    return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+
+def _k_weighting_power(n_fft: int, sample_rate: int) -> np.ndarray:
+    """|H|^2 of the BS.1770 K-weighting filter at rfft bin frequencies."""
+    w = 2 * np.pi * np.fft.rfftfreq(n_fft, 1 / sample_rate) / sample_rate
+
+    # Stage 1: high shelf (+4 dB above ~1.7 kHz)
+    gain_db, q, fc = 3.99984385397, 0.7071752369554193, 1681.9744509555319
+    K = np.tan(np.pi * fc / sample_rate)
+    Vh = 10 ** (gain_db / 20)
+    Vb = Vh ** 0.4996667741545416
+    a0 = 1 + K / q + K * K
+    b = np.array([Vh + Vb * K / q + K * K, 2 * (K * K - Vh), Vh - Vb * K / q + K * K]) / a0
+    a = np.array([1.0, 2 * (K * K - 1) / a0, (1 - K / q + K * K) / a0])
+    shelf = _biquad_response(b, a, w)
+
+    # Stage 2: high pass (~38 Hz)
+    q, fc = 0.5003270373253953, 38.13547087613982
+    K = np.tan(np.pi * fc / sample_rate)
+    a0 = 1 + K / q + K * K
+    b = np.array([1.0, -2.0, 1.0])
+    a = np.array([1.0, 2 * (K * K - 1) / a0, (1 - K / q + K * K) / a0])
+    highpass = _biquad_response(b, a, w)
+
+    return np.abs(shelf * highpass) ** 2
+
+
+def integrated_loudness(x: np.ndarray, sample_rate: int) -> float:
+    """Gated integrated loudness (LUFS) per BS.1770.
+
+    K-weighted power is computed for 100 ms sub-blocks from their spectra in
+    one batched FFT; each 400 ms gating block (75% overlap) is the mean of
+    four neighbouring sub-blocks, so no sample is transformed twice. Then
+    the absolute (-70 LUFS) and relative (-10 LU) gates apply.
+    """
+    sub = int(0.1 * sample_rate)
+    n_sub = max(4, -(-len(x) // sub))
+    padded = np.zeros(n_sub * sub, dtype=np.float32)
+    padded[:len(x)] = x
+    spectra = np.abs(np.fft.rfft(padded.reshape(n_sub, sub), axis=1)) ** 2
+    spectra[:, 1:(sub + 1) // 2] *= 2  # fold in the negative frequencies
+    sub_power = spectra @ _k_weighting_power(sub, sample_rate) / (sub * sub)
+    power = sliding_window_view(sub_power, 4).mean(axis=1)
+    loudness = -0.691 + 10 * np.log10(power + _EPS)
+
+    gated = power[loudness > -70.0]
+    if not len(gated):
+        return -70.0
+    relative = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+    gated = power[(loudness > -70.0) & (loudness > relative)]
+    return float(-0.691 + 10 * np.log10(gated.mean() + _EPS))
+
+
+def loudness_gain(x: np.ndarray, sample_rate: int, target_lufs: float, max_gain_db: float = 20.0) -> float:
+    """Linear gain that brings ``x`` to ``target_lufs``."""
+    measured = integrated_loudness(x, sample_rate)
+    if measured <= -70.0:
+        return 1.0
+    return float(10 ** (min(target_lufs - measured, max_gain_db) / 20))
+
+
+def limit_peaks(x: np.ndarray, sample_rate: int, ceiling_db: float = -1.0, window_ms: float = 5.0) -> np.ndarray:
+    """Look-ahead peak limiter.
+
+    The gain each sample needs is reduced to a per-block minimum (including
+    both neighbouring blocks, which gives look-ahead and hold) and linearly
+    interpolated between block centres, so gain never exceeds what any
+    sample needs and ramps smoothly. O(n), no per-sample Python loop.
+    """
+    ceiling = 10 ** (ceiling_db / 20)
+    peaks = np.abs(x)
+    if not len(x) or peaks.max() <= ceiling:
+        return x
+    needed = np.minimum(1.0, ceiling / np.maximum(peaks, _EPS))
+
+    block = max(1, int(sample_rate * window_ms / 1000))
+    n_blocks = -(-len(x) // block)
+    padded = np.ones(n_blocks * block, dtype=np.float32)
+    padded[:len(x)] = needed
+    block_min = padded.reshape(n_blocks, block).min(axis=1)
+    block_min = np.minimum(block_min, np.minimum(
+        np.append(block_min[1:], 1.0), np.insert(block_min[:-1], 0, 1.0),
+    ))
+    centres = np.arange(n_blocks) * block + (block - 1) / 2
+    gain = np.interp(np.arange(len(x)), centres, block_min).astype(np.float32)
+    return x * gain
+
+
+def time_stretch(x: np.ndarray, rate: float, n_fft: int = 1024) -> np.ndarray:
+    """Pitch-preserving time-stretch by phase vocoder. ``rate > 1`` is faster."""
+    if rate <= 0:
+        raise ValueError(f"Time-stretch rate must be positive, got {rate}")
+    if rate == 1.0 or len(x) < n_fft:
+        return x
+    hop = n_fft // 4
+    window = np.hanning(n_fft).astype(np.float32)
+
+    padded = np.pad(x, (n_fft // 2, n_fft // 2 + hop))
+    frames = sliding_window_view(padded, n_fft)[::hop] * window
+    stft = np.fft.rfft(frames, axis=1).astype(np.complex64)
+    mags, phases = np.abs(stft), np.angle(stft)
+
+    steps = np.arange(0, len(stft) - 1, rate)
+    i0 = steps.astype(int)
+    frac = (steps - i0).astype(np.float32)[:, None]
+    mag = mags[i0] + frac * (mags[i0 + 1] - mags[i0])
+
+    # Accumulate each bin's instantaneous frequency from the measured phase
+    # difference between neighbouring analysis frames.
+    omega = (2 * np.pi * hop * np.arange(stft.shape[1]) / n_fft).astype(np.float32)
+    dphi = phases[i0 + 1] - phases[i0] - omega
+    dphi -= np.float32(2 * np.pi) * np.round(dphi / np.float32(2 * np.pi))
+    phase = np.cumsum(dphi + omega, axis=0)
+    phase += phases[0] - phase[0]
+
+    out_frames = np.fft.irfft(mag * np.exp(1j * phase), n_fft, axis=1).astype(np.float32) * window
+    n_out = len(out_frames)
+    out = np.zeros((n_out + 3, hop), dtype=np.float32)
+    norm = np.zeros((n_out + 3, hop), dtype=np.float32)
+    wsq = (window ** 2).reshape(4, hop)
+    for k in range(4):
+        out[k:k + n_out] += out_frames[:, k * hop:(k + 1) * hop]
+        norm[k:k + n_out] += wsq[k]
+    y = (out / np.maximum(norm, 1e-3)).reshape(-1)
+    return y[n_fft // 2:n_fft // 2 + int(len(x) / rate)]
+
+
+@dataclass
+class PostProcessConfig:
+    trim_silence: bool = True
+    trim_threshold_db: float = -50.0
+    normalize_loudness: bool = True
+    target_lufs: float = -16.0
+    limit_peaks: bool = True
+    peak_ceiling_db: float = -1.0
+    stretch_rate: float = 1.0
+
+
+class PostProcessor:
+    def __init__(self, config: PostProcessConfig, sample_rate: int):
+        self.config = config
+        self.sample_rate = sample_rate
+        self.timings: dict[str, float] = {}
+
+    def _timed(self, stage: str, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.timings[stage] = self.timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+        return result
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Apply all enabled stages to a complete buffer."""
+        cfg, sr = self.config, self.sample_rate
+        if cfg.trim_silence:
+            x = self._timed("trim", trim_silence, x, sr, cfg.trim_threshold_db)
+        if cfg.stretch_rate != 1.0:
+            x = self._timed("stretch", time_stretch, x, cfg.stretch_rate)
+        if cfg.normalize_loudness:
+            gain = self._timed("loudness", loudness_gain, x, sr, cfg.target_lufs)
+            x = x * np.float32(gain)
+        if cfg.limit_peaks:
+            x = self._timed("limit", limit_peaks, x, sr, cfg.peak_ceiling_db)
+        return x
+
+    def stream(self, chunks: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        """Apply the stages chunk by chunk.
+
+        Leading silence is dropped until the first voiced frame; trailing
+        silence of each chunk is held back and only released if more voiced
+        audio follows. Loudness gain is measured on the first voiced chunk
+        and then held, so levels don't pump between chunks. Each chunk is
+        stretched independently, which suits per-sentence model output.
+        If no chunk is voiced at all, the audio is passed through untrimmed.
+        """
+        cfg, sr = self.config, self.sample_rate
+        started = False
+        held = np.zeros(0, dtype=np.float32)
+        quiet: list[np.ndarray] = []  # chunks so far while none was voiced
+        gain: float | None = None
+
+        def level(chunk: np.ndarray) -> np.ndarray:
+            nonlocal gain
+            if cfg.normalize_loudness:
+                if gain is None:
+                    gain = self._timed("loudness", loudness_gain, chunk, sr, cfg.target_lufs)
+                chunk = chunk * np.float32(gain)
+            if cfg.limit_peaks:
+                chunk = self._timed("limit", limit_peaks, chunk, sr, cfg.peak_ceiling_db)
+            return chunk
+
+        for chunk in chunks:
+            if cfg.stretch_rate != 1.0:
+                chunk = self._timed("stretch", time_stretch, chunk, cfg.stretch_rate)
+            if cfg.trim_silence:
+                bounds = self._timed("trim", voiced_bounds, chunk, sr, cfg.trim_threshold_db)
+                if bounds is None:
+                    if started:
+                        held = np.concatenate([held, chunk])
+                    else:
+                        quiet.append(chunk)
+                    continue
+                start, end = bounds
+                if not started:
+                    chunk, end = chunk[start:], end - start
+                    started = True
+                    quiet.clear()
+                chunk, tail = np.concatenate([held, chunk[:end]]), chunk[end:]
+                held = tail
+            yield level(chunk)
+        if quiet:
+            # A quiet take rather than silence, as in ``trim_silence``
+            yield level(np.concatenate(quiet))
@@ -2,42 +2,143 @@
 
 from __future__ import annotations
 
+import asyncio
+import io
+import logging
 import shutil
 import uuid
 from pathlib import Path
 
 import aiofiles
 
-from backend.config import GENERATED_DIR, REFERENCES_DIR
+from backend.config import (
+    GENERATED_DIR,
+    PROJECT_CHUNKS_DIR,
+    REFERENCE_TRIM_THRESHOLD_DB,
+    REFERENCES_DIR,
+    SAMPLE_RATE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_reference(data: bytes, max_seconds: float | None = None) -> memoryview | None:
+    """Decode, trim, cap and resample a reference clip to mono PCM16 WAV (thread pool).
+
+    ``None`` if the data can't be decoded.
+    """
+    import io
+
+    import soundfile as sf
+
+    from backend.services import audio_dsp
+    from backend.services.audio_postprocess import trim_reference
+
+    try:
+        samples, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except (sf.LibsndfileError, RuntimeError, TypeError):
+        return None
+    # Trim at the source rate so only the kept part is resampled
+    mono = trim_reference(samples.mean(axis=1), sample_rate, REFERENCE_TRIM_THRESHOLD_DB, max_seconds)
+    return audio_dsp.encode_wav(audio_dsp.resample(mono, sample_rate, SAMPLE_RATE), SAMPLE_RATE)
 
 
 class AudioStore:
     def __init__(self):
         GENERATED_DIR.mkdir(parents=True, exist_ok=True)
         REFERENCES_DIR.mkdir(parents=True, exist_ok=True)
+        PROJECT_CHUNKS_DIR.mkdir(parents=True, exist_ok=True)
 
     def generated_path(self, filename: str) -> Path:
         return GENERATED_DIR / filename
 
+    def peaks_path(self, filename: str) -> Path:
+        """Waveform peaks stored next to a generated WAV."""
+        return (GENERATED_DIR / filename).with_suffix(".peaks")
+
+    def write_peaks(self, filename: str) -> None:
+        """Compute and store peaks for a generated file (thread pool)."""
+        from backend.services.waveform_peaks import peaks_from_file
+
+        self.peaks_path(filename).write_bytes(peaks_from_file(str(self.generated_path(filename))))
+
+    async def backfill_peaks(self) -> int:
+        """Compute peaks for generated files stored before they existed."""
+        loop = asyncio.get_event_loop()
+        missing = [p.name for p in GENERATED_DIR.glob("*.wav") if not p.with_suffix(".peaks").exists()]
+        done = 0
+        for filename in missing:
+            try:
+                await loop.run_in_executor(None, self.write_peaks, filename)
+                done += 1
+            except Exception as e:
+                logger.warning(f"Could not compute peaks for {filename}: {e}")
+        if done:
+            logger.info(f"Backfilled waveform peaks for {done} files")
+        return done
+
     def reference_path(self, filename: str) -> Path:
         return REFERENCES_DIR / filename
 
+    def chunk_path(self, key: str) -> Path:
+        """Rendered project segment, named by its content hash."""
+        return PROJECT_CHUNKS_DIR / f"{key}.wav"
+
     def new_generated_filename(self) -> str:
         return f"{uuid.uuid4().hex}.wav"
 
-    async def save_reference(self, data: bytes, original_name: str) -> str:
-        """Save uploaded reference audio, return stored filename."""
-        ext = Path(original_name).suffix or ".wav"
+    async def save_reference(self, data: bytes, original_name: str, max_seconds: float | None = None) -> str:
+        """Save uploaded reference audio in canonical form, return stored filename.
+
+        The clip is decoded once and stored as mono 16-bit PCM at
+        ``SAMPLE_RATE``, trimmed of silence and cut to ``max_seconds``, so
+        generations never decode or resample the original upload. Files
+        soundfile can't decode are stored as sent.
+        """
+        loop = asyncio.get_event_loop()
+        canonical = await loop.run_in_executor(None, canonical_reference, data, max_seconds)
+        if canonical is None:
+            logger.warning(f"Could not decode reference {original_name}; storing it unchanged")
+            ext = Path(original_name).suffix or ".wav"
+        else:
+            data, ext = canonical, ".wav"
         filename = f"ref_{uuid.uuid4().hex}{ext}"
         path = REFERENCES_DIR / filename
         async with aiofiles.open(path, "wb") as f:
             await f.write(data)
         return filename
 
+    async def save_generated(self, data: bytes, peaks: bytes | None = None) -> str:
+        """Store already-encoded WAV bytes and their peaks, return the generated filename.
+
+        ``peaks`` computed along with the audio are stored as given; otherwise
+        they are computed from ``data`` in memory, without reading the file back.
+        """
+        from backend.services.waveform_peaks import peaks_from_file
+
+        filename = self.new_generated_filename()
+        async with aiofiles.open(GENERATED_DIR / filename, "wb") as f:
+            await f.write(data)
+        if peaks is None:
+            peaks = await asyncio.get_event_loop().run_in_executor(None, peaks_from_file, io.BytesIO(data))
+        async with aiofiles.open(self.peaks_path(filename), "wb") as f:
+            await f.write(peaks)
+        return filename
+
+    async def save_chunk(self, key: str, data: bytes) -> None:
+        async with aiofiles.open(self.chunk_path(key), "wb") as f:
+            await f.write(data)
+
+    async def delete_chunk(self, key: str) -> None:
+        path = self.chunk_path(key)
+        if path.exists():
+            path.unlink()
+
     async def delete_generated(self, filename: str) -> None:
         path = GENERATED_DIR / filename
         if path.exists():
             path.unlink()
+        self.peaks_path(filename).unlink(missing_ok=True)
 
     async def delete_reference(self, filename: str) -> None:
         path = REFERENCES_DIR / filename
@@ -0,0 +1,303 @@
+"""Coordinator / worker clustering.
+
+Workers heartbeat their resident variants, queue depth and memory headroom
+to a coordinator. The coordinator sends each generation to the least-loaded
+worker that already has the requested variant loaded, so a request never
+forces a model swap on a node that is serving another variant. Audio comes
+back inline and is stored, with its history entry, on the coordinator.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import psutil
+
+from backend.config import (
+    CLUSTER_TOKEN,
+    CLUSTER_WORKERS,
+    COORDINATOR_URL,
+    WORKER_HEARTBEAT_INTERVAL,
+    WORKER_REQUEST_TIMEOUT,
+    WORKER_TTL,
+    WORKER_URL,
+)
+from backend.services.tts_engine import GenerationResult
+from backend.utils.cancellation import CancelToken, GenerationCancelled
+from backend.utils.exceptions import LoquiError
+
+if TYPE_CHECKING:
+    import httpx
+
+    from backend.services.audio_store import AudioStore
+    from backend.services.model_manager import ModelManager
+    from backend.services.tts_engine import TTSEngine
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_TOKEN_HEADER = "X-Loqui-Cluster-Token"
+
+
+def cluster_headers() -> dict[str, str]:
+    """Headers authenticating this node to other cluster nodes."""
+    return {CLUSTER_TOKEN_HEADER: CLUSTER_TOKEN} if CLUSTER_TOKEN else {}
+
+
+@dataclass
+class WorkerInfo:
+    url: str
+    variants: list[str]
+    queue_depth: int = 0
+    memory_available_bytes: int = 0
+    last_seen: float = 0.0
+    routed: int = 0  # requests this coordinator currently has in flight there
+
+    @property
+    def load(self) -> int:
+        # The heartbeat lags behind; our own in-flight count is always current.
+        return max(self.queue_depth, self.routed)
+
+    def alive(self, now: float) -> bool:
+        return now - self.last_seen <= WORKER_TTL
+
+    def to_dict(self, now: float) -> dict:
+        return {
+            "url": self.url,
+            "variants": self.variants,
+            "queue_depth": self.queue_depth,
+            "routed": self.routed,
+            "memory_available_gb": round(self.memory_available_bytes / 1024 ** 3, 1),
+            "last_seen_seconds": round(now - self.last_seen, 1),
+            "alive": self.alive(now),
+        }
+
+
+class WorkerRegistry:
+    def __init__(self):
+        self._workers: dict[str, WorkerInfo] = {}
+
+    def heartbeat(self, url: str, variants: list[str], queue_depth: int, memory_available_bytes: int) -> None:
+        worker = self._workers.get(url)
+        if worker is None:
+            worker = self._workers[url] = WorkerInfo(url, variants)
+            logger.info(f"Worker registered: {url} ({', '.join(variants) or 'no models'})")
+        worker.variants = variants
+        worker.queue_depth = queue_depth
+        worker.memory_available_bytes = memory_available_bytes
+        worker.last_seen = time.monotonic()
+
+    def remove(self, url: str) -> None:
+        if self._workers.pop(url, None):
+            logger.info(f"Worker removed: {url}")
+
+    def candidates(self, variant: str) -> list[WorkerInfo]:
+        """Live workers with ``variant`` resident, least loaded first."""
+        now = time.monotonic()
+        workers = [w for w in self._workers.values() if w.alive(now) and variant in w.variants]
+        return sorted(workers, key=lambda w: (w.load, -w.memory_available_bytes))
+
+    def resident_variants(self) -> set[str]:
+        """Variants loaded on at least one live worker."""
+        now = time.monotonic()
+        return {v for w in self._workers.values() if w.alive(now) for v in w.variants}
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [w.to_dict(now) for w in self._workers.values()]
+
+
+class Coordinator:
+    """Routes generations to workers.
+
+    Workers register by heartbeat; those in ``workers`` (``CLUSTER_WORKERS``)
+    are also polled, so they are known without waiting for a heartbeat.
+    """
+
+    def __init__(self, audio_store: AudioStore, workers: list[str] = CLUSTER_WORKERS):
+        self.registry = WorkerRegistry()
+        self._audio_store = audio_store
+        self._workers = workers
+        self._client: httpx.AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(timeout=WORKER_REQUEST_TIMEOUT)
+        return self._client
+
+    async def start(self):
+        if self._workers:
+            self._task = asyncio.create_task(self._poll())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _poll_worker(self, url: str) -> None:
+        import httpx
+
+        try:
+            resp = await self._http().get(f"{url}/api/cluster/node", headers=cluster_headers(), timeout=5.0)
+            resp.raise_for_status()
+        except httpx.HTTPError:
+            return  # left to expire after WORKER_TTL
+        state = resp.json()
+        self.registry.heartbeat(url, state["variants"], state["queue_depth"], state["memory_available_bytes"])
+
+    async def _poll(self):
+        while True:
+            await asyncio.gather(*(self._poll_worker(url) for url in self._workers))
+            await asyncio.sleep(WORKER_HEARTBEAT_INTERVAL)
+
+    async def generate(
+        self,
+        variant: str,
+        fields: dict,
+        reference: tuple[str, bytes] | None,
+        persist: bool,
+        inline: bool,
+        cancel: CancelToken | None = None,
+    ) -> GenerationResult | None:
+        """Run a generation on a worker; ``None`` if no worker has the variant.
+
+        Workers that can't be reached or are draining for shutdown are
+        dropped and the next candidate is tried. Errors returned by a worker are passed through unchanged.
+        Cancelling closes the connection, which cancels the job on the worker.
+        """
+        import httpx
+
+        for worker in self.registry.candidates(variant):
+            data = {k: str(v) for k, v in fields.items() if v is not None}
+            data.update({"variant": variant, "return": "inline", "persist": "false"})
+            files = {"reference_audio": reference} if reference else None
+
+            # Let the worker enforce the deadline rather than timing out here.
+            timeout = max(WORKER_REQUEST_TIMEOUT, (fields.get("deadline_seconds") or 0) + 30)
+            worker.routed += 1
+            request = asyncio.ensure_future(
+                self._http().post(f"{worker.url}/api/tts/generate", data=data, files=files, timeout=timeout)
+            )
+            if cancel:
+                cancel.on_cancel(request.cancel)
+            try:
+                resp = await request
+            except asyncio.CancelledError:
+                if cancel and cancel.cancelled:
+                    raise GenerationCancelled(cancel.reason or "cancelled")
+                raise
+            except httpx.TransportError as e:
+                logger.warning(f"Worker {worker.url} unreachable: {e}")
+                self.registry.remove(worker.url)
+                continue
+            finally:
+                worker.routed -= 1
+                if cancel:
+                    cancel.remove_callback(request.cancel)
+
+            if resp.status_code == 503 and resp.headers.get("x-loqui-draining"):
+                logger.info(f"Worker {worker.url} is draining")
+                self.registry.remove(worker.url)
+                continue
+            if resp.status_code != 200:
+                try:
+                    detail = resp.json().get("detail", resp.text)
+                except ValueError:
+                    detail = resp.text
+                raise LoquiError(str(detail), status_code=resp.status_code)
+
+            filename = await self._audio_store.save_generated(resp.content) if persist else None
+            return _result_from_headers(resp.headers, resp.content, filename, inline, worker.url)
+        return None
+
+
+def _result_from_headers(headers, content: bytes, filename: str | None, inline: bool, worker: str) -> GenerationResult:
+    ratio = headers.get("x-loqui-cache-hit-ratio")
+    postprocess = headers.get("x-loqui-postprocess-ms")
+    return GenerationResult(
+        audio_filename=filename,
+        duration_seconds=float(headers["x-loqui-duration-seconds"]),
+        generation_time_seconds=float(headers["x-loqui-generation-time-seconds"]),
+        sample_rate=int(headers["x-loqui-sample-rate"]),
+        audio_format=headers.get("x-loqui-audio-format", "pcm16"),
+        audio_bytes=memoryview(content) if inline else None,
+        cache_hit_ratio=float(ratio) if ratio is not None else None,
+        postprocess_ms={
+            k: float(v) for k, v in (item.split("=") for item in postprocess.split(","))
+        } if postprocess else None,
+        worker=worker,
+        limit_reached=headers.get("x-loqui-limit-reached"),
+    )
+
+
+class WorkerAgent:
+    """Heartbeats this node's state to the coordinator."""
+
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        tts_engine: TTSEngine,
+        coordinator_url: str = COORDINATOR_URL,
+        worker_url: str = WORKER_URL,
+        interval: float = WORKER_HEARTBEAT_INTERVAL,
+    ):
+        self._model_manager = model_manager
+        self._tts_engine = tts_engine
+        self.coordinator_url = coordinator_url.rstrip("/")
+        self.worker_url = worker_url.rstrip("/")
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        self._stopped = False
+
+    def payload(self) -> dict:
+        """This node's state. A stopped (draining) agent advertises no variants."""
+        return {
+            "url": self.worker_url,
+            "variants": [] if self._stopped else self._model_manager.resident_variants(),
+            "queue_depth": self._tts_engine.in_flight,
+            "memory_available_bytes": psutil.virtual_memory().available,
+        }
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopped = True
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(timeout=2.0, headers=cluster_headers()) as client:
+                await client.delete(f"{self.coordinator_url}/api/cluster/workers", params={"url": self.worker_url})
+        except httpx.HTTPError:
+            pass
+
+    async def _run(self):
+        import httpx
+
+        connected: bool | None = None  # None until the first attempt
+        async with httpx.AsyncClient(timeout=5.0, headers=cluster_headers()) as client:
+            while True:
+                try:
+                    resp = await client.post(f"{self.coordinator_url}/api/cluster/workers", json=self.payload())
+                    resp.raise_for_status()
+                except httpx.HTTPError as e:
+                    if connected is not False:
+                        logger.warning(f"Can't reach coordinator at {self.coordinator_url}: {e}")
+                    connected = False
+                else:
+                    if not connected:
+                        logger.info(f"Registered with coordinator at {self.coordinator_url}")
+                    connected = True
+                await asyncio.sleep(self.interval)
@@ -1,10 +1,21 @@
-"""Detect compute device — MLX on Apple Silicon."""
+"""Detect compute device — MLX on Apple Silicon, PyTorch on CPU elsewhere."""
+
+import platform
+
+from backend.config import DEFAULT_BACKEND
 
 
 def detect_device() -> dict:
-    """Return MLX device info for Apple Silicon."""
+    """Return info for the default inference backend's device."""
+    if DEFAULT_BACKEND == "mlx":
+        return {
+            "device": "mlx",
+            "name": "Apple Silicon",
+            "label": "Apple Silicon (MLX)",
+        }
+    name = platform.processor() or platform.machine() or "CPU"
     return {
-        "device": "mlx",
-        "name": "Apple Silicon",
-        "label": "Apple Silicon (MLX)",
+        "device": "cpu",
+        "name": name,
+        "label": f"{name} (PyTorch CPU)",
     }
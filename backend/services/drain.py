@@ -0,0 +1,121 @@
+"""Graceful drain before shutdown.
+
+Generation requests hold a slot (``admit`` / ``release``) from the time
+they are accepted until their response, history entry included, is
+ready. Draining stops handing out slots, so readiness turns false and
+new generations get 503, then waits for the held ones. A worker leaves
+its coordinator first so no more requests are routed to it. Whatever
+is still running after the grace period is cancelled.
+
+SIGTERM / SIGINT start a drain and hand the signal on to uvicorn once it
+completes, so uvicorn only stops listening when nothing is left in
+flight. A second signal skips the wait.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+from typing import TYPE_CHECKING
+
+from backend.config import DRAIN_CANCEL_SECONDS, DRAIN_RETRY_AFTER_SECONDS, SHUTDOWN_GRACE_SECONDS
+from backend.utils.exceptions import ServiceDrainingError
+
+if TYPE_CHECKING:
+    from backend.services.cluster import WorkerAgent
+    from backend.services.jobs import JobRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class DrainController:
+    def __init__(self, job_registry: JobRegistry, worker_agent: WorkerAgent | None = None):
+        self._jobs = job_registry
+        self._worker = worker_agent
+        self.draining = False
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: asyncio.Task | None = None
+
+    def admit(self) -> None:
+        """Take a generation slot; raises ``ServiceDrainingError`` (503) while draining."""
+        if self.draining:
+            raise ServiceDrainingError(DRAIN_RETRY_AFTER_SECONDS)
+        self.in_flight += 1
+        self._idle.clear()
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    def status(self) -> dict:
+        return {"ready": not self.draining, "draining": self.draining, "in_flight": self.in_flight}
+
+    def drain(self, grace: float = SHUTDOWN_GRACE_SECONDS) -> asyncio.Task:
+        """Start draining (once); the returned task completes when nothing is in flight."""
+        if self._task is None:
+            self.draining = True
+            self._task = asyncio.create_task(self._drain(grace))
+        return self._task
+
+    async def _drain(self, grace: float) -> None:
+        logger.info(f"Draining: waiting up to {grace:g}s for {self.in_flight} generation(s)")
+        if self._worker:
+            await self._worker.stop()
+        try:
+            await asyncio.wait_for(self._idle.wait(), grace)
+        except asyncio.TimeoutError:
+            logger.warning(f"Grace period over; cancelling {self.in_flight} generation(s)")
+            for job in self._jobs.active():
+                self._jobs.cancel(job["job_id"], "shutdown")
+            try:
+                await asyncio.wait_for(self._idle.wait(), DRAIN_CANCEL_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"{self.in_flight} generation(s) still running at shutdown")
+        logger.info("Drained")
+
+    async def shutdown(self) -> None:
+        """Drain, then stop the server."""
+        await self.drain()
+        os.kill(os.getpid(), signal.SIGINT)
+
+    def install_signal_handlers(self) -> None:
+        """Drain on SIGTERM / SIGINT before passing the signal to the previous handler.
+
+        Does nothing outside the main thread, where signals can't be handled.
+        """
+        loop = asyncio.get_running_loop()
+        previous: dict[int, object] = {}
+
+        def forward(signum: int) -> None:
+            handler = previous[signum]
+            if callable(handler):
+                handler(signum, None)
+            else:
+                signal.signal(signum, handler)
+                signal.raise_signal(signum)
+
+        async def drain_then_forward(signum: int) -> None:
+            await self.drain()
+            forward(signum)
+
+        signalled = False
+
+        def handle(signum, frame):
+            nonlocal signalled
+            if signalled:
+                forward(signum)
+                return
+            signalled = True
+            loop.call_soon_threadsafe(lambda: asyncio.ensure_future(drain_then_forward(signum)))
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                previous[sig] = signal.getsignal(sig)
+                signal.signal(sig, handle)
+            except ValueError:
+                return
@@ -0,0 +1,323 @@
+"""Streaming export / import of generation history as a tar archive.
+
+Layout, repeated per batch of ``HISTORY_ARCHIVE_BATCH`` records::
+
+    audio/generated/<file>.wav     audio of the batch's records
+    audio/references/<file>        their reference clips
+    history/<n>.jsonl              the batch's records, one JSON object per line
+
+Audio precedes the records that point to it, so an import that stops midway
+never leaves a history entry without its audio. Both directions work on
+one batch and one file chunk at a time: memory stays constant whatever
+the archive size, and the server keeps serving throughout.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tarfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator
+
+import aiofiles
+from sqlalchemy import select
+
+from backend.config import GENERATED_DIR, HISTORY_ARCHIVE_BATCH, HISTORY_ARCHIVE_CHUNK, REFERENCES_DIR
+from backend.db.database import async_session
+from backend.db.models import GenerationRecord
+from backend.services.analytics import update_rollups
+
+if TYPE_CHECKING:
+    from backend.services.audio_store import AudioStore
+
+logger = logging.getLogger(__name__)
+
+BLOCK = tarfile.BLOCKSIZE
+_AUDIO_DIRS = {"audio/generated": GENERATED_DIR, "audio/references": REFERENCES_DIR}
+_COLUMNS = [c.name for c in GenerationRecord.__table__.columns]
+# Columns an imported record must provide, and the JSON types they accept
+_REQUIRED = {
+    c.name: (int, float) if c.type.python_type is float else c.type.python_type
+    for c in GenerationRecord.__table__.columns
+    if not c.nullable and c.default is None and not c.primary_key
+}
+
+
+def _header(name: str, size: int, mtime: float | None = None) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(mtime if mtime is not None else time.time())
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _padding(size: int) -> bytes:
+    return bytes(-size % BLOCK)
+
+
+def _record_to_dict(record: GenerationRecord) -> dict:
+    row = {name: getattr(record, name) for name in _COLUMNS}
+    if isinstance(row["created_at"], datetime):
+        row["created_at"] = row["created_at"].isoformat()
+    return row
+
+
+async def _file_member(name: str, path: Path) -> AsyncIterator[bytes]:
+    """Header, contents in chunks, and padding for one file. Nothing if it is gone."""
+    try:
+        f = await aiofiles.open(path, "rb")
+    except FileNotFoundError:
+        return
+    try:
+        st = os.fstat(f.fileno())
+        yield _header(name, st.st_size, st.st_mtime)
+        remaining = st.st_size
+        while remaining > 0:
+            chunk = await f.read(min(HISTORY_ARCHIVE_CHUNK, remaining))
+            if not chunk:  # truncated while reading: keep the archive well-formed
+                chunk = bytes(min(HISTORY_ARCHIVE_CHUNK, remaining))
+            remaining -= len(chunk)
+            yield chunk
+        yield _padding(st.st_size)
+    finally:
+        await f.close()
+
+
+async def export_history(audio_store: AudioStore) -> AsyncIterator[bytes]:
+    """Yield a tar archive of every history record with its audio."""
+    last_id = ""
+    batch_no = exported = 0
+    while True:
+        async with async_session() as session:
+            result = await session.execute(
+                select(GenerationRecord)
+                .where(GenerationRecord.id > last_id)
+                .order_by(GenerationRecord.id)
+                .limit(HISTORY_ARCHIVE_BATCH)
+            )
+            records = list(result.scalars().all())
+        if not records:
+            break
+        last_id = records[-1].id
+
+        lines = []
+        for record in records:
+            path = audio_store.generated_path(record.audio_filename)
+            if not path.exists():
+                continue  # deleted since the batch was read
+            async for chunk in _file_member(f"audio/generated/{record.audio_filename}", path):
+                yield chunk
+            if record.reference_filename:
+                ref = audio_store.reference_path(record.reference_filename)
+                async for chunk in _file_member(f"audio/references/{record.reference_filename}", ref):
+                    yield chunk
+            lines.append(json.dumps(_record_to_dict(record), ensure_ascii=False))
+
+        if lines:
+            data = ("\n".join(lines) + "\n").encode()
+            yield _header(f"history/{batch_no:06d}.jsonl", len(data))
+            yield data
+            yield _padding(len(data))
+            batch_no += 1
+            exported += len(lines)
+
+    yield bytes(2 * BLOCK)  # end-of-archive marker
+    logger.info(f"Exported {exported} history records")
+
+
+class _Reader:
+    """Pull exact byte counts out of an async stream of arbitrary chunks."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._buf = bytearray()
+        self._eof = False
+
+    async def _fill(self, n: int) -> None:
+        while len(self._buf) < n and not self._eof:
+            try:
+                self._buf += await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self._eof = True
+
+    async def read(self, n: int) -> bytes:
+        await self._fill(n)
+        data = bytes(self._buf[:n])
+        del self._buf[:n]
+        return data
+
+    async def iter_exact(self, n: int) -> AsyncIterator[bytes]:
+        """Yield exactly ``n`` bytes in chunks, then skip the member padding."""
+        remaining = n
+        while remaining > 0:
+            await self._fill(1)
+            if not self._buf:
+                raise ValueError("Archive ended inside a file")
+            take = min(remaining, len(self._buf), HISTORY_ARCHIVE_CHUNK)
+            data = bytes(self._buf[:take])
+            del self._buf[:take]
+            remaining -= take
+            yield data
+        await self.read(-n % BLOCK)
+
+    async def skip(self, n: int) -> None:
+        async for _ in self.iter_exact(n):
+            pass
+
+
+def _audio_target(name: str) -> Path | None:
+    """Destination for an audio member, or None if it isn't one (no path traversal)."""
+    parent, _, filename = name.rpartition("/")
+    directory = _AUDIO_DIRS.get(parent)
+    if directory is None or not filename or filename != Path(filename).name or filename.startswith("."):
+        return None
+    return directory / filename
+
+
+async def _store_file(reader: _Reader, size: int, target: Path) -> bool:
+    """Write a member to ``target`` unless it exists; False if it was skipped."""
+    if target.exists():
+        await reader.skip(size)
+        return False
+    tmp = target.with_name(f".{uuid.uuid4().hex}.tmp")
+    try:
+        async with aiofiles.open(tmp, "wb") as f:
+            async for chunk in reader.iter_exact(size):
+                await f.write(chunk)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return True
+
+
+def _parse_record(line: str, where: str) -> dict:
+    """One JSONL history record; ``ValueError`` naming ``where`` if it can't be imported."""
+    try:
+        row = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"Invalid history record at {where}: {e}")
+    if not isinstance(row, dict):
+        raise ValueError(f"Invalid history record at {where}: not an object")
+    missing = [name for name in _REQUIRED if row.get(name) is None]
+    if missing:
+        raise ValueError(f"Invalid history record at {where}: missing {', '.join(missing)}")
+    wrong = [
+        name for name, kind in _REQUIRED.items()
+        if isinstance(row[name], bool) or not isinstance(row[name], kind)
+    ]
+    if wrong:
+        raise ValueError(f"Invalid history record at {where}: wrong type for {', '.join(wrong)}")
+    if row.get("created_at") is not None:
+        try:
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid history record at {where}: bad created_at")
+    return {k: v for k, v in row.items() if k in _COLUMNS}
+
+
+async def _insert_records(lines: list[str], audio_store: AudioStore, stats: dict, source: str, first_line: int) -> None:
+    """Insert a batch of JSONL records. The whole batch is checked first, so a bad one inserts nothing."""
+    rows = [
+        _parse_record(line, f"{source}:{first_line + i}")
+        for i, line in enumerate(lines) if line.strip()
+    ]
+    async with async_session() as session:
+        ids = [r["id"] for r in rows if r.get("id")]
+        existing = set((await session.execute(
+            select(GenerationRecord.id).where(GenerationRecord.id.in_(ids))
+        )).scalars().all())
+        added = []
+        for row in rows:
+            if row.get("id") in existing:
+                stats["duplicates"] += 1
+            elif not row.get("audio_filename") or not audio_store.generated_path(row["audio_filename"]).exists():
+                stats["missing_audio"] += 1
+            else:
+                record = GenerationRecord(**row)
+                session.add(record)
+                added.append(record)
+                existing.add(row["id"])
+                stats["imported"] += 1
+        await session.flush()
+        await update_rollups(session, added)
+        await session.commit()
+
+
+async def import_history(chunks: AsyncIterator[bytes], audio_store: AudioStore) -> dict:
+    """Ingest an archive from ``export_history``, skipping records whose id exists.
+
+    Records are committed per batch, so a partial upload keeps everything
+    up to its last complete batch.
+    """
+    reader = _Reader(chunks)
+    stats = {"imported": 0, "duplicates": 0, "missing_audio": 0, "files_written": 0, "files_skipped": 0}
+    long_name: str | None = None
+    while True:
+        block = await reader.read(BLOCK)
+        if len(block) < BLOCK or block == bytes(BLOCK):
+            break
+        try:
+            info = tarfile.TarInfo.frombuf(block, tarfile.ENCODING, "surrogateescape")
+        except tarfile.HeaderError as e:
+            raise ValueError(f"Not a tar archive: {e}")
+
+        if info.type in (tarfile.XHDTYPE, tarfile.XGLTYPE):
+            data = b"".join([c async for c in reader.iter_exact(info.size)])
+            if info.type == tarfile.XHDTYPE:
+                long_name = _pax_path(data) or long_name
+            continue
+        if info.type == tarfile.GNUTYPE_LONGNAME:
+            data = b"".join([c async for c in reader.iter_exact(info.size)])
+            long_name = data.rstrip(b"\0").decode("utf-8", "surrogateescape")
+            continue
+
+        name, long_name = long_name or info.name, None
+        if not info.isfile():
+            await reader.skip(info.size if info.type in tarfile.REGULAR_TYPES else 0)
+            continue
+        if name.startswith("history/") and name.endswith(".jsonl"):
+            lines = []
+            line_no = 1
+            pending = b""
+            async for chunk in reader.iter_exact(info.size):
+                pending += chunk
+                *complete, pending = pending.split(b"\n")
+                lines.extend(line.decode() for line in complete)
+                if len(lines) >= HISTORY_ARCHIVE_BATCH:
+                    await _insert_records(lines, audio_store, stats, name, line_no)
+                    line_no += len(lines)
+                    lines = []
+            if pending:
+                lines.append(pending.decode())
+            await _insert_records(lines, audio_store, stats, name, line_no)
+        elif (target := _audio_target(name)) is not None:
+            if await _store_file(reader, info.size, target):
+                stats["files_written"] += 1
+            else:
+                stats["files_skipped"] += 1
+        else:
+            await reader.skip(info.size)
+
+    logger.info(
+        f"Imported {stats['imported']} history records "
+        f"({stats['duplicates']} duplicates, {stats['missing_audio']} without audio)"
+    )
+    return stats
+
+
+def _pax_path(data: bytes) -> str | None:
+    """The ``path`` keyword of a PAX extended header, if present."""
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        length = int(data[pos:space])
+        keyword, _, value = data[space + 1:pos + length - 1].partition(b"=")
+        if keyword == b"path":
+            return value.decode("utf-8", "surrogateescape")
+        pos += length
+    return None
@@ -6,6 +6,7 @@ from sqlalchemy import delete, desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.db.models import GenerationRecord
+from backend.services.analytics import clear_rollups, update_rollups
 from backend.services.audio_store import AudioStore
 
 
@@ -16,6 +17,8 @@ class HistoryService:
     async def create(self, session: AsyncSession, **kwargs) -> GenerationRecord:
         record = GenerationRecord(**kwargs)
         session.add(record)
+        await session.flush()
+        await update_rollups(session, [record])
         await session.commit()
         await session.refresh(record)
         return record
@@ -33,6 +36,41 @@ class HistoryService:
         records = list(result.scalars().all())
         return records, total or 0
 
+    async def list_columns(
+        self,
+        session: AsyncSession,
+        columns: list[str],
+        limit: int = 50,
+        offset: int = 0,
+        text_limit: int | None = None,
+    ) -> tuple[list[dict], int]:
+        """Newest-first rows as plain dicts with only ``columns`` selected.
+
+        With ``text_limit`` the text is cut in SQL, so long texts are never
+        loaded; cut texts end with an ellipsis.
+        """
+        selected = []
+        for name in columns:
+            column = getattr(GenerationRecord, name)
+            if name == "text" and text_limit is not None:
+                selected.append(func.substr(column, 1, text_limit).label("text"))
+                selected.append(func.length(column).label("_text_length"))
+            else:
+                selected.append(column)
+        total = await session.scalar(select(func.count(GenerationRecord.id)))
+        result = await session.execute(
+            select(*selected)
+            .order_by(desc(GenerationRecord.created_at))
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = [dict(row) for row in result.mappings()]
+        if text_limit is not None and "text" in columns:
+            for row in rows:
+                if row.pop("_text_length") > text_limit:
+                    row["text"] += "…"
+        return rows, total or 0
+
     async def get(self, session: AsyncSession, record_id: str) -> GenerationRecord | None:
         return await session.get(GenerationRecord, record_id)
 
@@ -44,6 +82,7 @@ class HistoryService:
         await self._audio_store.delete_generated(record.audio_filename)
         if record.reference_filename:
             await self._audio_store.delete_reference(record.reference_filename)
+        await update_rollups(session, [record], sign=-1)
         await session.delete(record)
         await session.commit()
         return True
@@ -56,5 +95,6 @@ class HistoryService:
             await self._audio_store.delete_generated(record.audio_filename)
         count = len(records)
         await session.execute(delete(GenerationRecord))
+        await clear_rollups(session)
         await session.commit()
         return count
@@ -0,0 +1,250 @@
+"""Inference backends: how a variant's model is loaded, run and freed.
+
+``MLXBackend`` runs the mlx-community conversions through mlx-audio on
+Apple Silicon. ``CPUBackend`` runs the original PyTorch checkpoints
+(``chatterbox-tts``, ``qwen-tts``) on any machine, with ``CPU_THREADS``
+controlling intra-op parallelism. ``MODEL_BACKENDS`` in ``config`` picks a
+backend per variant.
+
+Nothing here imports a framework at module load.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import sys
+import threading
+import weakref
+from typing import Any, Iterator
+
+from backend.config import CPU_THREADS, MODEL_BACKENDS, QWEN_LANGUAGES, is_qwen_variant, model_repo
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBackend:
+    """Interface implemented by each backend. Methods run in the thread pool."""
+
+    name: str
+
+    def import_runtime(self) -> None:
+        """Import the framework (slow native libraries) ahead of the first load."""
+        raise NotImplementedError
+
+    def load(self, variant: str) -> Any:
+        """Load a variant's model from the HuggingFace cache (downloading if missing)."""
+        raise NotImplementedError
+
+    def generate(
+        self,
+        model: Any,
+        variant: str,
+        text: str,
+        language: str | None = None,
+        exaggeration: float = 0.5,
+        cfg_weight: float = 0.5,
+        temperature: float = 0.8,
+        speed: float = 1.0,
+        ref_path: str | None = None,
+        ref_text: str | None = None,
+    ) -> Iterator[Any]:
+        """Yield audio chunks (array-likes of float samples) as they are produced.
+
+        The caller stops between chunks by closing the generator.
+        """
+        raise NotImplementedError
+
+    def native_speed(self, variant: str) -> bool:
+        """Whether ``speed`` is applied by the model (otherwise it is time-stretched)."""
+        return False
+
+    def memory_stats(self) -> dict[str, int]:
+        """Bytes of ``active``, ``peak`` and ``cache`` memory held by the framework."""
+        return {"active": 0, "peak": 0, "cache": 0}
+
+    def clear_cache(self) -> None:
+        """Release memory freed by unloaded models back to the system."""
+
+
+class MLXBackend(InferenceBackend):
+    name = "mlx"
+
+    def import_runtime(self) -> None:
+        import mlx.core  # noqa: F401
+        import mlx_audio.tts.generate  # noqa: F401
+
+    def load(self, variant: str) -> Any:
+        from mlx_audio.tts.generate import load_model
+
+        return load_model(model_repo(variant), lazy=False)
+
+    def generate(
+        self,
+        model: Any,
+        variant: str,
+        text: str,
+        language: str | None = None,
+        exaggeration: float = 0.5,
+        cfg_weight: float = 0.5,
+        temperature: float = 0.8,
+        speed: float = 1.0,
+        ref_path: str | None = None,
+        ref_text: str | None = None,
+    ) -> Iterator[Any]:
+        if is_qwen_variant(variant):
+            kwargs: dict = {
+                "text": text,
+                "lang_code": QWEN_LANGUAGES.get(language or "en", "english"),
+                "temperature": temperature,
+                "speed": speed,
+            }
+            if ref_path:
+                kwargs["ref_audio"] = ref_path
+            if ref_text:
+                kwargs["ref_text"] = ref_text
+        else:
+            # Chatterbox turbo has no native speed control; the
+            # post-processing stage time-stretches instead
+            kwargs = {"text": text, "temperature": temperature}
+            if ref_path:
+                kwargs["ref_audio"] = ref_path
+
+        stream = model.generate(**kwargs)
+        try:
+            for result in stream:
+                yield result.audio
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+    def native_speed(self, variant: str) -> bool:
+        return is_qwen_variant(variant)
+
+    def memory_stats(self) -> dict[str, int]:
+        mx = sys.modules.get("mlx.core")
+        if mx is None:
+            return super().memory_stats()
+        # Prefer new API, fall back to deprecated
+        api = mx if hasattr(mx, "get_active_memory") else mx.metal
+        try:
+            return {
+                "active": api.get_active_memory(),
+                "peak": api.get_peak_memory(),
+                "cache": api.get_cache_memory(),
+            }
+        except Exception:
+            return super().memory_stats()
+
+    def clear_cache(self) -> None:
+        mx = sys.modules.get("mlx.core")
+        if mx is not None:
+            mx.metal.clear_cache()
+
+
+class CPUBackend(InferenceBackend):
+    """PyTorch on CPU.
+
+    The PyTorch models generate a whole utterance per call, so text is fed
+    sentence by sentence: chunks stream out and cancellation takes effect
+    between sentences. The reference voice is prepared once per request.
+    Generation on a model is serialized (conditioning lives on the model
+    object); each call already uses ``CPU_THREADS`` cores.
+    """
+
+    name = "cpu"
+
+    def __init__(self):
+        self._locks: weakref.WeakKeyDictionary[Any, threading.Lock] = weakref.WeakKeyDictionary()
+
+    def import_runtime(self) -> None:
+        import torch
+
+        if CPU_THREADS:
+            torch.set_num_threads(CPU_THREADS)
+        logger.info(f"PyTorch CPU backend using {torch.get_num_threads()} threads")
+
+    def load(self, variant: str) -> Any:
+        import torch
+
+        if is_qwen_variant(variant):
+            from qwen_tts import Qwen3TTSModel
+
+            model = Qwen3TTSModel.from_pretrained(model_repo(variant), device_map="cpu", dtype=torch.float32)
+        else:
+            from chatterbox.tts_turbo import ChatterboxTurboTTS
+
+            model = ChatterboxTurboTTS.from_pretrained(device="cpu")
+        self._locks[model] = threading.Lock()
+        return model
+
+    def generate(
+        self,
+        model: Any,
+        variant: str,
+        text: str,
+        language: str | None = None,
+        exaggeration: float = 0.5,
+        cfg_weight: float = 0.5,
+        temperature: float = 0.8,
+        speed: float = 1.0,
+        ref_path: str | None = None,
+        ref_text: str | None = None,
+    ) -> Iterator[Any]:
+        import torch
+
+        from backend.services.phrase_cache import split_segments
+
+        sentences = split_segments(text) or [text]
+        lock = self._locks.setdefault(model, threading.Lock())
+        with lock, torch.inference_mode():
+            if is_qwen_variant(variant):
+                if not ref_path:
+                    raise ValueError("Qwen voice cloning on the CPU backend needs reference audio")
+                prompt = model.create_voice_clone_prompt(
+                    ref_audio=ref_path, ref_text=ref_text, x_vector_only_mode=not ref_text,
+                )
+                lang = QWEN_LANGUAGES.get(language or "en", "english").capitalize()
+                for sentence in sentences:
+                    wavs, _ = model.generate_voice_clone(
+                        text=sentence, language=lang, voice_clone_prompt=prompt, temperature=temperature,
+                    )
+                    yield wavs[0]
+            else:
+                if ref_path:
+                    model.prepare_conditionals(ref_path)
+                for sentence in sentences:
+                    wav = model.generate(sentence, temperature=temperature)
+                    yield wav.squeeze(0).numpy()
+
+    def memory_stats(self) -> dict[str, int]:
+        import psutil
+
+        rss = psutil.Process().memory_info().rss
+        return {"active": rss, "peak": rss, "cache": 0}
+
+    def clear_cache(self) -> None:
+        gc.collect()
+
+
+_BACKENDS: dict[str, type[InferenceBackend]] = {"mlx": MLXBackend, "cpu": CPUBackend}
+_instances: dict[str, InferenceBackend] = {}
+
+
+def get_backend(name: str) -> InferenceBackend:
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name} (available: {', '.join(_BACKENDS)})")
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
+
+
+def backend_for(variant: str) -> InferenceBackend:
+    """The backend configured for ``variant``."""
+    return get_backend(MODEL_BACKENDS[variant])
+
+
+def configured_backends() -> list[InferenceBackend]:
+    """Every backend some variant is configured to use."""
+    return [get_backend(name) for name in dict.fromkeys(MODEL_BACKENDS.values())]
@@ -0,0 +1,98 @@
+"""Tracking of in-flight generation jobs, their cancellation and metrics."""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+from backend.utils.cancellation import CancelToken
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    id: str
+    variant: str
+    token: CancelToken = field(default_factory=CancelToken)
+    started_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "variant": self.variant,
+            "running_seconds": round(time.monotonic() - self.started_at, 2),
+            "cancelling": self.token.cancelled,
+        }
+
+
+class JobRegistry:
+    def __init__(self):
+        self._jobs: dict[str, Job] = {}
+        self._counts: Counter[str] = Counter()
+        self._cancel_reasons: Counter[str] = Counter()
+        self._cancelled_seconds = 0.0
+        self._limits: Counter[str] = Counter()
+        self._ws_manager = None
+
+    def set_ws_manager(self, ws_manager):
+        self._ws_manager = ws_manager
+
+    def _publish(self, job: Job, status: str, **extra):
+        if self._ws_manager:
+            self._ws_manager.publish({
+                "event": "job_status", "job_id": job.id, "variant": job.variant, "status": status, **extra,
+            })
+
+    def start(self, variant: str, job_id: str | None = None) -> Job:
+        """Register a job. Client-chosen ids must be unique among running jobs."""
+        job_id = job_id or uuid.uuid4().hex
+        if job_id in self._jobs:
+            raise ValueError(f"Job {job_id} is already running")
+        job = self._jobs[job_id] = Job(job_id, variant)
+        self._counts["started"] += 1
+        self._publish(job, "running")
+        return job
+
+    def finish(self, job: Job, outcome: str) -> None:
+        """Record a job's outcome: ``completed``, ``failed`` or ``cancelled``."""
+        self._jobs.pop(job.id, None)
+        self._counts[outcome] += 1
+        elapsed = time.monotonic() - job.started_at
+        if outcome == "cancelled":
+            reason = job.token.reason or "cancelled"
+            self._cancel_reasons[reason] += 1
+            self._cancelled_seconds += elapsed
+            logger.info(f"Job {job.id} cancelled after {elapsed:.1f}s ({reason})")
+            self._publish(job, outcome, reason=reason)
+        else:
+            self._publish(job, outcome)
+
+    def record_limit(self, limit: str) -> None:
+        """Count a deadline / output-length breach (failed or returned partial)."""
+        self._limits[limit] += 1
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> bool:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.token.cancel(reason)
+        return True
+
+    def active(self) -> list[dict]:
+        return [job.to_dict() for job in self._jobs.values()]
+
+    def metrics(self) -> dict:
+        return {
+            "running": len(self._jobs),
+            "started": self._counts["started"],
+            "completed": self._counts["completed"],
+            "failed": self._counts["failed"],
+            "cancelled": self._counts["cancelled"],
+            "cancelled_by_reason": dict(self._cancel_reasons),
+            "cancelled_seconds": round(self._cancelled_seconds, 2),
+            "limit_reached": dict(self._limits),
+        }
@@ -1,18 +1,30 @@
-"""Model lifecycle management for MLX Audio Chatterbox variants."""
+"""Model lifecycle management for the TTS variants, on their configured backends."""
 
 from __future__ import annotations
 
 import asyncio
 import logging
-import os
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from enum import Enum
-from pathlib import Path
 from typing import Any
 
-import mlx.core as mx
-
-from backend.config import MODEL_REPOS, MODEL_SIZES_BYTES
+import psutil
+
+from backend.config import (
+    MEMORY_PRESSURE_PERCENT,
+    MODEL_BACKENDS,
+    MODEL_IDLE_UNLOAD_SECONDS,
+    MODEL_REPOS,
+    MODEL_SIZES_BYTES,
+    MODEL_WATCHDOG_INTERVAL,
+    WARMUP_TEXT,
+    model_repo,
+)
+from backend.services.inference import backend_for, configured_backends
+from backend.services.model_prefetch import ModelPrefetcher, repo_cache_dir
+from backend.utils.exceptions import MemoryPressureError
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +34,9 @@ class ModelStatus(str, Enum):
     DOWNLOADING = "downloading"
     DOWNLOADED = "downloaded"
     LOADING = "loading"
+    WARMING = "warming"
     LOADED = "loaded"
+    DRAINING = "draining"
     UNLOADING = "unloading"
     ERROR = "error"
 
@@ -33,25 +47,19 @@ class ModelState:
     model: Any = None
     error: str | None = None
     download_progress: float = 0.0
+    last_used: float = 0.0  # time.monotonic() of the last lease
 
 
-def _hf_cache_dir() -> Path:
-    """Get the HuggingFace Hub cache directory."""
-    for env in ("HF_HUB_CACHE", "HUGGINGFACE_HUB_CACHE"):
-        val = os.environ.get(env)
-        if val:
-            return Path(val)
-    hf_home = os.environ.get("HF_HOME")
-    if hf_home:
-        return Path(hf_home) / "hub"
-    return Path.home() / ".cache" / "huggingface" / "hub"
+def _import_runtime() -> None:
+    for backend in configured_backends():
+        backend.import_runtime()
+    import numpy  # noqa: F401
+    import soundfile  # noqa: F401
 
 
 def _is_model_cached(repo: str) -> bool:
     """Check if a model's files exist in the HuggingFace cache."""
-    cache = _hf_cache_dir()
-    model_dir = cache / f"models--{repo.replace('/', '--')}"
-    snapshots = model_dir / "snapshots"
+    snapshots = repo_cache_dir(repo) / "snapshots"
     if not snapshots.exists():
         return False
     for snapshot in snapshots.iterdir():
@@ -60,27 +68,19 @@ def _is_model_cached(repo: str) -> bool:
     return False
 
 
-def _get_cache_size(repo: str) -> int:
-    """Get total size of cached (non-symlink) files for a model."""
-    cache = _hf_cache_dir()
-    model_dir = cache / f"models--{repo.replace('/', '--')}"
-    if not model_dir.exists():
-        return 0
-    total = 0
-    try:
-        for f in model_dir.rglob("*"):
-            if f.is_file() and not f.is_symlink():
-                try:
-                    total += f.stat().st_size
-                except OSError:
-                    pass
-    except Exception:
-        pass
-    return total
+class ModelManager:
+    """Manages the model variants, each on its backend (``MODEL_BACKENDS``).
 
+    One variant is active at a time. Switching loads and warms the new
+    variant while the current one keeps serving, then cuts over; the old
+    variant drains (finishes its leased requests) before it is unloaded, so
+    both are resident only during the switch.
 
-class ModelManager:
-    """Manages MLX Audio model variants. Only one loaded at a time."""
+    A watchdog unloads variants that have been idle for
+    ``MODEL_IDLE_UNLOAD_SECONDS`` and, while system memory use is above
+    ``MEMORY_PRESSURE_PERCENT``, evicts idle variants (least recently used
+    first) and refuses new loads.
+    """
 
     VARIANTS = tuple(MODEL_REPOS.keys())
 
@@ -88,19 +88,117 @@ class ModelManager:
         self._states: dict[str, ModelState] = {
             v: ModelState() for v in self.VARIANTS
         }
-        self._lock = asyncio.Lock()
+        self._lock = asyncio.Lock()  # serializes switches
+        self._active: str | None = None
+        self._leases: dict[str, int] = {v: 0 for v in self.VARIANTS}
+        self._lease_cond = asyncio.Condition()
+        self._drain_tasks: set[asyncio.Task] = set()
+        self._watchdog: asyncio.Task | None = None
         self._ws_manager = None
+        self.runtime_ready = False
+
+    async def preload_runtime(self):
+        """Import the ML stack in the background.
+
+        Nothing imports the ML stack at module load, so the server answers requests
+        immediately; this pays the native-library import cost off the
+        critical path before the first model load needs it.
+        """
+        start = time.perf_counter()
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, _import_runtime)
+        except Exception as e:
+            logger.error(f"Failed to import inference runtime: {e}")
+            return
+        self.runtime_ready = True
+        names = ", ".join(b.name for b in configured_backends())
+        logger.info(f"Inference runtime ready: {names} ({time.perf_counter() - start:.1f}s)")
+
+    async def preload_variant(self, variant: str):
+        """Load ``variant`` at startup (``LOQUI_PRELOAD_VARIANT``), logging failures."""
+        try:
+            await self.download_and_load(variant)
+        except Exception as e:
+            logger.error(f"Failed to preload {variant}: {e}")
 
     def set_ws_manager(self, ws_manager):
         self._ws_manager = ws_manager
 
+    async def start_watchdog(self, interval: float = MODEL_WATCHDOG_INTERVAL):
+        self._watchdog = asyncio.create_task(self._watch(interval))
+
+    async def stop_watchdog(self):
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.enforce_residency()
+            except Exception as e:
+                logger.warning(f"Model watchdog failed: {e}")
+
+    def check_memory(self, variant: str) -> None:
+        """Raise ``MemoryPressureError`` if loading ``variant`` would add to pressure."""
+        mem = psutil.virtual_memory()
+        if mem.percent >= MEMORY_PRESSURE_PERCENT:
+            raise MemoryPressureError(
+                f"Memory pressure ({mem.percent:.0f}% used); not loading {variant}"
+            )
+        needed = MODEL_SIZES_BYTES.get(variant, 0)
+        if mem.available < needed:
+            raise MemoryPressureError(
+                f"Not enough free memory for {variant} "
+                f"({mem.available / 1024 ** 3:.1f} GB available, ~{needed / 1024 ** 3:.1f} GB needed)"
+            )
+
+    async def enforce_residency(self) -> None:
+        """Unload idle variants; under memory pressure, evict one and clear the MLX cache.
+
+        Only variants without in-flight requests are touched, and never
+        while a switch is in progress.
+        """
+        if self._lock.locked():
+            return
+        now = time.monotonic()
+        idle = sorted(
+            (v for v, state in self._states.items()
+             if state.status == ModelStatus.LOADED and self._leases[v] == 0),
+            key=lambda v: self._states[v].last_used,
+        )
+
+        if MODEL_IDLE_UNLOAD_SECONDS > 0:
+            for variant in list(idle):
+                idle_for = now - self._states[variant].last_used
+                if idle_for >= MODEL_IDLE_UNLOAD_SECONDS:
+                    logger.info(f"Unloading {variant} after {idle_for:.0f}s idle")
+                    idle.remove(variant)
+                    await self._evict(variant, "idle")
+
+        percent = psutil.virtual_memory().percent
+        if percent >= MEMORY_PRESSURE_PERCENT:
+            if idle:
+                logger.warning(f"Memory pressure ({percent:.0f}% used), evicting {idle[0]}")
+                await self._evict(idle[0], "memory_pressure")
+            else:
+                for backend in configured_backends():
+                    backend.clear_cache()
+
+    async def _evict(self, variant: str, reason: str) -> None:
+        if variant == self._active:
+            self._active = None
+        await self._unload_model(variant, reason=reason)
+
     async def init_cache_states(self):
         """Check HF cache to mark already-downloaded models."""
         loop = asyncio.get_event_loop()
         for variant in self.VARIANTS:
-            repo = MODEL_REPOS[variant]
+            repo = model_repo(variant)
             cached = await loop.run_in_executor(None, _is_model_cached, repo)
-            if cached:
+            # A load may have started while the scan was running
+            if cached and self._states[variant].status == ModelStatus.NOT_DOWNLOADED:
                 self._states[variant].status = ModelStatus.DOWNLOADED
                 self._states[variant].download_progress = 1.0
                 logger.info(f"Model {variant} found in cache")
@@ -109,19 +207,25 @@ class ModelManager:
         state = self._states[variant]
         return {
             "variant": variant,
+            "backend": MODEL_BACKENDS[variant],
             "status": state.status.value,
             "error": state.error,
             "download_progress": state.download_progress,
+            "active": variant == self._active,
+            "in_flight": self._leases[variant],
+            "idle_seconds": round(time.monotonic() - state.last_used, 1)
+            if state.status == ModelStatus.LOADED else None,
         }
 
     def get_all_statuses(self) -> list[dict]:
         return [self.get_status(v) for v in self.VARIANTS]
 
     def get_loaded_variant(self) -> str | None:
-        for v, state in self._states.items():
-            if state.status == ModelStatus.LOADED:
-                return v
-        return None
+        """The active variant, serving requests that don't name one."""
+        return self._active
+
+    def resident_variants(self) -> list[str]:
+        return [v for v, state in self._states.items() if state.status == ModelStatus.LOADED]
 
     def get_model(self, variant: str):
         state = self._states[variant]
@@ -129,101 +233,168 @@ class ModelManager:
             return None
         return state.model
 
+    @asynccontextmanager
+    async def lease(self, variant: str):
+        """Hold a loaded model for the duration of a request.
+
+        A variant being switched away from stops taking new leases and is
+        unloaded only once every outstanding lease has been released.
+        """
+        state = self._states.get(variant)
+        if state is None:
+            raise ValueError(f"Unknown variant: {variant}")
+        if state.status != ModelStatus.LOADED:
+            raise RuntimeError(f"Model {variant} is not loaded")
+        self._leases[variant] += 1
+        state.last_used = time.monotonic()
+        try:
+            yield state.model
+        finally:
+            state.last_used = time.monotonic()
+            self._leases[variant] -= 1
+            if self._leases[variant] == 0:
+                async with self._lease_cond:
+                    self._lease_cond.notify_all()
+
     async def _broadcast(self, event: str, data: dict):
         if self._ws_manager:
             await self._ws_manager.broadcast({"event": event, **data})
 
-    async def _monitor_download(self, variant: str) -> None:
-        """Monitor HF cache directory growth and broadcast progress."""
-        repo = MODEL_REPOS[variant]
-        expected = MODEL_SIZES_BYTES.get(variant, 0)
-        if expected == 0:
+    def _on_download_progress(self, variant: str, done: int, total: int) -> None:
+        """Record exact byte progress (event loop thread)."""
+        state = self._states[variant]
+        if state.status != ModelStatus.DOWNLOADING or not total:
             return
-
-        while self._states[variant].status == ModelStatus.DOWNLOADING:
-            try:
-                current = await asyncio.get_event_loop().run_in_executor(
-                    None, _get_cache_size, repo
-                )
-                progress = min(current / expected, 0.97)
-                self._states[variant].download_progress = progress
-                await self._broadcast("download_progress", {
-                    "variant": variant,
-                    "progress": round(progress, 2),
-                })
-            except Exception:
-                pass
-            await asyncio.sleep(1)
+        state.download_progress = done / total
+        if self._ws_manager:
+            self._ws_manager.publish({
+                "event": "download_progress",
+                "variant": variant,
+                "progress": round(state.download_progress, 3),
+                "downloaded_bytes": done,
+                "total_bytes": total,
+            })
+
+    async def _download(self, variant: str) -> None:
+        """Prefetch a variant's files into the HF cache."""
+        loop = asyncio.get_running_loop()
+        prefetcher = ModelPrefetcher(
+            model_repo(variant),
+            on_progress=lambda done, total: loop.call_soon_threadsafe(
+                self._on_download_progress, variant, done, total
+            ),
+        )
+        await loop.run_in_executor(None, prefetcher.run)
 
     async def download_and_load(self, variant: str) -> None:
-        """Download (if needed) and load a model variant."""
+        """Download (if needed), load and warm a variant, then make it active.
+
+        The previously active variant keeps serving until the cutover and
+        is unloaded in the background once its in-flight requests finish.
+        """
         if variant not in self.VARIANTS:
             raise ValueError(f"Unknown variant: {variant}")
 
         async with self._lock:
-            current = self.get_loaded_variant()
-            if current == variant and self._states[variant].status == ModelStatus.LOADED:
+            state = self._states[variant]
+            previous = self._active
+            if previous == variant and state.status == ModelStatus.LOADED:
                 return
-            if current and current != variant:
-                await self._unload_model(current)
 
-            state = self._states[variant]
-            repo = MODEL_REPOS[variant]
-            monitor_task = None
+            if state.status == ModelStatus.DRAINING and state.model is not None:
+                # Switching back before it was unloaded: reuse it as is.
+                state.status = ModelStatus.LOADED
+            elif state.status != ModelStatus.LOADED:
+                self.check_memory(variant)
+                await self._load(variant)
+            state.last_used = time.monotonic()
+
+            # Cutover: new requests go to the new variant from here on.
+            self._active = variant
+            await self._broadcast("model_status", {
+                "variant": variant, "status": "loaded", "active": True,
+            })
+            logger.info(f"Model {variant} is now active")
+
+            if previous and previous != variant:
+                self._states[previous].status = ModelStatus.DRAINING
+                task = asyncio.create_task(self._drain_and_unload(previous))
+                self._drain_tasks.add(task)
+                task.add_done_callback(self._drain_tasks.discard)
+
+    async def _load(self, variant: str) -> None:
+        state = self._states[variant]
+        repo = model_repo(variant)
+        loop = asyncio.get_event_loop()
 
-            # Check if model is already cached
-            is_cached = await asyncio.get_event_loop().run_in_executor(
-                None, _is_model_cached, repo
-            )
+        # Check if model is already cached
+        is_cached = await loop.run_in_executor(None, _is_model_cached, repo)
 
-            if is_cached:
-                # Already downloaded — go straight to loading
-                state.status = ModelStatus.LOADING
-                state.download_progress = 1.0
-                await self._broadcast("model_status", {
-                    "variant": variant, "status": "loading",
-                })
-            else:
-                # Needs downloading
+        try:
+            if not is_cached:
                 state.status = ModelStatus.DOWNLOADING
                 state.download_progress = 0.0
                 await self._broadcast("model_status", {
                     "variant": variant, "status": "downloading",
                 })
-                monitor_task = asyncio.create_task(self._monitor_download(variant))
+                await self._download(variant)
+                await self._broadcast("download_progress", {
+                    "variant": variant, "progress": 1.0,
+                })
+
+            state.status = ModelStatus.LOADING
+            state.download_progress = 1.0
+            await self._broadcast("model_status", {
+                "variant": variant, "status": "loading",
+            })
 
+            model = await loop.run_in_executor(None, lambda: self._load_variant(variant))
+
+            state.status = ModelStatus.WARMING
+            await self._broadcast("model_status", {
+                "variant": variant, "status": "warming",
+            })
             try:
-                model = await asyncio.get_event_loop().run_in_executor(
-                    None, lambda: self._load_variant(variant)
-                )
-
-                # Stop progress monitor
-                if monitor_task:
-                    monitor_task.cancel()
-                    await self._broadcast("download_progress", {
-                        "variant": variant, "progress": 1.0,
-                    })
-
-                state.model = model
-                state.status = ModelStatus.LOADED
-                state.download_progress = 1.0
-                state.error = None
-                await self._broadcast("model_status", {
-                    "variant": variant, "status": "loaded",
-                })
-                logger.info(f"Model {variant} loaded on MLX")
+                await loop.run_in_executor(None, lambda: self._warmup(variant, model))
             except Exception as e:
-                if monitor_task:
-                    monitor_task.cancel()
-                state.status = ModelStatus.ERROR
-                state.error = str(e)
-                await self._broadcast("model_status", {
-                    "variant": variant, "status": "error", "error": str(e),
-                })
-                logger.error(f"Failed to load model {variant}: {e}")
-                raise
+                logger.warning(f"Warm-up of {variant} failed: {e}")
+
+            state.model = model
+            state.status = ModelStatus.LOADED
+            state.error = None
+            logger.info(f"Model {variant} loaded on {MODEL_BACKENDS[variant]}")
+        except Exception as e:
+            state.status = ModelStatus.ERROR
+            state.error = str(e)
+            await self._broadcast("model_status", {
+                "variant": variant, "status": "error", "error": str(e),
+            })
+            logger.error(f"Failed to load model {variant}: {e}")
+            raise
+
+    async def _drain_and_unload(self, variant: str) -> None:
+        """Wait for in-flight requests on a DRAINING variant, then unload it."""
+        state = self._states[variant]
+        await self._broadcast("model_status", {
+            "variant": variant, "status": "draining", "in_flight": self._leases[variant],
+        })
+        async with self._lease_cond:
+            await self._lease_cond.wait_for(
+                lambda: self._leases[variant] == 0 or state.status != ModelStatus.DRAINING
+            )
+        # Reactivated while draining
+        if state.status != ModelStatus.DRAINING:
+            return
+        await self._unload_model(variant)
+
+    async def unload_all(self) -> None:
+        """Unload every resident model (shutdown)."""
+        self._active = None
+        for variant, state in self._states.items():
+            if state.model is not None:
+                await self._unload_model(variant)
 
-    async def _unload_model(self, variant: str) -> None:
+    async def _unload_model(self, variant: str, reason: str | None = None) -> None:
         """Unload a model and free memory."""
         state = self._states[variant]
         state.status = ModelStatus.UNLOADING
@@ -231,18 +402,25 @@ class ModelManager:
         if state.model is not None:
             del state.model
             state.model = None
-            mx.metal.clear_cache()
+            backend_for(variant).clear_cache()
 
         state.status = ModelStatus.DOWNLOADED
-        await self._broadcast("model_status", {"variant": variant, "status": "downloaded"})
-        logger.info(f"Model {variant} unloaded")
+        event = {"variant": variant, "status": "downloaded", "active": False}
+        if reason:
+            event["reason"] = reason
+        await self._broadcast("model_status", event)
+        logger.info(f"Model {variant} unloaded" + (f" ({reason})" if reason else ""))
+
+    @staticmethod
+    def _warmup(variant: str, model) -> None:
+        """Run one short generation so the first real request doesn't pay
+        for kernel compilation (runs in thread pool)."""
+        for _ in backend_for(variant).generate(model, variant, WARMUP_TEXT, language="en"):
+            pass
 
     @staticmethod
     def _load_variant(variant: str):
         """Synchronous model loading (runs in thread pool)."""
-        from mlx_audio.tts.generate import load_model
-
-        repo = MODEL_REPOS[variant]
-        logger.info(f"Loading {variant} from {repo}...")
-        model = load_model(repo, lazy=False)
-        return model
+        backend = backend_for(variant)
+        logger.info(f"Loading {variant} from {model_repo(variant)} ({backend.name})...")
+        return backend.load(variant)
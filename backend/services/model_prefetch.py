@@ -0,0 +1,249 @@
+"""Concurrent, resumable model downloads into the HuggingFace cache.
+
+The repo file list is fetched up front so progress is reported in exact
+bytes, files are downloaded in parallel with HTTP range resume, and every
+blob is checksummed before it is published into the cache. The resulting
+layout is the one ``huggingface_hub`` uses, so ``load_model`` picks the files
+up without downloading anything itself.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from urllib.parse import quote
+
+from backend.config import (
+    HF_ENDPOINT,
+    PREFETCH_CHUNK_SIZE,
+    PREFETCH_CONCURRENCY,
+    PREFETCH_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class PrefetchError(RuntimeError):
+    pass
+
+
+class ChecksumError(PrefetchError):
+    pass
+
+
+def hf_cache_dir() -> Path:
+    """Get the HuggingFace Hub cache directory."""
+    for env in ("HF_HUB_CACHE", "HUGGINGFACE_HUB_CACHE"):
+        val = os.environ.get(env)
+        if val:
+            return Path(val)
+    hf_home = os.environ.get("HF_HOME")
+    if hf_home:
+        return Path(hf_home) / "hub"
+    return Path.home() / ".cache" / "huggingface" / "hub"
+
+
+def repo_cache_dir(repo: str, cache_dir: Path | None = None) -> Path:
+    return (cache_dir or hf_cache_dir()) / f"models--{repo.replace('/', '--')}"
+
+
+@dataclass
+class RepoFile:
+    path: str
+    size: int
+    blob_id: str
+    sha256: str | None = None
+
+    @property
+    def etag(self) -> str:
+        """Blob name in the cache: sha256 for LFS files, git blob id otherwise."""
+        return self.sha256 or self.blob_id
+
+
+@dataclass
+class RepoManifest:
+    repo: str
+    commit: str
+    files: list[RepoFile]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(f.size for f in self.files)
+
+
+def _auth_headers() -> dict[str, str]:
+    token = os.environ.get("HF_TOKEN") or os.environ.get("HUGGING_FACE_HUB_TOKEN")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def fetch_manifest(repo: str, revision: str = "main", endpoint: str | None = None) -> RepoManifest:
+    """List every file of a repo revision with its size and checksum."""
+    endpoint = (endpoint or HF_ENDPOINT).rstrip("/")
+    url = f"{endpoint}/api/models/{repo}/revision/{quote(revision, safe='')}?blobs=true"
+    req = urllib.request.Request(url, headers=_auth_headers())
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            info = json.load(resp)
+    except (urllib.error.URLError, ValueError) as e:
+        raise PrefetchError(f"Could not list files for {repo}: {e}") from e
+
+    files = []
+    for sibling in info.get("siblings", []):
+        lfs = sibling.get("lfs") or {}
+        files.append(RepoFile(
+            path=sibling["rfilename"],
+            size=lfs.get("size", sibling.get("size", 0)),
+            blob_id=sibling["blobId"],
+            sha256=lfs.get("sha256"),
+        ))
+    return RepoManifest(repo=repo, commit=info["sha"], files=files)
+
+
+class ModelPrefetcher:
+    """Download one repo snapshot with byte-accurate progress.
+
+    ``on_progress(done_bytes, total_bytes)`` is called from worker threads,
+    at most every ``progress_interval`` seconds and once on completion.
+    """
+
+    def __init__(
+        self,
+        repo: str,
+        revision: str = "main",
+        *,
+        endpoint: str | None = None,
+        cache_dir: Path | None = None,
+        concurrency: int = PREFETCH_CONCURRENCY,
+        on_progress: ProgressCallback | None = None,
+        progress_interval: float = 0.25,
+    ):
+        self.repo = repo
+        self.revision = revision
+        self.endpoint = (endpoint or HF_ENDPOINT).rstrip("/")
+        self.repo_dir = repo_cache_dir(repo, cache_dir)
+        self.concurrency = concurrency
+        self._on_progress = on_progress
+        self._progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._done = 0
+        self._total = 0
+        self._last_report = 0.0
+
+    def run(self) -> Path:
+        """Download all missing files. Returns the snapshot directory."""
+        manifest = fetch_manifest(self.repo, self.revision, self.endpoint)
+        self._total = manifest.total_bytes
+        blobs = self.repo_dir / "blobs"
+        blobs.mkdir(parents=True, exist_ok=True)
+
+        logger.info(
+            f"Prefetching {self.repo}@{manifest.commit[:8]}: "
+            f"{len(manifest.files)} files, {self._total / 1e9:.2f} GB"
+        )
+        # Largest first so the long downloads overlap with the small ones.
+        files = sorted(manifest.files, key=lambda f: f.size, reverse=True)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for _ in pool.map(lambda f: self._fetch_file(manifest.commit, f), files):
+                pass
+
+        # Publish the snapshot only once every blob is verified, so an
+        # interrupted prefetch never looks like a complete cache entry.
+        snapshot = self.repo_dir / "snapshots" / manifest.commit
+        for f in manifest.files:
+            pointer = snapshot / f.path
+            pointer.parent.mkdir(parents=True, exist_ok=True)
+            if pointer.is_symlink() or pointer.exists():
+                pointer.unlink()
+            os.symlink(os.path.relpath(blobs / f.etag, pointer.parent), pointer)
+        if self.revision != manifest.commit:
+            ref = self.repo_dir / "refs" / self.revision
+            ref.parent.mkdir(parents=True, exist_ok=True)
+            ref.write_text(manifest.commit)
+
+        self._report(0, force=True)
+        return snapshot
+
+    def _fetch_file(self, commit: str, f: RepoFile) -> None:
+        blob = self.repo_dir / "blobs" / f.etag
+        if blob.exists() and blob.stat().st_size == f.size:
+            self._report(f.size)
+            return
+
+        partial = blob.with_name(f"{f.etag}.incomplete")
+        if partial.exists():
+            if partial.stat().st_size > f.size:
+                partial.unlink()
+            else:
+                self._report(partial.stat().st_size)
+        url = f"{self.endpoint}/{self.repo}/resolve/{commit}/{quote(f.path)}"
+        for attempt in range(PREFETCH_RETRIES + 1):
+            try:
+                self._download(url, partial, f)
+                break
+            except (urllib.error.URLError, OSError, TimeoutError) as e:
+                if attempt == PREFETCH_RETRIES:
+                    raise PrefetchError(f"Failed to download {f.path}: {e}") from e
+                logger.warning(f"Retrying {f.path} after error: {e}")
+                time.sleep(2 ** attempt)
+
+        self._verify(partial, f)
+        os.replace(partial, blob)
+
+    def _download(self, url: str, partial: Path, f: RepoFile) -> None:
+        offset = partial.stat().st_size if partial.exists() else 0
+        if offset == f.size and partial.exists():
+            return
+
+        headers = _auth_headers()
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            if offset and resp.status != 206:
+                # Server ignored the range request: start over.
+                self._report(-offset)
+                offset = 0
+            with open(partial, "r+b" if offset else "wb") as out:
+                out.seek(offset)
+                while chunk := resp.read(PREFETCH_CHUNK_SIZE):
+                    out.write(chunk)
+                    self._report(len(chunk))
+
+    @staticmethod
+    def _verify(partial: Path, f: RepoFile) -> None:
+        if f.sha256:
+            digest = hashlib.sha256()
+            expected = f.sha256
+        else:
+            # Git blob id: sha1 over a "blob <size>\0" header plus the content.
+            digest = hashlib.sha1(f"blob {f.size}\0".encode())
+            expected = f.blob_id
+        with open(partial, "rb") as fh:
+            while chunk := fh.read(PREFETCH_CHUNK_SIZE):
+                digest.update(chunk)
+        if digest.hexdigest() != expected:
+            partial.unlink()
+            raise ChecksumError(f"Checksum mismatch for {f.path}")
+
+    def _report(self, delta: int, force: bool = False) -> None:
+        with self._lock:
+            self._done += delta
+            now = time.monotonic()
+            if not force and now - self._last_report < self._progress_interval:
+                return
+            self._last_report = now
+            done, total = self._done, self._total
+        if self._on_progress:
+            self._on_progress(done, total)
@@ -0,0 +1,111 @@
+"""Persistent audio cache for sentence / phrase segments.
+
+Templated input ("Your order number is ...") repeats most of its text across
+requests. Segments are cached as float32 arrays keyed by segment text, voice
+and generation parameters, so only the changed parts need the model.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from backend.config import PHRASE_CACHE_DIR, PHRASE_CACHE_MAX_BYTES
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Split after sentence / clause punctuation, and on line breaks.
+_SEGMENT_RE = re.compile(r"(?<=[.!?;:。！？])\s+|\n+")
+
+
+def split_segments(text: str) -> list[str]:
+    """Split text into sentence / phrase segments."""
+    return [s.strip() for s in _SEGMENT_RE.split(text) if s and s.strip()]
+
+
+@lru_cache(maxsize=256)
+def _file_digest(path: str, size: int, mtime: float) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def voice_id(ref_path: str | None) -> str:
+    """Content hash of a reference clip, so re-uploads of one voice share entries."""
+    if not ref_path:
+        return ""
+    st = os.stat(ref_path)
+    return _file_digest(ref_path, st.st_size, st.st_mtime)
+
+
+class PhraseCache:
+    """Segment audio stored as ``<key>.npy`` files, evicted least recently used."""
+
+    def __init__(self, directory: Path = PHRASE_CACHE_DIR, max_bytes: int = PHRASE_CACHE_MAX_BYTES):
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: int | None = None
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(segment: str, variant: str, voice: str, params: dict) -> str:
+        payload = json.dumps([segment, variant, voice, params], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}.npy"
+
+    def get(self, key: str) -> np.ndarray | None:
+        import numpy as np
+
+        path = self._path(key)
+        try:
+            audio = np.load(path)
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        return audio
+
+    def put(self, key: str, audio: np.ndarray) -> None:
+        import numpy as np
+
+        path = self._path(key)
+        tmp = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, audio.astype(np.float32, copy=False))
+        os.replace(tmp, path)
+        with self._lock:
+            if self._size is not None:
+                self._size += path.stat().st_size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries while over budget (lock held)."""
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self._dir.glob("*.npy"))
+        if self._size <= self._max_bytes:
+            return
+        entries = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in self._dir.glob("*.npy")),
+            key=lambda e: e[0],
+        )
+        for _, size, path in entries:
+            if self._size <= self._max_bytes * 0.9:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+        logger.info(f"Phrase cache trimmed to {self._size / 1e6:.0f} MB")
@@ -0,0 +1,339 @@
+"""Long-form projects: documents rendered and stored segment by segment.
+
+Each segment's audio is a chunk file named by the hash of its text, variant,
+voice and generation parameters. Rendering synthesizes only segments
+without a chunk, so editing one paragraph of a long document re-renders
+that paragraph; the final file is then re-assembled by streaming the chunk
+frames into one WAV.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+import wave
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import (
+    DEFAULT_REF_AUDIO,
+    HOST_MODELS,
+    MAX_TEXT_LENGTH,
+    MODEL_REPOS,
+    PROJECT_SEGMENT_GAP_MS,
+    is_qwen_variant,
+)
+from backend.db.models import Project, ProjectSegment
+from backend.services.phrase_cache import PhraseCache, voice_id
+from backend.utils.exceptions import LoquiError
+
+if TYPE_CHECKING:
+    from backend.services.audio_store import AudioStore
+    from backend.services.cluster import Coordinator
+    from backend.services.tts_engine import GenerationResult, TTSEngine
+    from backend.utils.cancellation import CancelToken
+
+logger = logging.getLogger(__name__)
+
+# Settings that change how every segment sounds
+GENERATION_FIELDS = (
+    "model_variant", "language", "exaggeration", "cfg_weight", "temperature", "speed", "reference_filename",
+)
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Split a document on blank lines."""
+    return [p.strip() for p in _PARAGRAPH_RE.split(text) if p.strip()]
+
+
+def _wav_duration(path: Path) -> float:
+    with wave.open(str(path), "rb") as w:
+        return w.getnframes() / w.getframerate()
+
+
+def _assemble(chunks: list[Path], out: Path, gap_ms: float) -> float:
+    """Concatenate PCM chunk WAVs with a silence gap, streaming frame data (thread pool)."""
+    with wave.open(str(chunks[0]), "rb") as first:
+        params = first.getparams()
+    gap = bytes(int(params.framerate * gap_ms / 1000) * params.sampwidth * params.nchannels)
+    frames = 0
+    with wave.open(str(out), "wb") as dst:
+        dst.setparams(params)
+        for i, path in enumerate(chunks):
+            if i:
+                dst.writeframesraw(gap)
+            with wave.open(str(path), "rb") as src:
+                if src.getframerate() != params.framerate or src.getsampwidth() != params.sampwidth:
+                    raise ValueError(f"Chunk {path.name} does not match the project's audio format")
+                while data := src.readframes(65536):
+                    dst.writeframesraw(data)
+                frames += src.getnframes()
+        frames += (len(chunks) - 1) * len(gap) // (params.sampwidth * params.nchannels)
+    return frames / params.framerate
+
+
+class ProjectService:
+    def __init__(self, audio_store: AudioStore, tts_engine: TTSEngine):
+        self._audio_store = audio_store
+        self._tts_engine = tts_engine
+        self._rendering: set[str] = set()
+        self._ws_manager = None
+        self._coordinator: Coordinator | None = None
+
+    def set_ws_manager(self, ws_manager):
+        self._ws_manager = ws_manager
+
+    def set_coordinator(self, coordinator: Coordinator | None):
+        self._coordinator = coordinator
+
+    def _validate_fields(self, fields: dict) -> None:
+        variant = fields.get("model_variant")
+        if variant is not None and variant not in MODEL_REPOS:
+            raise ValueError(f"Unknown variant: {variant}")
+        reference = fields.get("reference_filename")
+        if reference is not None:
+            # A bare name of an uploaded reference, never a path elsewhere
+            if Path(reference).name != reference or not self._audio_store.reference_path(reference).is_file():
+                raise ValueError(f"Unknown reference audio: {reference}")
+
+    @staticmethod
+    def _validate(texts: list[str]) -> list[str]:
+        texts = [t.strip() for t in texts if t and t.strip()]
+        if not texts:
+            raise ValueError("A project needs at least one non-empty segment")
+        for i, text in enumerate(texts):
+            if len(text) > MAX_TEXT_LENGTH:
+                raise ValueError(f"Segment {i} exceeds {MAX_TEXT_LENGTH} characters")
+        return texts
+
+    async def create(self, session: AsyncSession, texts: list[str], **fields) -> Project:
+        texts = self._validate(texts)
+        self._validate_fields(fields)
+        project = Project(**fields)
+        session.add(project)
+        await session.flush()
+        session.add_all(
+            ProjectSegment(project_id=project.id, position=i, text=t) for i, t in enumerate(texts)
+        )
+        await session.commit()
+        await session.refresh(project)
+        return project
+
+    async def list(self, session: AsyncSession) -> list[Project]:
+        result = await session.execute(select(Project).order_by(desc(Project.updated_at)))
+        return list(result.scalars().all())
+
+    async def get(self, session: AsyncSession, project_id: str) -> Project | None:
+        return await session.get(Project, project_id)
+
+    async def segments(self, session: AsyncSession, project_id: str) -> list[ProjectSegment]:
+        result = await session.execute(
+            select(ProjectSegment)
+            .where(ProjectSegment.project_id == project_id)
+            .order_by(ProjectSegment.position)
+        )
+        return list(result.scalars().all())
+
+    async def update(
+        self, session: AsyncSession, project: Project, texts: list[str] | None = None, **fields,
+    ) -> Project:
+        """Apply edits, keeping the rendered audio of unchanged segments.
+
+        New segment texts are matched to existing segments with identical
+        text, wherever they moved. Changing a generation setting invalidates
+        every segment.
+        """
+        self._validate_fields(fields)
+        segments = await self.segments(session, project.id)
+        dropped: set[str] = set()
+
+        if any(k in GENERATION_FIELDS and getattr(project, k) != v for k, v in fields.items()):
+            for segment in segments:
+                if segment.chunk_key:
+                    dropped.add(segment.chunk_key)
+                segment.chunk_key = None
+                segment.duration_seconds = None
+        for key, value in fields.items():
+            setattr(project, key, value)
+
+        if texts is not None:
+            texts = self._validate(texts)
+            by_text: dict[str, list[ProjectSegment]] = {}
+            for segment in segments:
+                by_text.setdefault(segment.text, []).append(segment)
+            for position, text in enumerate(texts):
+                matches = by_text.get(text)
+                if matches:
+                    matches.pop(0).position = position
+                else:
+                    session.add(ProjectSegment(project_id=project.id, position=position, text=text))
+            for leftover in by_text.values():
+                for segment in leftover:
+                    if segment.chunk_key:
+                        dropped.add(segment.chunk_key)
+                    await session.delete(segment)
+
+        await self._drop_assembled(project)
+        project.updated_at = datetime.now(timezone.utc)
+        await session.commit()
+        await self._collect_chunks(session, dropped)
+        await session.refresh(project)
+        return project
+
+    async def delete(self, session: AsyncSession, project: Project) -> None:
+        segments = await self.segments(session, project.id)
+        await self._drop_assembled(project)
+        await session.execute(delete(ProjectSegment).where(ProjectSegment.project_id == project.id))
+        await session.delete(project)
+        await session.commit()
+        await self._collect_chunks(session, {s.chunk_key for s in segments if s.chunk_key})
+
+    async def _drop_assembled(self, project: Project) -> None:
+        if project.audio_filename:
+            await self._audio_store.delete_generated(project.audio_filename)
+            project.audio_filename = None
+            project.duration_seconds = None
+
+    async def _collect_chunks(self, session: AsyncSession, keys: set[str]) -> None:
+        """Delete chunk files no segment of any project refers to any more."""
+        if not keys:
+            return
+        result = await session.execute(
+            select(ProjectSegment.chunk_key).where(ProjectSegment.chunk_key.in_(keys))
+        )
+        for key in keys - set(result.scalars().all()):
+            await self._audio_store.delete_chunk(key)
+
+    def _reference_path(self, project: Project) -> str | None:
+        if project.reference_filename:
+            path = self._audio_store.reference_path(project.reference_filename)
+            if not path.is_file():
+                # Deleted from history since the project was saved
+                raise ValueError(f"Reference audio {project.reference_filename} no longer exists")
+            return str(path)
+        if is_qwen_variant(project.model_variant):
+            default_ref = self._audio_store.reference_path(DEFAULT_REF_AUDIO)
+            if default_ref.exists():
+                return str(default_ref)
+        return None
+
+    async def _synthesize(
+        self, project: Project, text: str, ref_path: str | None, params: dict, cancel: CancelToken | None,
+    ) -> GenerationResult:
+        """One segment, on a worker hosting the variant if this is a coordinator."""
+        if self._coordinator:
+            reference = None
+            if ref_path:
+                path = Path(ref_path)
+                data = await asyncio.get_event_loop().run_in_executor(None, path.read_bytes)
+                reference = (path.name, data)
+            result = await self._coordinator.generate(
+                project.model_variant, {"text": text, **params}, reference,
+                persist=False, inline=True, cancel=cancel,
+            )
+            if result is not None:
+                return result
+        if not HOST_MODELS:
+            raise LoquiError(f"No worker hosts {project.model_variant}", status_code=503)
+        return await self._tts_engine.generate(
+            text=text,
+            variant=project.model_variant,
+            reference_audio_path=project.reference_filename,
+            persist=False,
+            inline=True,
+            cancel=cancel,
+            **params,
+        )
+
+    def _publish(self, job_id: str | None, project: Project, done: int, total: int):
+        if self._ws_manager and job_id:
+            self._ws_manager.publish({
+                "event": "job_progress", "job_id": job_id, "project_id": project.id,
+                "segments_done": done, "segments_total": total,
+            })
+
+    async def render(
+        self,
+        session: AsyncSession,
+        project: Project,
+        cancel: CancelToken | None = None,
+        job_id: str | None = None,
+    ) -> dict:
+        """Synthesize segments without a chunk, then re-assemble the project.
+
+        Render time follows the number of changed segments. Each finished
+        segment is committed right away, so a cancelled or failed render
+        resumes where it stopped.
+        """
+        if project.id in self._rendering:
+            raise RuntimeError(f"Project {project.id} is already rendering")
+        self._rendering.add(project.id)
+        try:
+            return await self._render(session, project, cancel, job_id)
+        finally:
+            self._rendering.discard(project.id)
+
+    async def _render(
+        self, session: AsyncSession, project: Project, cancel: CancelToken | None, job_id: str | None,
+    ) -> dict:
+        loop = asyncio.get_event_loop()
+        start = time.time()
+        segments = await self.segments(session, project.id)
+        ref_path = self._reference_path(project)
+        voice = await loop.run_in_executor(None, voice_id, ref_path)
+        params = {
+            "language": project.language, "exaggeration": project.exaggeration,
+            "cfg_weight": project.cfg_weight, "temperature": project.temperature,
+            "speed": project.speed,
+        }
+
+        rendered = reused = 0
+        for i, segment in enumerate(segments):
+            if segment.chunk_key and self._audio_store.chunk_path(segment.chunk_key).exists():
+                reused += 1
+                continue
+            key = PhraseCache.key(segment.text, project.model_variant, voice, params)
+            path = self._audio_store.chunk_path(key)
+            if path.exists():
+                # Same text and settings elsewhere (another project, a repeated line)
+                reused += 1
+                segment.duration_seconds = await loop.run_in_executor(None, _wav_duration, path)
+            else:
+                result = await self._synthesize(project, segment.text, ref_path, params, cancel)
+                await self._audio_store.save_chunk(key, result.audio_bytes)
+                segment.duration_seconds = result.duration_seconds
+                rendered += 1
+            segment.chunk_key = key
+            await session.commit()
+            self._publish(job_id, project, i + 1, len(segments))
+
+        await self._drop_assembled(project)
+        filename = f"project_{uuid.uuid4().hex}.wav"
+        chunks = [self._audio_store.chunk_path(s.chunk_key) for s in segments]
+        project.duration_seconds = round(await loop.run_in_executor(
+            None, _assemble, chunks, self._audio_store.generated_path(filename), PROJECT_SEGMENT_GAP_MS,
+        ), 2)
+        await loop.run_in_executor(None, self._audio_store.write_peaks, filename)
+        project.audio_filename = filename
+        project.updated_at = datetime.now(timezone.utc)
+        await session.commit()
+
+        render_time = time.time() - start
+        logger.info(
+            f"Project {project.id}: rendered {rendered}, reused {reused} "
+            f"of {len(segments)} segments in {render_time:.1f}s"
+        )
+        return {
+            "segments_rendered": rendered,
+            "segments_reused": reused,
+            "render_time_seconds": round(render_time, 2),
+        }
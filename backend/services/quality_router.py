@@ -0,0 +1,144 @@
+"""SLO-driven variant selection for ``variant=auto``.
+
+Requests asking for ``auto`` get the preferred variant (the active one,
+or on a coordinator without local models one its workers host) while
+latency is healthy. When the rolling p95 latency nears
+``LATENCY_SLO_SECONDS`` or requests queue up, the router steps down one
+tier at a time to a faster resident variant of the same family
+(``FASTER_VARIANTS``), and steps back up once latency and queue have
+recovered. Tier changes are at least ``AUTO_DWELL_SECONDS`` apart and
+samples from before a change are discarded, so one slow burst doesn't
+cascade.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+from backend.config import (
+    AUTO_DWELL_SECONDS,
+    AUTO_MIN_SAMPLES,
+    AUTO_QUEUE_DEPTH,
+    AUTO_RECOVER_FRACTION,
+    AUTO_RISK_FRACTION,
+    AUTO_WINDOW_SECONDS,
+    DEFAULT_VARIANT,
+    FASTER_VARIANTS,
+    LATENCY_SLO_SECONDS,
+    MODEL_VARIANTS,
+)
+
+if TYPE_CHECKING:
+    from backend.services.cluster import Coordinator
+    from backend.services.model_manager import ModelManager
+
+logger = logging.getLogger(__name__)
+
+AUTO = "auto"
+MAX_LEVEL = max(len(v) for v in FASTER_VARIANTS.values())
+
+
+class QualityRouter:
+    def __init__(self, model_manager: ModelManager, coordinator: Coordinator | None = None):
+        self._model_manager = model_manager
+        self._coordinator = coordinator
+        self._samples: deque[tuple[float, float]] = deque()  # (finished at, latency)
+        self._changed = 0.0
+        self.level = 0  # tiers below the preferred variant
+        self.in_flight = 0
+        self.degraded = 0  # auto requests served by a faster variant
+
+    def begin(self) -> None:
+        self.in_flight += 1
+
+    def end(self, latency: float | None) -> None:
+        """Finish a request; ``latency`` is None for ones that didn't complete."""
+        self.in_flight -= 1
+        if latency is not None:
+            self._samples.append((time.monotonic(), latency))
+
+    def p95(self, now: float | None = None) -> float | None:
+        now = now if now is not None else time.monotonic()
+        while self._samples and now - self._samples[0][0] > AUTO_WINDOW_SECONDS:
+            self._samples.popleft()
+        if not self._samples:
+            return None
+        latencies = sorted(latency for _, latency in self._samples)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def _evaluate(self, now: float) -> None:
+        if now - self._changed < AUTO_DWELL_SECONDS:
+            return
+        p95 = self.p95(now)
+        enough = len(self._samples) >= AUTO_MIN_SAMPLES
+        at_risk = self.in_flight >= AUTO_QUEUE_DEPTH or (
+            enough and p95 > LATENCY_SLO_SECONDS * AUTO_RISK_FRACTION
+        )
+        relaxed = self.in_flight <= 1 and (
+            p95 is None or (enough and p95 < LATENCY_SLO_SECONDS * AUTO_RECOVER_FRACTION)
+        )
+        if at_risk and self.level < MAX_LEVEL:
+            self._change(self.level + 1, now, p95)
+        elif relaxed and self.level > 0:
+            self._change(self.level - 1, now, p95)
+
+    def _change(self, level: int, now: float, p95: float | None) -> None:
+        direction = "Degrading" if level > self.level else "Restoring"
+        p95_text = f"{p95:.1f}s" if p95 is not None else "n/a"
+        logger.info(
+            f"{direction} auto variant to tier {level} "
+            f"(p95 {p95_text}, SLO {LATENCY_SLO_SECONDS:g}s, {self.in_flight} in flight)"
+        )
+        self.level = level
+        self._changed = now
+        self._samples.clear()
+
+    def _resident(self) -> set[str]:
+        resident = set(self._model_manager.resident_variants())
+        if self._coordinator:
+            resident.update(self._coordinator.registry.resident_variants())
+        return resident
+
+    def preferred(self) -> str:
+        """The variant for requests that don't name one.
+
+        The locally active variant; failing that, one hosted by a worker
+        (``DEFAULT_VARIANT`` if it is, else the first in ``MODEL_VARIANTS``).
+        """
+        active = self._model_manager.get_loaded_variant()
+        if active:
+            return active
+        remote = self._coordinator.registry.resident_variants() if self._coordinator else set()
+        if remote and DEFAULT_VARIANT not in remote:
+            return next((v for v in MODEL_VARIANTS if v in remote), DEFAULT_VARIANT)
+        return DEFAULT_VARIANT
+
+    def resolve(self, requested: str | None) -> str:
+        """The variant to run: ``requested``, or for ``auto`` the current tier's."""
+        preferred = self.preferred()
+        if not requested:
+            return preferred
+        if requested != AUTO:
+            return requested
+        self._evaluate(time.monotonic())
+        if self.level == 0:
+            return preferred
+        resident = self._resident()
+        tiers = [preferred] + [v for v in FASTER_VARIANTS.get(preferred, []) if v in resident]
+        variant = tiers[min(self.level, len(tiers) - 1)]
+        if variant != preferred:
+            self.degraded += 1
+        return variant
+
+    def status(self) -> dict:
+        p95 = self.p95()
+        return {
+            "level": self.level,
+            "p95_seconds": round(p95, 2) if p95 is not None else None,
+            "slo_seconds": LATENCY_SLO_SECONDS,
+            "in_flight": self.in_flight,
+            "degraded": self.degraded,
+        }
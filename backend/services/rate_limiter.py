@@ -0,0 +1,215 @@
+"""Per-client rate limiting and usage accounting.
+
+Each client (API key, else IP address) has two token buckets: one for
+requests and one for input characters, both refilled continuously so the
+configured amount is available per window. A request needs enough tokens
+in both; otherwise it is refused with the time until it would fit, so one
+client sending long batch jobs can't starve everyone else's interactive
+requests.
+
+Usage counters are kept in memory and added to the ``client_usage`` table
+periodically and on shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from backend.config import (
+    LOQUI_ROLE,
+    RATE_LIMIT_CHARACTERS,
+    RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_WINDOW_SECONDS,
+    USAGE_FLUSH_INTERVAL,
+)
+from backend.db.database import async_session
+from backend.db.models import ClientUsage
+from backend.utils.exceptions import RateLimitedError
+
+if TYPE_CHECKING:
+    from fastapi import Request
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TokenBucket:
+    capacity: float
+    rate: float  # tokens per second
+    tokens: float
+    updated: float
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until ``cost`` tokens are available (0 if they are now)."""
+        cost = min(cost, self.capacity)  # an oversized request waits for a full bucket
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+
+@dataclass
+class _Usage:
+    requests: int = 0
+    characters: int = 0
+    rejected: int = 0
+    last_seen: datetime | None = None
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests: int = RATE_LIMIT_REQUESTS,
+        characters: int = RATE_LIMIT_CHARACTERS,
+        window: float = RATE_LIMIT_WINDOW_SECONDS,
+        enabled: bool = LOQUI_ROLE != "worker",
+    ):
+        self.window = window
+        self.enabled = enabled
+        self._limits = {
+            name: capacity for name, capacity in (("requests", requests), ("characters", characters)) if capacity > 0
+        }
+        self._buckets: dict[str, dict[str, TokenBucket]] = {}
+        self._pending: dict[str, _Usage] = {}
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def client_id(request: Request) -> str:
+        """Identify the caller by API key (hashed, never stored) or address."""
+        if key := request.headers.get("x-api-key"):
+            return "key:" + hashlib.sha256(key.encode()).hexdigest()[:16]
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    def _client_buckets(self, client: str, now: float) -> dict[str, TokenBucket]:
+        buckets = self._buckets.get(client)
+        if buckets is None:
+            buckets = self._buckets[client] = {
+                name: TokenBucket(capacity, capacity / self.window, capacity, now)
+                for name, capacity in self._limits.items()
+            }
+        return buckets
+
+    def acquire(self, client: str, characters: int) -> None:
+        """Take one request and ``characters`` from the client's buckets.
+
+        Raises ``RateLimitedError`` (429, with ``Retry-After``) and takes
+        nothing if either bucket is short.
+        """
+        usage = self._pending.setdefault(client, _Usage())
+        usage.last_seen = datetime.now(timezone.utc)
+        if self.enabled and self._limits:
+            now = time.monotonic()
+            buckets = self._client_buckets(client, now)
+            costs = {"requests": 1, "characters": characters}
+            waits = {}
+            for name, bucket in buckets.items():
+                bucket.refill(now)
+                waits[name] = bucket.wait_time(costs[name])
+            limit, wait = max(waits.items(), key=lambda item: item[1])
+            if wait > 0:
+                usage.rejected += 1
+                raise RateLimitedError(limit, wait)
+            for name, bucket in buckets.items():
+                bucket.tokens -= min(costs[name], bucket.capacity)
+        usage.requests += 1
+        usage.characters += characters
+
+    def _prune(self) -> None:
+        """Forget buckets that have refilled completely (idle clients)."""
+        now = time.monotonic()
+        for client in list(self._buckets):
+            buckets = self._buckets[client]
+            for bucket in buckets.values():
+                bucket.refill(now)
+            if all(b.tokens >= b.capacity for b in buckets.values()):
+                del self._buckets[client]
+
+    async def flush(self) -> None:
+        """Add pending usage counters to the database."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            await self._write(pending)
+        except Exception:
+            # Keep the counters for the next flush
+            for client, usage in pending.items():
+                current = self._pending.setdefault(client, _Usage())
+                current.requests += usage.requests
+                current.characters += usage.characters
+                current.rejected += usage.rejected
+                current.last_seen = current.last_seen or usage.last_seen
+            raise
+
+    @staticmethod
+    async def _write(pending: dict[str, _Usage]) -> None:
+        async with async_session() as session:
+            for client, usage in pending.items():
+                stmt = insert(ClientUsage).values(
+                    client_id=client,
+                    requests=usage.requests,
+                    characters=usage.characters,
+                    rejected=usage.rejected,
+                    last_seen=usage.last_seen,
+                )
+                await session.execute(stmt.on_conflict_do_update(
+                    index_elements=[ClientUsage.client_id],
+                    set_={
+                        "requests": ClientUsage.requests + stmt.excluded.requests,
+                        "characters": ClientUsage.characters + stmt.excluded.characters,
+                        "rejected": ClientUsage.rejected + stmt.excluded.rejected,
+                        "last_seen": stmt.excluded.last_seen,
+                    },
+                ))
+            await session.commit()
+
+    async def usage(self, session: AsyncSession) -> list[dict]:
+        """Stored usage plus counters not yet flushed, most active first."""
+        rows = {
+            u.client_id: {
+                "client_id": u.client_id,
+                "requests": u.requests,
+                "characters": u.characters,
+                "rejected": u.rejected,
+                "last_seen": u.last_seen,
+            }
+            for u in (await session.execute(select(ClientUsage))).scalars().all()
+        }
+        for client, usage in self._pending.items():
+            row = rows.setdefault(client, {
+                "client_id": client, "requests": 0, "characters": 0, "rejected": 0, "last_seen": None,
+            })
+            row["requests"] += usage.requests
+            row["characters"] += usage.characters
+            row["rejected"] += usage.rejected
+            row["last_seen"] = usage.last_seen
+        return sorted(rows.values(), key=lambda r: r["characters"], reverse=True)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(USAGE_FLUSH_INTERVAL)
+            self._prune()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Usage flush failed: {e}")
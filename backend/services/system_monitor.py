@@ -0,0 +1,210 @@
+"""Background system telemetry sampler.
+
+Static hardware facts (chip, GPU cores, versions) are collected once at
+startup. CPU, memory and MLX stats are sampled on an interval into a ring
+buffer, so ``/system/info`` is served from memory instead of shelling out
+per request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import platform
+import subprocess
+import sys
+import time
+from collections import deque
+from importlib import metadata
+
+import psutil
+
+from backend.config import SYSTEM_HISTORY_SIZE, SYSTEM_SAMPLE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+
+def _get_chip_name() -> str:
+    """Get Apple Silicon chip name via sysctl."""
+    try:
+        result = subprocess.run(
+            ["sysctl", "-n", "machdep.cpu.brand_string"],
+            capture_output=True, text=True, timeout=2,
+        )
+        return result.stdout.strip() or "Apple Silicon"
+    except Exception:
+        return "Apple Silicon"
+
+
+def _get_gpu_cores() -> int | None:
+    """Get GPU core count from system_profiler."""
+    try:
+        result = subprocess.run(
+            ["system_profiler", "SPDisplaysDataType"],
+            capture_output=True, text=True, timeout=5,
+        )
+        for line in result.stdout.splitlines():
+            if "Total Number of Cores" in line:
+                return int(line.split(":")[-1].strip())
+    except Exception:
+        pass
+    return None
+
+
+def _get_neural_engine_cores(chip: str) -> int | None:
+    """Estimate Neural Engine cores based on chip."""
+    chip = chip.lower()
+    if "m4" in chip:
+        return 16
+    if "m3" in chip or "m2" in chip:
+        return 16
+    if "m1" in chip:
+        return 16
+    return None
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _metal_memory() -> tuple[float, float, float]:
+    """MLX active / peak / cache memory in GB, if MLX is already imported."""
+    from backend.services.inference import get_backend
+
+    stats = get_backend("mlx").memory_stats()
+    return stats["active"] / GB, stats["peak"] / GB, stats["cache"] / GB
+
+
+def collect_static() -> dict:
+    """Hardware and software facts that don't change while running."""
+    chip = _get_chip_name()
+    return {
+        "chip": chip,
+        "os": f"macOS {platform.mac_ver()[0]}" if sys.platform == "darwin" else platform.platform(terse=True),
+        "cores_physical": psutil.cpu_count(logical=False) or 0,
+        "cores_logical": psutil.cpu_count(logical=True) or 0,
+        "gpu_cores": _get_gpu_cores(),
+        "neural_engine_cores": _get_neural_engine_cores(chip),
+        "software": {
+            "python": platform.python_version(),
+            "mlx": _package_version("mlx"),
+            "mlx_audio": _package_version("mlx-audio"),
+            "torch": _package_version("torch"),
+        },
+    }
+
+
+def collect_sample() -> dict:
+    """One sample of the dynamic stats."""
+    cpu_freq = psutil.cpu_freq()
+    mem = psutil.virtual_memory()
+    disk = psutil.disk_usage("/")
+    metal_active, metal_peak, metal_cache = _metal_memory()
+    return {
+        "timestamp": time.time(),
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "cpu_frequency_mhz": round(cpu_freq.current) if cpu_freq else None,
+        "memory_total_gb": round(mem.total / GB, 1),
+        "memory_available_gb": round(mem.available / GB, 1),
+        "memory_used_gb": round(mem.used / GB, 1),
+        "memory_percent": mem.percent,
+        "metal_active_gb": round(metal_active, 2),
+        "metal_peak_gb": round(metal_peak, 2),
+        "metal_cache_gb": round(metal_cache, 2),
+        "disk_total_gb": round(disk.total / GB, 1),
+        "disk_free_gb": round(disk.free / GB, 1),
+        "disk_percent": disk.percent,
+    }
+
+
+class SystemMonitor:
+    def __init__(self, interval: float = SYSTEM_SAMPLE_INTERVAL, history_size: int = SYSTEM_HISTORY_SIZE):
+        self.interval = interval
+        self._static: dict = {}
+        self._samples: deque[dict] = deque(maxlen=history_size)
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._ws_manager = None
+
+    def set_ws_manager(self, ws_manager):
+        self._ws_manager = ws_manager
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for the first sample; False if none arrived."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        try:
+            self._static = await loop.run_in_executor(None, collect_static)
+        except Exception as e:
+            logger.warning(f"Collecting system facts failed: {e}")
+        # Prime cpu_percent so the first real sample covers a full interval.
+        psutil.cpu_percent(interval=None)
+        while True:
+            try:
+                sample = await loop.run_in_executor(None, collect_sample)
+            except Exception as e:
+                logger.warning(f"System sample failed: {e}")
+            else:
+                self._samples.append(sample)
+                self._ready.set()
+                if self._ws_manager:
+                    self._ws_manager.publish({"event": "system_stats", **sample})
+            await asyncio.sleep(self.interval)
+
+    def history(self, limit: int | None = None) -> list[dict]:
+        samples = list(self._samples)
+        return samples[-limit:] if limit else samples
+
+    def snapshot(self) -> dict:
+        """Latest sample combined with static facts."""
+        static = self._static
+        sample = self._samples[-1] if self._samples else {}
+        return {
+            "chip": static.get("chip"),
+            "os": static.get("os"),
+            "cpu": {
+                "cores_physical": static.get("cores_physical"),
+                "cores_logical": static.get("cores_logical"),
+                "frequency_mhz": sample.get("cpu_frequency_mhz"),
+                "usage_percent": sample.get("cpu_percent"),
+            },
+            "memory": {
+                "total_gb": sample.get("memory_total_gb"),
+                "available_gb": sample.get("memory_available_gb"),
+                "used_gb": sample.get("memory_used_gb"),
+                "percent": sample.get("memory_percent"),
+            },
+            "gpu": {
+                "cores": static.get("gpu_cores"),
+                "neural_engine_cores": static.get("neural_engine_cores"),
+                "metal_active_gb": sample.get("metal_active_gb"),
+                "metal_peak_gb": sample.get("metal_peak_gb"),
+                "metal_cache_gb": sample.get("metal_cache_gb"),
+            },
+            "disk": {
+                "total_gb": sample.get("disk_total_gb"),
+                "free_gb": sample.get("disk_free_gb"),
+                "percent": sample.get("disk_percent"),
+            },
+            "software": static.get("software", {}),
+            "sampled_at": sample.get("timestamp"),
+        }
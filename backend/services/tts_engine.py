@@ -1,40 +1,228 @@
-"""Unified TTS generation via MLX Audio."""
+"""Unified TTS generation across inference backends."""
 
 from __future__ import annotations
 
 import asyncio
 import logging
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
 
-import mlx.core as mx
-import numpy as np
-import soundfile as sf
-
-from backend.config import DEFAULT_REF_AUDIO, QWEN_LANGUAGES, QWEN_SAMPLE_RATE, SAMPLE_RATE, is_qwen_variant
+from backend.config import (
+    DEFAULT_GENERATION_DEADLINE_SECONDS,
+    DEFAULT_ON_LIMIT,
+    DEFAULT_OUTPUT_PROFILE,
+    DEFAULT_REF_AUDIO,
+    MAX_AUDIO_SECONDS_PER_CHAR,
+    MAX_SPEED,
+    MIN_AUDIO_SECONDS_ALLOWANCE,
+    MIN_SPEED,
+    OUTPUT_PROFILES,
+    PEAK_CEILING_DB,
+    PHRASE_CROSSFADE_MS,
+    POSTPROCESS_ENABLED,
+    QWEN_SAMPLE_RATE,
+    SAMPLE_RATE,
+    TARGET_LOUDNESS_LUFS,
+    TRIM_SILENCE_THRESHOLD_DB,
+    is_qwen_variant,
+)
 from backend.services.audio_store import AudioStore
+from backend.services.inference import backend_for
 from backend.services.model_manager import ModelManager
+from backend.services.phrase_cache import PhraseCache, split_segments, voice_id
+from backend.utils.cancellation import CancelToken, GenerationCancelled, GenerationLimitExceeded
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class GenerationResult:
-    audio_filename: str
+    audio_filename: str | None
     duration_seconds: float
     generation_time_seconds: float
     sample_rate: int
+    audio_format: str = "pcm16"
+    audio_bytes: memoryview | None = None
+    peaks: bytes | None = None  # waveform peaks computed with the audio, for storing it
+    segments_total: int | None = None
+    segments_cached: int | None = None
+    cache_hit_ratio: float | None = None
+    postprocess_ms: dict[str, float] | None = None
+    worker: str | None = None
+    limit_reached: str | None = None
+
+
+@dataclass
+class GenerationLimits:
+    """Bounds checked between model yields."""
+
+    sample_rate: int
+    deadline: float | None = None  # time.monotonic() value
+    audio_seconds_per_char: float | None = None
+    partial: bool = False  # stop and keep the audio so far instead of raising
+
+    def max_samples(self, text: str) -> int | None:
+        if self.audio_seconds_per_char is None:
+            return None
+        seconds = MIN_AUDIO_SECONDS_ALLOWANCE + len(text) * self.audio_seconds_per_char
+        return int(seconds * self.sample_rate)
+
+
+@dataclass
+class _Flight:
+    """One running generation shared by every identical concurrent request."""
+
+    task: asyncio.Task
+    token: CancelToken
+    waiters: int = 0
 
 
 class TTSEngine:
-    def __init__(self, model_manager: ModelManager, audio_store: AudioStore):
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        audio_store: AudioStore,
+        phrase_cache: PhraseCache | None = None,
+    ):
         self._model_manager = model_manager
         self._audio_store = audio_store
+        self._phrase_cache = phrase_cache
+        self._flights: dict[str, _Flight] = {}
+        self.in_flight = 0
+        self.coalesced = 0  # requests served by another request's generation
 
     async def generate(
         self,
         text: str,
         variant: str,
+        persist: bool = True,
+        inline: bool = False,
+        cancel: CancelToken | None = None,
+        discard_reference: bool = False,
+        **kwargs,
+    ) -> GenerationResult:
+        """Generate speech (see ``_generate``), counting requests in flight.
+
+        Concurrent requests with the same text, variant, voice and
+        parameters share a single generation. It runs until the last of
+        them is cancelled; a cancelled request stops waiting right away.
+        Each request that persists stores its own copy of the audio, so
+        history entries stay independent.
+
+        The model is leased for the whole generation, so a variant being
+        switched away from isn't unloaded underneath it.
+
+        With ``discard_reference`` the uploaded ``reference_audio_path`` is
+        deleted once nothing reads it any more: when the generation started
+        for it has finished, even if this request left early.
+        """
+        self.in_flight += 1
+        owned = None  # reference this request deletes itself
+        try:
+            key = await self._flight_key(text, variant, kwargs)
+            flight = self._flights.get(key)
+            if flight is None:
+                token = CancelToken()
+                task = asyncio.ensure_future(
+                    self._run_flight(key, token, text, variant, kwargs, persist, discard_reference)
+                )
+                # Retrieve the outcome even when every waiter has left
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                flight = self._flights[key] = _Flight(task, token)
+            else:
+                self.coalesced += 1
+                logger.info(f"Coalesced request into running generation ({flight.waiters} waiting)")
+                if discard_reference:
+                    owned = kwargs.get("reference_audio_path")
+            result = await self._join(flight, cancel)
+        finally:
+            self.in_flight -= 1
+            if owned:
+                await self._audio_store.delete_reference(owned)
+
+        filename = await self._audio_store.save_generated(result.audio_bytes, result.peaks) if persist else None
+        return replace(
+            result, audio_filename=filename, audio_bytes=result.audio_bytes if inline else None, peaks=None,
+        )
+
+    async def _flight_key(self, text: str, variant: str, kwargs: dict) -> str:
+        """Identity of a generation: uploads of the same voice under different names match."""
+        voice = ""
+        if ref := kwargs.get("reference_audio_path"):
+            try:
+                voice = await asyncio.get_event_loop().run_in_executor(
+                    None, voice_id, str(self._audio_store.reference_path(ref)),
+                )
+            except OSError:
+                voice = ref
+        params = {k: v for k, v in kwargs.items() if k != "reference_audio_path"}
+        return PhraseCache.key(text, variant, voice, params)
+
+    async def _run_flight(
+        self, key: str, token: CancelToken, text: str, variant: str, kwargs: dict,
+        peaks: bool, discard_reference: bool,
+    ):
+        try:
+            async with self._model_manager.lease(variant) as model:
+                return await self._generate(model, text, variant, cancel=token, peaks=peaks, **kwargs)
+        finally:
+            self._flights.pop(key, None)
+            if discard_reference and kwargs.get("reference_audio_path"):
+                await self._audio_store.delete_reference(kwargs["reference_audio_path"])
+
+    async def _join(self, flight: _Flight, cancel: CancelToken | None) -> GenerationResult:
+        """Wait for ``flight``; leaving (cancel) releases this request's reference."""
+        loop = asyncio.get_event_loop()
+        waiter = loop.create_future()
+        flight.waiters += 1
+        left = False
+
+        def leave(reason: str):
+            nonlocal left
+            if left:
+                return
+            left = True
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.token.cancel(reason)
+            if not waiter.done():
+                waiter.set_exception(GenerationCancelled(reason))
+
+        def settle(task: asyncio.Task):
+            if waiter.done():
+                return
+            if task.cancelled():
+                waiter.set_exception(GenerationCancelled("cancelled"))
+            elif task.exception() is not None:
+                waiter.set_exception(task.exception())
+            else:
+                waiter.set_result(task.result())
+
+        def on_cancel():
+            loop.call_soon_threadsafe(leave, cancel.reason or "cancelled")
+
+        flight.task.add_done_callback(settle)
+        if cancel:
+            cancel.on_cancel(on_cancel)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            leave("cancelled")
+            raise
+        finally:
+            # Long-lived tokens (a project render) join many flights
+            if cancel:
+                cancel.remove_callback(on_cancel)
+
+    async def _generate(
+        self,
+        model,
+        text: str,
+        variant: str,
         language: str | None = None,
         exaggeration: float = 0.5,
         cfg_weight: float = 0.5,
@@ -42,11 +230,44 @@ class TTSEngine:
         speed: float = 1.0,
         reference_audio_path: str | None = None,
         ref_text: str | None = None,
+        use_phrase_cache: bool = False,
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        postprocess: bool = POSTPROCESS_ENABLED,
+        target_lufs: float = TARGET_LOUDNESS_LUFS,
+        cancel: CancelToken | None = None,
+        deadline_seconds: float | None = DEFAULT_GENERATION_DEADLINE_SECONDS,
+        on_limit: str = DEFAULT_ON_LIMIT,
+        peaks: bool = False,
     ) -> GenerationResult:
-        """Generate speech and save to file."""
-        model = self._model_manager.get_model(variant)
-        if model is None:
-            raise RuntimeError(f"Model {variant} is not loaded")
+        """Generate speech, returning the encoded WAV in ``audio_bytes``.
+
+        With ``use_phrase_cache`` the text is split into segments, cached
+        segments are reused and only the misses are synthesized.
+        ``output_profile`` selects the delivered sample rate and encoding
+        (see ``OUTPUT_PROFILES``). With ``peaks`` the waveform peaks are
+        computed from the samples too, so storing the audio doesn't read it
+        back.
+
+        ``postprocess`` trims silence, normalizes to ``target_lufs`` and
+        limits peaks. Variants without native speed control are
+        time-stretched to ``speed`` regardless.
+
+        ``cancel`` is checked between model yields; once cancelled,
+        ``GenerationCancelled`` is raised.
+
+        Generation stops once it runs past ``deadline_seconds`` or produces
+        more than ``MAX_AUDIO_SECONDS_PER_CHAR`` of audio per input
+        character. With ``on_limit="error"`` that raises
+        ``GenerationLimitExceeded``; with ``"partial"`` the audio generated
+        so far is returned and ``limit_reached`` says why it is short.
+        """
+        from backend.services.audio_postprocess import PostProcessConfig, PostProcessor
+
+        profile = OUTPUT_PROFILES.get(output_profile)
+        if profile is None:
+            raise ValueError(f"Unknown output profile: {output_profile}")
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"Speed must be between {MIN_SPEED:g} and {MAX_SPEED:g}, got {speed:g}")
 
         ref_path = None
         if reference_audio_path:
@@ -58,41 +279,135 @@ class TTSEngine:
                 ref_path = str(default_ref)
 
         sample_rate = QWEN_SAMPLE_RATE if is_qwen_variant(variant) else SAMPLE_RATE
+        native_speed = backend_for(variant).native_speed(variant)
+        post = PostProcessor(PostProcessConfig(
+            trim_silence=postprocess,
+            trim_threshold_db=TRIM_SILENCE_THRESHOLD_DB,
+            normalize_loudness=postprocess,
+            target_lufs=target_lufs,
+            limit_peaks=postprocess,
+            peak_ceiling_db=PEAK_CEILING_DB,
+            stretch_rate=1.0 if native_speed else speed,
+        ), sample_rate)
+        loop = asyncio.get_event_loop()
 
         start_time = time.time()
-
-        audio_array = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: self._generate_sync(
-                model, variant, text, language, exaggeration, cfg_weight,
-                temperature, speed, ref_path, ref_text,
-            ),
+        limits = GenerationLimits(
+            sample_rate=sample_rate,
+            deadline=time.monotonic() + deadline_seconds if deadline_seconds else None,
+            # Slower native speech legitimately produces more audio per char.
+            audio_seconds_per_char=MAX_AUDIO_SECONDS_PER_CHAR / min(speed, 1.0)
+            if native_speed else MAX_AUDIO_SECONDS_PER_CHAR,
+            partial=on_limit == "partial",
         )
 
-        generation_time = time.time() - start_time
+        def synthesize(segment: str) -> tuple[np.ndarray, str | None]:
+            return self._generate_sync(
+                model, variant, segment, language, exaggeration, cfg_weight,
+                temperature, speed, ref_path, ref_text, cancel, limits,
+            )
 
-        filename = self._audio_store.new_generated_filename()
-        output_path = self._audio_store.generated_path(filename)
+        cache_stats = {}
+        if use_phrase_cache and self._phrase_cache is not None:
+            params = {
+                "language": language, "exaggeration": exaggeration, "cfg_weight": cfg_weight,
+                "temperature": temperature, "speed": speed, "ref_text": ref_text,
+            }
+            audio_np, cache_stats = await loop.run_in_executor(
+                None, lambda: self._generate_segmented(
+                    text, variant, ref_path, params, sample_rate, synthesize,
+                ),
+            )
+        else:
+            audio_np, limit = await loop.run_in_executor(None, lambda: synthesize(text))
+            if limit:
+                cache_stats["limit_reached"] = limit
 
-        audio_np = np.array(audio_array, dtype=np.float32)
-        if audio_np.ndim > 1:
-            audio_np = audio_np.squeeze()
+        generation_time = time.time() - start_time
+        if cancel:
+            cancel.raise_if_cancelled()
 
-        await asyncio.get_event_loop().run_in_executor(
-            None, lambda: sf.write(str(output_path), audio_np, sample_rate)
+        out_rate = profile["sample_rate"] or sample_rate
+        audio_np, audio_bytes, peak_bytes = await loop.run_in_executor(
+            None, lambda: self._render_output(
+                post.process(audio_np), sample_rate, out_rate, profile["encoding"], peaks,
+            ),
         )
-
-        duration = len(audio_np) / sample_rate
+        duration = len(audio_np) / out_rate
 
         logger.info(f"Generated {duration:.1f}s audio with {variant} in {generation_time:.1f}s")
 
         return GenerationResult(
-            audio_filename=filename,
+            audio_filename=None,
             duration_seconds=round(duration, 2),
             generation_time_seconds=round(generation_time, 2),
-            sample_rate=sample_rate,
+            sample_rate=out_rate,
+            audio_format=profile["encoding"],
+            audio_bytes=audio_bytes,
+            peaks=peak_bytes,
+            postprocess_ms={k: round(v, 2) for k, v in post.timings.items()} or None,
+            **cache_stats,
         )
 
+    def _render_output(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        out_rate: int,
+        encoding: str,
+        peaks: bool,
+    ) -> tuple[np.ndarray, memoryview, bytes | None]:
+        """Resample and encode generated audio, with its waveform peaks if asked (thread pool)."""
+        from backend.services import audio_dsp
+        from backend.services.waveform_peaks import compute_peaks
+
+        audio = audio_dsp.resample(audio, sample_rate, out_rate)
+        audio_bytes = audio_dsp.encode_wav(audio, out_rate, encoding)
+        return audio, audio_bytes, compute_peaks(audio, out_rate) if peaks else None
+
+    def _generate_segmented(
+        self,
+        text: str,
+        variant: str,
+        ref_path: str | None,
+        params: dict,
+        sample_rate: int,
+        synthesize,
+    ):
+        """Serve segments from the phrase cache, synthesizing only misses (thread pool)."""
+        from backend.services import audio_dsp
+
+        cache = self._phrase_cache
+        voice = voice_id(ref_path)
+        segments = split_segments(text) or [text]
+        chunks = []
+        cached = cached_chars = 0
+        limit = None
+        for segment in segments:
+            key = cache.key(segment, variant, voice, params)
+            audio = cache.get(key)
+            if audio is None:
+                audio, limit = synthesize(segment)
+                if limit is None:
+                    cache.put(key, audio)
+            else:
+                cached += 1
+                cached_chars += len(segment)
+            chunks.append(audio)
+            if limit:
+                break
+
+        total_chars = sum(len(s) for s in segments)
+        logger.info(f"Phrase cache: {cached}/{len(segments)} segments reused")
+        stats = {
+            "segments_total": len(segments),
+            "segments_cached": cached,
+            "cache_hit_ratio": round(cached_chars / total_chars, 3) if total_chars else 0.0,
+        }
+        if limit:
+            stats["limit_reached"] = limit
+        return audio_dsp.crossfade_concat(chunks, sample_rate, PHRASE_CROSSFADE_MS), stats
+
     @staticmethod
     def _generate_sync(
         model,
@@ -105,35 +420,54 @@ class TTSEngine:
         speed: float,
         ref_path: str | None,
         ref_text: str | None,
-    ) -> mx.array:
-        """Synchronous generation — runs in thread pool."""
-        if is_qwen_variant(variant):
-            # Qwen3-TTS generation path
-            lang_code = QWEN_LANGUAGES.get(language or "en", "english")
-            kwargs: dict = {
-                "text": text,
-                "lang_code": lang_code,
-                "temperature": temperature,
-                "speed": speed,
-            }
-            if ref_path:
-                kwargs["ref_audio"] = ref_path
-            if ref_text:
-                kwargs["ref_text"] = ref_text
-        else:
-            # Chatterbox turbo generation path
-            kwargs = {
-                "text": text,
-                "temperature": temperature,
-            }
-            if ref_path:
-                kwargs["ref_audio"] = ref_path
+        cancel: CancelToken | None = None,
+        limits: GenerationLimits | None = None,
+    ) -> tuple[np.ndarray, str | None]:
+        """Synchronous generation — runs in thread pool.
 
-        result = None
-        for result in model.generate(**kwargs):
-            pass
+        Returns mono float32 audio of all yielded segments and the limit
+        that cut it short, if any. Stops between yields (closing the model's
+        generator) once ``cancel`` is set or a limit is breached.
+        """
+        import numpy as np
+
+        from backend.services import audio_dsp
+
+        chunks: list[np.ndarray] = []
+        samples = 0
+        max_samples = limits.max_samples(text) if limits else None
+        limit = None
+        stream = backend_for(variant).generate(
+            model, variant, text, language=language, exaggeration=exaggeration, cfg_weight=cfg_weight,
+            temperature=temperature, speed=speed, ref_path=ref_path, ref_text=ref_text,
+        )
+        try:
+            for audio in stream:
+                if cancel:
+                    cancel.raise_if_cancelled()
+                chunk = audio_dsp.to_mono_f32(audio)
+                chunks.append(chunk)
+                samples += len(chunk)
+                if max_samples is not None and samples > max_samples:
+                    limit = "audio_length"
+                    break
+                if limits and limits.deadline is not None and time.monotonic() > limits.deadline:
+                    limit = "deadline"
+                    break
+        finally:
+            stream.close()
 
-        if result is None:
+        if not chunks:
             raise RuntimeError("Model generated no audio")
 
-        return result.audio
+        if limit and not limits.partial:
+            if limit == "deadline":
+                raise GenerationLimitExceeded(limit, "Generation exceeded its deadline")
+            raise GenerationLimitExceeded(
+                limit, f"Generation produced over {max_samples / limits.sample_rate:.1f}s of audio "
+                f"for {len(text)} characters",
+            )
+        audio = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+        if limit == "audio_length":
+            audio = audio[:max_samples]
+        return audio, limit
@@ -0,0 +1,97 @@
+"""Multi-resolution min/max waveform peaks.
+
+A ``.peaks`` file stored next to each generated WAV lets clients draw
+waveforms from a few kilobytes instead of downloading and decoding the
+audio. Layout (little-endian)::
+
+    header  "LQPK" | u16 version | u32 sample_rate | u32 n_samples | u16 n_levels
+    level   u32 samples_per_peak | u32 n_peaks | n_peaks x (i8 min, i8 max)
+
+Levels go from finest to coarsest, each ``PEAK_LEVEL_FACTOR`` times coarser
+than the previous one.
+
+Imported lazily, like ``audio_dsp``.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import BinaryIO
+
+import numpy as np
+
+MAGIC = b"LQPK"
+VERSION = 1
+BASE_SAMPLES_PER_PEAK = 256
+PEAK_LEVEL_FACTOR = 4
+MIN_LEVEL_PEAKS = 32  # stop adding coarser levels below this many peaks
+
+_HEADER = struct.Struct("<4sHIIH")
+_LEVEL = struct.Struct("<II")
+
+
+def _reduce(mins: np.ndarray, maxs: np.ndarray, factor: int) -> tuple[np.ndarray, np.ndarray]:
+    n = -(-len(mins) // factor)
+    pad = n * factor - len(mins)
+    mins = np.pad(mins, (0, pad), constant_values=mins[-1]).reshape(n, factor).min(axis=1)
+    maxs = np.pad(maxs, (0, pad), constant_values=maxs[-1]).reshape(n, factor).max(axis=1)
+    return mins, maxs
+
+
+def compute_peaks(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encode min/max peaks of mono float audio at every resolution.
+
+    The audio is read once for the finest level; coarser levels are
+    reduced from the level below.
+    """
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    if not len(samples):
+        return _HEADER.pack(MAGIC, VERSION, sample_rate, 0, 0)
+
+    block = BASE_SAMPLES_PER_PEAK
+    n = -(-len(samples) // block)
+    padded = np.zeros(n * block, dtype=np.float32)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(n, block)
+    mins, maxs = frames.min(axis=1), frames.max(axis=1)
+
+    levels = [(block, mins, maxs)]
+    while len(mins) >= MIN_LEVEL_PEAKS * PEAK_LEVEL_FACTOR:
+        block *= PEAK_LEVEL_FACTOR
+        mins, maxs = _reduce(mins, maxs, PEAK_LEVEL_FACTOR)
+        levels.append((block, mins, maxs))
+
+    parts = [_HEADER.pack(MAGIC, VERSION, sample_rate, len(samples), len(levels))]
+    for spp, lo, hi in levels:
+        pairs = np.empty((len(lo), 2), dtype=np.int8)
+        pairs[:, 0] = np.clip(np.floor(lo * 127), -127, 127)
+        pairs[:, 1] = np.clip(np.ceil(hi * 127), -127, 127)
+        parts.append(_LEVEL.pack(spp, len(lo)))
+        parts.append(pairs.tobytes())
+    return b"".join(parts)
+
+
+def select_level(data: bytes, min_peaks: int) -> bytes:
+    """Re-encode ``data`` with only the coarsest level that has ``min_peaks`` peaks."""
+    magic, version, sample_rate, n_samples, n_levels = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a peaks file")
+    offset = _HEADER.size
+    chosen = None
+    for _ in range(n_levels):
+        spp, count = _LEVEL.unpack_from(data, offset)
+        end = offset + _LEVEL.size + 2 * count
+        if chosen is None or count >= min_peaks:
+            chosen = data[offset:end]
+        offset = end
+    if chosen is None:
+        return data
+    return _HEADER.pack(MAGIC, VERSION, sample_rate, n_samples, 1) + chosen
+
+
+def peaks_from_file(file: str | BinaryIO) -> bytes:
+    """Compute peaks for an audio file or file-like object (any encoding soundfile reads)."""
+    import soundfile as sf
+
+    samples, sample_rate = sf.read(file, dtype="float32", always_2d=True)
+    return compute_peaks(samples.mean(axis=1), sample_rate)
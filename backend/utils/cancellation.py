@@ -0,0 +1,61 @@
+"""Cooperative cancellation for generation work running in worker threads."""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+
+class GenerationCancelled(Exception):
+    """Raised from generation code once its token has been cancelled."""
+
+    def __init__(self, reason: str = "cancelled"):
+        self.reason = reason
+        super().__init__(f"Generation cancelled ({reason})")
+
+
+class GenerationLimitExceeded(Exception):
+    """Raised when a generation breaches its deadline or output-length bound."""
+
+    def __init__(self, limit: str, detail: str):
+        self.limit = limit  # "deadline" or "audio_length"
+        super().__init__(detail)
+
+
+class CancelToken:
+    """Thread-safe flag checked by generation loops between model yields."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+        self.reason: str | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if self._event.is_set():
+            return
+        self.reason = reason
+        self._event.set()
+        for callback in list(self._callbacks):
+            callback()
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` on cancellation (immediately if already cancelled)."""
+        if self._event.is_set():
+            callback()
+        else:
+            self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """Forget a callback added with ``on_cancel`` (no-op if it isn't registered)."""
+        try:
+            self._callbacks.remove(callback)
+        except ValueError:
+            pass
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise GenerationCancelled(self.reason or "cancelled")
@@ -0,0 +1,96 @@
+"""Negotiated response compression (brotli when available, else gzip).
+
+Only complete (single-message) responses with a compressible content type
+are touched: JSON API bodies. Audio, peaks and other streamed or binary
+responses pass through unchanged.
+"""
+
+from __future__ import annotations
+
+import gzip
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+THREAD_MINIMUM_SIZE = 256 * 1024  # larger bodies are compressed off the event loop
+
+
+def _accepted(header: str) -> set[str]:
+    """Content codings the client accepts (q > 0)."""
+    accepted = set()
+    for part in header.split(","):
+        coding, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = _accepted(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = "br" if brotli is not None and "br" in accepted else "gzip" if "gzip" in accepted else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    await send(message)
+                else:
+                    start = message  # held until the body shows whether it is worth it
+                return
+            if start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            complete = message["type"] == "http.response.body" and not message.get("more_body", False)
+            if complete and len(body) >= self.minimum_size:
+                if len(body) >= THREAD_MINIMUM_SIZE:
+                    body = await anyio.to_thread.run_sync(_compress, body, encoding)
+                else:
+                    body = _compress(body, encoding)
+                headers = MutableHeaders(raw=held["headers"])
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -1,13 +1,16 @@
 """Custom exceptions and FastAPI exception handlers."""
 
+import math
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 
 class LoquiError(Exception):
-    def __init__(self, message: str, status_code: int = 500):
+    def __init__(self, message: str, status_code: int = 500, headers: dict[str, str] | None = None):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(message)
 
 
@@ -17,20 +20,63 @@ class ModelNotLoadedError(LoquiError):
         super().__init__(msg, status_code=400)
 
 
+class MemoryPressureError(LoquiError):
+    def __init__(self, detail: str):
+        super().__init__(detail, status_code=503)
+
+
 class GenerationError(LoquiError):
     def __init__(self, detail: str):
         super().__init__(f"Generation failed: {detail}", status_code=500)
 
 
+class GenerationCancelledError(LoquiError):
+    def __init__(self, job_id: str):
+        # 499: client closed request (nginx convention)
+        super().__init__(f"Generation '{job_id}' was cancelled", status_code=499)
+
+
+class GenerationLimitError(LoquiError):
+    def __init__(self, limit: str, detail: str):
+        self.limit = limit
+        super().__init__(detail, status_code=504 if limit == "deadline" else 422)
+
+
+class RateLimitedError(LoquiError):
+    def __init__(self, limit: str, retry_after: float):
+        self.limit = limit
+        seconds = max(1, math.ceil(retry_after))
+        super().__init__(
+            f"Rate limit exceeded ({limit}); retry in {seconds}s",
+            status_code=429,
+            headers={"Retry-After": str(seconds)},
+        )
+
+
+class ServiceDrainingError(LoquiError):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            "Server is shutting down; retry on another instance",
+            status_code=503,
+            headers={"Retry-After": str(retry_after), "X-Loqui-Draining": "1"},
+        )
+
+
 class HistoryNotFoundError(LoquiError):
     def __init__(self, record_id: str):
         super().__init__(f"History entry '{record_id}' not found", status_code=404)
 
 
+class ProjectNotFoundError(LoquiError):
+    def __init__(self, project_id: str):
+        super().__init__(f"Project '{project_id}' not found", status_code=404)
+
+
 def register_exception_handlers(app: FastAPI):
     @app.exception_handler(LoquiError)
     async def loqui_error_handler(request: Request, exc: LoquiError):
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.message},
+            headers=exc.headers,
         )
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Minimal HuggingFace Hub stand-in that serves repos from a local directory.
+
+Implements just enough of the hub API for ``ModelPrefetcher``: the revision
+listing with blob checksums and ranged file downloads. Useful for offline
+mirrors and for exercising downloads without network access::
+
+    python -m backend.utils.hub_mirror /srv/models --port 8900
+    HF_ENDPOINT=http://127.0.0.1:8900 python -m backend.download_models turbo-4bit
+
+Repos live at ``ROOT/<org>/<name>/``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+LFS_THRESHOLD = 10 * 1024 * 1024  # files above this are described as LFS
+_API_RE = re.compile(r"^/api/models/([^/]+/[^/]+)/revision/([^/]+)$")
+_RESOLVE_RE = re.compile(r"^/([^/]+/[^/]+)/resolve/([^/]+)/(.+)$")
+
+
+@lru_cache(maxsize=1024)
+def _checksums(path: str, size: int, mtime: float) -> tuple[str, str]:
+    """Return (git blob sha1, sha256) for a file, cached by size and mtime."""
+    sha1 = hashlib.sha1(f"blob {size}\0".encode())
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1024 * 1024):
+            sha1.update(chunk)
+            sha256.update(chunk)
+    return sha1.hexdigest(), sha256.hexdigest()
+
+
+def _manifest(repo_dir: Path) -> dict:
+    siblings = []
+    for f in sorted(p for p in repo_dir.rglob("*") if p.is_file()):
+        st = f.stat()
+        blob_id, sha256 = _checksums(str(f), st.st_size, st.st_mtime)
+        entry = {"rfilename": f.relative_to(repo_dir).as_posix(), "size": st.st_size, "blobId": blob_id}
+        if st.st_size > LFS_THRESHOLD:
+            entry["lfs"] = {"sha256": sha256, "size": st.st_size}
+        siblings.append(entry)
+    commit = hashlib.sha1(json.dumps(siblings).encode()).hexdigest()
+    return {"id": repo_dir.parent.name + "/" + repo_dir.name, "sha": commit, "siblings": siblings}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    root: Path
+
+    def do_GET(self):
+        path = unquote(urlparse(self.path).path)
+        if m := _API_RE.match(path):
+            repo_dir = self.root / m.group(1)
+            if not repo_dir.is_dir():
+                return self.send_error(404, "Repository not found")
+            body = json.dumps(_manifest(repo_dir)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if m := _RESOLVE_RE.match(path):
+            file = (self.root / m.group(1) / m.group(3)).resolve()
+            if not file.is_file() or self.root.resolve() not in file.parents:
+                return self.send_error(404, "Entry not found")
+            return self._send_file(file)
+        self.send_error(404)
+
+    def _send_file(self, file: Path):
+        size = file.stat().st_size
+        start = 0
+        if m := re.match(r"bytes=(\d+)-$", self.headers.get("Range", "")):
+            start = min(int(m.group(1)), size)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size - start))
+        self.end_headers()
+        with open(file, "rb") as fh:
+            fh.seek(start)
+            while chunk := fh.read(1024 * 1024):
+                self.wfile.write(chunk)
+
+
+def serve(root: Path, host: str = "127.0.0.1", port: int = 8900) -> ThreadingHTTPServer:
+    """Create a mirror server for ``root``. Call ``serve_forever`` to run it."""
+    handler = type("HubMirrorHandler", (_Handler,), {"root": root})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve local repos with the HF Hub download API")
+    parser.add_argument("root", type=Path, help="Directory containing <org>/<name> repos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+
+    server = serve(args.root, args.host, args.port)
+    print(f"Serving {args.root} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
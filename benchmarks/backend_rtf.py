@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Real-time factor of each inference backend.
+
+Loads ``--variant`` on every backend in ``--backends``, warms it up, then
+times ``--runs`` generations of ``--text``. Reports the median real-time
+factor (generation time / audio duration; below 1 is faster than real
+time)::
+
+    python benchmarks/backend_rtf.py --variant turbo-4bit --backends mlx,cpu --threads 8
+
+Backends whose runtime isn't installed are reported and skipped. Exits 1 if
+no backend ran, or if one is slower than ``--max-rtf``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_TEXT = (
+    "The quick brown fox jumps over the lazy dog. "
+    "Meanwhile, the weather report promised clear skies for the rest of the week."
+)
+
+
+def measure(backend_name: str, variant: str, text: str, runs: int, ref_path: str | None) -> tuple[float, float]:
+    """Median generation seconds and audio seconds for one backend."""
+    import numpy as np
+
+    from backend import config
+    from backend.services import audio_dsp
+    from backend.services.inference import get_backend
+
+    config.MODEL_BACKENDS[variant] = backend_name
+    backend = get_backend(backend_name)
+    backend.import_runtime()
+    model = backend.load(variant)
+
+    def run() -> float:
+        chunks = [
+            audio_dsp.to_mono_f32(a)
+            for a in backend.generate(model, variant, text, language="en", ref_path=ref_path)
+        ]
+        return len(np.concatenate(chunks)) / config.SAMPLE_RATE
+
+    run()  # warm-up
+    times, durations = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        durations.append(run())
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variant", default="turbo-4bit")
+    parser.add_argument("--backends", default="mlx,cpu", help="Comma-separated backends to compare")
+    parser.add_argument("--text", default=DEFAULT_TEXT)
+    parser.add_argument("--ref-audio", help="Reference clip (required by Qwen on the CPU backend)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="CPU backend threads (0: PyTorch default)")
+    parser.add_argument("--max-rtf", type=float, default=None, help="Fail if any backend is slower than this")
+    args = parser.parse_args()
+
+    # Read by backend.config at import
+    os.environ["LOQUI_CPU_THREADS"] = str(args.threads)
+
+    results = {}
+    for name in args.backends.split(","):
+        try:
+            gen, audio = measure(name, args.variant, args.text, args.runs, args.ref_audio)
+        except ImportError as e:
+            print(f"{name:>4}: skipped ({e})")
+            continue
+        results[name] = gen / audio
+        print(f"{name:>4}: {audio:.1f}s audio in {gen:.2f}s  RTF {gen / audio:.3f}  ({audio / gen:.1f}x real time)")
+
+    failures = []
+    if not results:
+        failures.append("no backend could run")
+    if args.max_rtf is not None:
+        failures += [f"{name} RTF {rtf:.3f} > {args.max_rtf}" for name, rtf in results.items() if rtf > args.max_rtf]
+    if len(results) > 1:
+        fastest = min(results, key=results.get)
+        for name, rtf in results.items():
+            if name != fastest:
+                print(f"{fastest} is {rtf / results[fastest]:.1f}x faster than {name}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
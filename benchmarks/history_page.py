@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""CPU time and bytes per history page: per-row Pydantic vs. projected rows.
+
+Seeds a throwaway database with ``--rows`` generations (texts up to 5000
+characters) and times one page of ``--limit`` items through each path,
+from the query to the bytes on the wire::
+
+    python benchmarks/history_page.py --limit 200
+
+``legacy`` builds a ``HistoryEntryResponse`` per row and serializes via
+``jsonable_encoder`` + ``json.dumps``; ``full`` selects every column as
+plain rows and serializes with orjson; ``list view`` additionally projects
+to the fields the UI list needs and truncates the text. Sizes are reported
+raw, gzip and (if installed) brotli. Exits 1 if the list view isn't at
+least ``--min-speedup`` times cheaper than legacy in CPU time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["LOQUI_DATA_DIR"] = tempfile.mkdtemp(prefix="loqui-bench-")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from backend.db.database import async_session, init_db  # noqa: E402
+from backend.db.models import GenerationRecord  # noqa: E402
+from backend.schemas.history import HistoryEntryResponse, HistoryListResponse  # noqa: E402
+from backend.services.audio_store import AudioStore  # noqa: E402
+from backend.services.history_service import HistoryService  # noqa: E402
+from backend.utils.compression import brotli  # noqa: E402
+from backend.utils.responses import dumps  # noqa: E402
+
+LIST_FIELDS = ["id", "text", "model_variant", "duration_seconds", "created_at"]
+WORDS = "the quick brown fox jumps over a lazy dog while narrating long form audio".split()
+
+
+async def seed(rows: int, rng: random.Random):
+    await init_db()
+    async with async_session() as session:
+        for _ in range(rows):
+            n = rng.choice([8, 40, 200, 900])
+            text = " ".join(rng.choice(WORDS) for _ in range(n))[:5000]
+            session.add(GenerationRecord(
+                text=text, model_variant="turbo-4bit", language="en", exaggeration=0.5,
+                cfg_weight=0.5, temperature=0.8, duration_seconds=rng.uniform(1, 120),
+                generation_time_seconds=rng.uniform(0.5, 30), audio_filename=f"{rng.getrandbits(64):x}.wav",
+                sample_rate=24000, audio_format="pcm16",
+            ))
+        await session.commit()
+
+
+async def legacy(svc: HistoryService, limit: int) -> bytes:
+    async with async_session() as session:
+        records, total = await svc.list(session, limit=limit)
+    items = [
+        HistoryEntryResponse(
+            id=r.id, text=r.text, model_variant=r.model_variant, language=r.language,
+            exaggeration=r.exaggeration, cfg_weight=r.cfg_weight, duration_seconds=r.duration_seconds,
+            generation_time_seconds=r.generation_time_seconds, sample_rate=r.sample_rate,
+            audio_format=r.audio_format, audio_url=f"/api/audio/{r.audio_filename}", created_at=r.created_at,
+        )
+        for r in records
+    ]
+    content = jsonable_encoder(HistoryListResponse(items=items, total=total))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def projected(svc: HistoryService, limit: int, columns: list[str], text_limit: int | None) -> bytes:
+    async with async_session() as session:
+        rows, total = await svc.list_columns(session, columns, limit=limit, text_limit=text_limit)
+    return dumps({"items": rows, "total": total})
+
+
+async def cpu_ms(repeats: int, fn, *args) -> tuple[float, bytes]:
+    best, body = float("inf"), b""
+    for _ in range(repeats):
+        start = time.process_time()
+        body = await fn(*args)
+        best = min(best, (time.process_time() - start) * 1000)
+    return best, body
+
+
+async def run(args) -> int:
+    await seed(args.rows, random.Random(0))
+    svc = HistoryService(AudioStore())
+    all_columns = [f for f in HistoryEntryResponse.model_fields if f not in ("audio_url", "peaks_url")]
+    results = {
+        "legacy": await cpu_ms(args.repeats, legacy, svc, args.limit),
+        "full": await cpu_ms(args.repeats, projected, svc, args.limit, all_columns, None),
+        "list view": await cpu_ms(args.repeats, projected, svc, args.limit, LIST_FIELDS, args.text_limit),
+    }
+
+    print(f"{args.limit} items per page")
+    for name, (ms, body) in results.items():
+        sizes = f"{len(body) / 1024:7.1f} KB raw  {len(gzip.compress(body, 6)) / 1024:6.1f} KB gzip"
+        if brotli is not None:
+            sizes += f"  {len(brotli.compress(body, quality=4)) / 1024:6.1f} KB br"
+        print(f"{name:>10}: {ms:6.2f} ms CPU  {sizes}")
+
+    speedup = results["legacy"][0] / max(results["list view"][0], 1e-6)
+    print(f"\nlist view: {speedup:.1f}x less CPU than legacy (target {args.min_speedup:.1f}x)")
+    return 0 if speedup >= args.min_speedup else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="Generations to seed")
+    parser.add_argument("--limit", type=int, default=200, help="Items per page")
+    parser.add_argument("--text-limit", type=int, default=120, help="Text truncation for the list view")
+    parser.add_argument("--min-speedup", type=float, default=2.0)
+    parser.add_argument("--repeats", type=int, default=10)
+    try:
+        code = asyncio.run(run(parser.parse_args()))
+    finally:
+        shutil.rmtree(os.environ["LOQUI_DATA_DIR"], ignore_errors=True)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Peak memory per request: legacy disk round trip vs. the persisted / inline paths.
+
+Simulates a model output buffer of ``--seconds`` of 24 kHz audio shaped like
+MLX output (``(1, N)`` float32) and measures the peak Python/NumPy allocation
+of each post-generation path with ``tracemalloc``. The persisted path also
+builds the waveform peaks the legacy path never had, so only ``inline`` is
+expected to stay below legacy::
+
+    python benchmarks/inline_memory.py --seconds 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services import audio_dsp  # noqa: E402
+from backend.services.waveform_peaks import compute_peaks  # noqa: E402
+
+SAMPLE_RATE = 24000
+
+
+def legacy(model_output: np.ndarray, path: Path) -> None:
+    """Previous path: copy, squeeze, write to disk, read back for serving."""
+    audio_np = np.array(model_output, dtype=np.float32)
+    if audio_np.ndim > 1:
+        audio_np = audio_np.squeeze()
+    sf.write(str(path), audio_np, SAMPLE_RATE)
+    path.read_bytes()
+
+
+def persisted(model_output: np.ndarray, path: Path) -> None:
+    """Current default path: encode once, peaks from the samples, write the bytes."""
+    audio = audio_dsp.to_mono_f32(model_output)
+    data = audio_dsp.encode_wav(audio, SAMPLE_RATE)
+    peaks = compute_peaks(audio, SAMPLE_RATE)
+    path.write_bytes(data)
+    path.with_suffix(".peaks").write_bytes(peaks)
+
+
+def inline(model_output: np.ndarray, path: Path) -> None:
+    """``return=inline`` without persistence: encode once in memory."""
+    audio_dsp.encode_wav(audio_dsp.to_mono_f32(model_output), SAMPLE_RATE)
+
+
+def peak_bytes(fn, model_output: np.ndarray, path: Path) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(model_output, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60.0, help="Audio length to simulate")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    model_output = (rng.standard_normal((1, int(args.seconds * SAMPLE_RATE))) * 0.1).astype(np.float32)
+    print(f"model output: {model_output.nbytes / 1e6:.1f} MB ({args.seconds:.0f}s @ {SAMPLE_RATE} Hz)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out.wav"
+        results = {name: peak_bytes(fn, model_output, path) for name, fn in
+                   (("legacy", legacy), ("persisted", persisted), ("inline", inline))}
+
+    base = results["legacy"]
+    for name, peak in results.items():
+        print(f"{name:>10}: peak {peak / 1e6:7.1f} MB  ({peak / base:5.0%} of legacy)")
+    sys.exit(0 if results["inline"] < base else 1)
+
+
+if __name__ == "__main__":
+    main()
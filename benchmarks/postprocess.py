@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Post-processing overhead relative to the model's real-time factor.
+
+Synthesizes ``--seconds`` of speech-like 24 kHz audio (modulated harmonics
+separated by pauses, with leading / trailing silence), runs every stage and
+reports per-stage time. Overhead is expressed against the time the model
+itself needs for that audio (``--model-rtf`` x duration)::
+
+    python benchmarks/postprocess.py --seconds 60 --model-rtf 0.3
+
+Exits 1 if trim + loudness + limit exceed ``--budget`` percent of generation
+time. Time-stretch is reported separately since it only runs for variants
+without native speed control.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.audio_postprocess import PostProcessConfig, PostProcessor  # noqa: E402
+
+SAMPLE_RATE = 24000
+
+
+def speech_like(seconds: float, rng: np.random.Generator) -> np.ndarray:
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    pauses = (np.sin(2 * np.pi * 0.25 * t) > -0.7).astype(np.float64)
+    audio = 0.2 * voice * syllables * pauses + 0.002 * rng.standard_normal(n)
+    silence = np.zeros(SAMPLE_RATE // 2)
+    return np.concatenate([silence, audio, silence]).astype(np.float32)
+
+
+def best_of(repeats: int, config: PostProcessConfig, audio: np.ndarray) -> dict[str, float]:
+    best: dict[str, float] = {}
+    for _ in range(repeats):
+        post = PostProcessor(config, SAMPLE_RATE)
+        post.process(audio)
+        for stage, ms in post.timings.items():
+            best[stage] = min(ms, best.get(stage, ms))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60.0, help="Audio length to simulate")
+    parser.add_argument("--model-rtf", type=float, default=0.3,
+                        help="Model generation time per second of audio")
+    parser.add_argument("--speed", type=float, default=1.2, help="Time-stretch rate to measure")
+    parser.add_argument("--budget", type=float, default=3.0, help="Max overhead in percent")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    audio = speech_like(args.seconds, np.random.default_rng(0))
+    generation_ms = args.seconds * args.model_rtf * 1000
+    print(f"{args.seconds:.0f}s audio, model RTF {args.model_rtf} -> {generation_ms / 1000:.1f}s generation")
+
+    timings = best_of(args.repeats, PostProcessConfig(), audio)
+    timings["stretch"] = best_of(args.repeats, PostProcessConfig(
+        trim_silence=False, normalize_loudness=False, limit_peaks=False, stretch_rate=args.speed,
+    ), audio)["stretch"]
+
+    for stage, ms in timings.items():
+        print(f"{stage:>10}: {ms:8.1f} ms  ({ms / generation_ms:6.2%} of generation)")
+
+    overhead = sum(ms for stage, ms in timings.items() if stage != "stretch") / generation_ms * 100
+    print(f"\ndefault stages: {overhead:.2f}% (budget {args.budget:.1f}%)")
+    sys.exit(0 if overhead <= args.budget else 1)
+
+
+if __name__ == "__main__":
+    main()
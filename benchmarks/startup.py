@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Import-time and startup budget check.
+
+Fails (exit code 1) if importing ``backend.main`` pulls in the ML stack, or
+if import / time-to-healthy exceeds the budget::
+
+    python benchmarks/startup.py --import-budget 1.0 --startup-budget 3.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("mlx", "mlx_audio", "torch", "numpy", "soundfile")
+
+_IMPORT_PROBE = f"""
+import json, sys, time
+t = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(runs: int) -> tuple[float, list[str]]:
+    """Median wall time of ``import backend.main`` in fresh interpreters."""
+    times, heavy = [], set()
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        heavy.update(result["heavy"])
+    return statistics.median(times), sorted(heavy)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_startup(timeout: float = 30.0) -> float:
+    """Seconds from process spawn until ``/api/system/health`` answers."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/system/health"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"Server not healthy after {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Import measurements to take")
+    parser.add_argument("--import-budget", type=float, default=1.0, help="Max seconds to import backend.main")
+    parser.add_argument("--startup-budget", type=float, default=3.0, help="Max seconds until healthy")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure import time")
+    args = parser.parse_args()
+
+    failures = []
+    seconds, heavy = measure_import(args.runs)
+    print(
+        f"import backend.main: {seconds * 1000:.0f} ms "
+        f"(median of {args.runs}, budget {args.import_budget * 1000:.0f} ms)"
+    )
+    if heavy:
+        failures.append(f"heavy modules imported eagerly: {', '.join(heavy)}")
+    if seconds > args.import_budget:
+        failures.append("import budget exceeded")
+
+    if not args.skip_server:
+        startup = measure_startup()
+        print(f"time to healthy:     {startup * 1000:.0f} ms (budget {args.startup_budget * 1000:.0f} ms)")
+        if startup > args.startup_budget:
+            failures.append("startup budget exceeded")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
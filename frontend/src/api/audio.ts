@@ -0,0 +1,24 @@
+import type { WaveformPeaks } from '../types'
+
+// Binary layout written by backend/services/waveform_peaks.py
+const HEADER_SIZE = 16
+const LEVEL_HEADER_SIZE = 8
+
+export async function fetchPeaks(peaksUrl: string, minPeaks: number): Promise<WaveformPeaks> {
+  const res = await fetch(`${peaksUrl}?min_peaks=${minPeaks}`)
+  if (!res.ok) throw new Error(`Peaks request failed: ${res.status}`)
+  const buf = await res.arrayBuffer()
+  const view = new DataView(buf)
+  const sampleRate = view.getUint32(6, true)
+  const nSamples = view.getUint32(10, true)
+  const samplesPerPeak = view.getUint32(HEADER_SIZE, true)
+  const count = view.getUint32(HEADER_SIZE + 4, true)
+  const pairs = new Int8Array(buf, HEADER_SIZE + LEVEL_HEADER_SIZE, count * 2)
+  const min = new Float32Array(count)
+  const max = new Float32Array(count)
+  for (let i = 0; i < count; i++) {
+    min[i] = pairs[2 * i] / 127
+    max[i] = pairs[2 * i + 1] / 127
+  }
+  return { sampleRate, duration: nSamples / sampleRate, samplesPerPeak, min, max }
+}
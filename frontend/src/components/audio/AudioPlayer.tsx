@@ -26,6 +26,7 @@ export function AudioPlayer() {
 
       <Waveform
         url={lastGeneration.audio_url}
+        peaksUrl={lastGeneration.peaks_url}
         onReady={setDuration}
         onTimeUpdate={setCurrentTime}
         onFinish={onFinish}
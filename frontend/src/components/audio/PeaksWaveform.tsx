@@ -0,0 +1,53 @@
+import { useEffect, useState } from 'react'
+import { fetchPeaks } from '../../api/audio'
+import type { WaveformPeaks } from '../../types'
+
+interface Props {
+  peaksUrl: string
+  bars?: number
+  height?: number
+  progress?: number
+}
+
+// Static waveform drawn from precomputed peaks (a few KB) instead of the WAV
+export function PeaksWaveform({ peaksUrl, bars = 80, height = 24, progress = 0 }: Props) {
+  const [peaks, setPeaks] = useState<WaveformPeaks | null>(null)
+
+  useEffect(() => {
+    let cancelled = false
+    fetchPeaks(peaksUrl, bars).then((p) => { if (!cancelled) setPeaks(p) }).catch(() => {})
+    return () => { cancelled = true }
+  }, [peaksUrl, bars])
+
+  if (!peaks || !peaks.max.length) return <div style={{ height }} />
+
+  const perBar = peaks.max.length / bars
+  const mid = height / 2
+  return (
+    <svg width="100%" height={height} viewBox={`0 0 ${bars * 3} ${height}`} preserveAspectRatio="none">
+      {Array.from({ length: bars }, (_, i) => {
+        const start = Math.floor(i * perBar)
+        const end = Math.max(start + 1, Math.floor((i + 1) * perBar))
+        let lo = 0
+        let hi = 0
+        for (let j = start; j < end && j < peaks.max.length; j++) {
+          lo = Math.min(lo, peaks.min[j])
+          hi = Math.max(hi, peaks.max[j])
+        }
+        const top = mid - Math.max(hi, 0.02) * mid
+        const h = Math.max((hi - lo) * mid, 1)
+        return (
+          <rect
+            key={i}
+            x={i * 3}
+            y={top}
+            width={2}
+            height={h}
+            rx={1}
+            fill={i / bars < progress ? '#1c1917' : '#d6d3d1'}
+          />
+        )
+      })}
+    </svg>
+  )
+}
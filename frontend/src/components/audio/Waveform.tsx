@@ -1,15 +1,17 @@
 import { useRef, useEffect, useState } from 'react'
 import WaveSurfer from 'wavesurfer.js'
+import { fetchPeaks } from '../../api/audio'
 
 interface Props {
   url: string
+  peaksUrl?: string | null
   onReady?: (duration: number) => void
   onTimeUpdate?: (time: number) => void
   onFinish?: () => void
   isPlaying?: boolean
 }
 
-export function Waveform({ url, onReady, onTimeUpdate, onFinish, isPlaying }: Props) {
+export function Waveform({ url, peaksUrl, onReady, onTimeUpdate, onFinish, isPlaying }: Props) {
   const containerRef = useRef<HTMLDivElement>(null)
   const wsRef = useRef<WaveSurfer | null>(null)
   const [ready, setReady] = useState(false)
@@ -28,17 +30,30 @@ export function Waveform({ url, onReady, onTimeUpdate, onFinish, isPlaying }: Pr
       barRadius: 1,
       height: 48,
       normalize: true,
-      backend: 'WebAudio',
+      // With precomputed peaks the audio streams instead of being decoded up front
+      backend: peaksUrl ? 'MediaElement' : 'WebAudio',
     })
 
-    ws.load(url)
+    let active = true
+    if (peaksUrl) {
+      fetchPeaks(peaksUrl, 1000)
+        .then((p) => {
+          if (!active) return
+          const channel = new Float32Array(p.max.length * 2)
+          p.max.forEach((hi, i) => { channel[2 * i] = hi; channel[2 * i + 1] = p.min[i] })
+          ws.load(url, [channel], p.duration)
+        })
+        .catch(() => { if (active) ws.load(url) })
+    } else {
+      ws.load(url)
+    }
     ws.on('ready', () => { setReady(true); onReady?.(ws.getDuration()) })
     ws.on('audioprocess', () => onTimeUpdate?.(ws.getCurrentTime()))
     ws.on('finish', () => onFinish?.())
 
     wsRef.current = ws
-    return () => { ws.destroy(); wsRef.current = null; setReady(false) }
-  }, [url])
+    return () => { active = false; ws.destroy(); wsRef.current = null; setReady(false) }
+  }, [url, peaksUrl])
 
   useEffect(() => {
     if (!wsRef.current || !ready) return
@@ -3,6 +3,7 @@ import type { HistoryEntry } from '../../types'
 import { truncateText, formatTimeAgo } from '../../utils/formatters'
 import { MODEL_INFO } from '../../utils/constants'
 import { useAudioPlayer } from '../../hooks/useAudioPlayer'
+import { PeaksWaveform } from '../audio/PeaksWaveform'
 
 interface Props {
   entry: HistoryEntry
@@ -10,7 +11,7 @@ interface Props {
 }
 
 export function HistoryCard({ entry, onDelete }: Props) {
-  const { play, toggle, isPlaying } = useAudioPlayer()
+  const { play, toggle, isPlaying, currentTime, duration } = useAudioPlayer()
 
   const handlePlay = () => {
     if (isPlaying) toggle()
@@ -29,6 +30,11 @@ export function HistoryCard({ entry, onDelete }: Props) {
       </button>
       <div className="flex-1 min-w-0">
         <p className="text-sm text-stone-700 leading-snug">{truncateText(entry.text, 80)}</p>
+        {entry.peaks_url && (
+          <div className="mt-1.5">
+            <PeaksWaveform peaksUrl={entry.peaks_url} progress={duration ? currentTime / duration : 0} />
+          </div>
+        )}
         <div className="flex items-center gap-1.5 mt-1 text-xs text-stone-400">
           <span>{MODEL_INFO[entry.model_variant]?.label}</span>
           <span>&middot;</span>
@@ -55,7 +55,7 @@ function VariantButton({ v }: { v: ModelVariant }) {
   const isSelected = selectedVariant === v
   const isLoaded = state.status === 'loaded'
   const isDownloading = state.status === 'downloading'
-  const isLoading = state.status === 'loading'
+  const isLoading = state.status === 'loading' || state.status === 'warming'
   const isBusy = isDownloading || isLoading
   const isDownloaded = state.status === 'downloaded'
   const needsDownload = state.status === 'not_downloaded'
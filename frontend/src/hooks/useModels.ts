@@ -12,8 +12,8 @@ export function useModels() {
       setModels(models)
       setDevice(device)
 
-      // Auto-select the loaded model
-      const loaded = models.find((m) => m.status === 'loaded')
+      // Auto-select the active model
+      const loaded = models.find((m) => m.active)
       if (loaded) {
         setSelectedVariant(loaded.variant as ModelVariant)
       }
@@ -16,6 +16,7 @@ export function useWebSocket() {
         updateModelState(variant, {
           status: status as any,
           ...(msg.error ? { error: msg.error as string } : { error: null }),
+          ...(typeof msg.active === 'boolean' ? { active: msg.active } : {}),
         })
         // Auto-select variant when it finishes loading
         if (status === 'loaded') {
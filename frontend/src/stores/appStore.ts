@@ -53,6 +53,8 @@ const defaultModelState = (variant: ModelVariant): ModelState => ({
   status: 'not_downloaded',
   error: null,
   download_progress: 0,
+  active: false,
+  in_flight: 0,
 })
 
 export const useAppStore = create<AppState>((set) => ({
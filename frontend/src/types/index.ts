@@ -5,15 +5,21 @@ export type ModelStatus =
   | 'downloading'
   | 'downloaded'
   | 'loading'
+  | 'warming'
   | 'loaded'
+  | 'draining'
   | 'unloading'
   | 'error'
 
 export interface ModelState {
   variant: ModelVariant
+  backend: 'mlx' | 'cpu' | null
   status: ModelStatus
   error: string | null
   download_progress: number
+  active: boolean
+  in_flight: number
+  idle_seconds: number | null
 }
 
 export interface DeviceInfo {
@@ -25,8 +31,10 @@ export interface DeviceInfo {
 export interface GenerateResponse {
   id: string
   audio_url: string
+  peaks_url: string | null
   text: string
   model_variant: ModelVariant
+  requested_variant?: string | null
   language: string | null
   duration_seconds: number
   generation_time_seconds: number
@@ -37,15 +45,25 @@ export interface HistoryEntry {
   id: string
   text: string
   model_variant: ModelVariant
+  requested_variant?: string | null
   language: string | null
   exaggeration: number | null
   cfg_weight: number | null
   duration_seconds: number
   generation_time_seconds: number
   audio_url: string
+  peaks_url: string | null
   created_at: string
 }
 
+export interface WaveformPeaks {
+  sampleRate: number
+  duration: number
+  samplesPerPeak: number
+  min: Float32Array
+  max: Float32Array
+}
+
 export interface HistoryListResponse {
   items: HistoryEntry[]
   total: number
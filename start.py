@@ -2,12 +2,17 @@
 """Loqui TTS - Single-command launcher.
 
 Usage: python start.py [--host HOST] [--port PORT]
+       python start.py --production [--model-workers VARIANT,...]
 """
 
 import argparse
+import importlib.util
 import os
+import secrets
+import signal
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent
@@ -54,12 +59,187 @@ def ensure_data_dirs():
     (DATA / "audio" / "references").mkdir(parents=True, exist_ok=True)
 
 
+def loop_and_parser() -> tuple[str, str]:
+    """uvloop / httptools when they are installed, else the pure-Python defaults."""
+    loop = "uvloop" if sys.platform != "win32" and importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
+def uvicorn_command(host: str, port: int, args) -> list[str]:
+    """uvicorn without reload or access log, tuned for serving."""
+    loop, http = loop_and_parser()
+    return [
+        sys.executable, "-m", "uvicorn",
+        "backend.main:app",
+        "--host", host,
+        "--port", str(port),
+        "--loop", loop,
+        "--http", http,
+        "--timeout-keep-alive", str(args.keep_alive),
+        "--backlog", str(args.backlog),
+        "--no-access-log",
+    ]
+
+
+def check_memory(model_variants: list[str]):
+    """Exit if the layout would push memory use past the eviction threshold."""
+    import psutil
+
+    from backend.config import (
+        FRONT_PROCESS_BYTES,
+        MEMORY_PRESSURE_PERCENT,
+        MODEL_PROCESS_OVERHEAD_BYTES,
+        MODEL_SIZES_BYTES,
+    )
+
+    gb = 1024 ** 3
+    needed = FRONT_PROCESS_BYTES + sum(
+        MODEL_SIZES_BYTES[v] + MODEL_PROCESS_OVERHEAD_BYTES for v in model_variants
+    )
+    mem = psutil.virtual_memory()
+    budget = mem.available - mem.total * (1 - MEMORY_PRESSURE_PERCENT / 100)
+    print(
+        f"💾 ~{needed / gb:.1f} GB needed, {max(budget, 0) / gb:.1f} GB free "
+        f"below the {MEMORY_PRESSURE_PERCENT:.0f}% memory pressure threshold"
+    )
+    if needed > budget:
+        print("❌ Not enough memory for this layout; use fewer or smaller model workers")
+        sys.exit(1)
+
+
+def supervise(procs: list[subprocess.Popen]):
+    """Wait until a process exits, then stop the others.
+
+    SIGINT / SIGTERM are forwarded to every process, which drain in-flight
+    generations before exiting; a second signal makes them exit right away.
+
+    Exits 0 after a requested stop. A process exiting on its own makes the
+    status non-zero (``128 + N`` if signal N killed it, like a shell), so
+    process managers see that the layout failed.
+    """
+    stopping = False
+
+    def forward(signum, frame=None):
+        for p in procs:
+            if p.poll() is None:
+                p.send_signal(signum)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        forward(signum)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while all(p.poll() is None for p in procs):
+        time.sleep(0.5)
+    exited = next(p for p in procs if p.poll() is not None)
+    forward(signal.SIGTERM)
+    for p in procs:
+        p.wait()
+
+    code = exited.returncode
+    status = 128 - code if code < 0 else code
+    if not stopping:
+        print(f"❌ A process exited unexpectedly (status {status})")
+        sys.exit(status or 1)
+    sys.exit(0 if code in (0, -signal.SIGINT, -signal.SIGTERM) else status)
+
+
+def serve_production(args):
+    """Run the production layout from inside the virtual environment.
+
+    With ``--model-workers`` each listed variant gets its own process on
+    ``port + 1``, ``port + 2``, ... (loopback only, data in
+    ``data/worker-<port>``) that loads it at startup and keeps it resident.
+    The process on ``port`` serves the API and UI, never loads weights, and
+    routes generations to the model workers. Without model workers it
+    serves everything itself.
+
+    There is one API process: jobs, WebSocket subscribers, render locks
+    and rate limits live in its memory.
+    """
+    import asyncio
+
+    from backend.config import DATA_DIR
+    from backend.db.database import init_db
+
+    model_variants = args.model_workers.split(",") if args.model_workers else []
+    check_memory(model_variants)
+    runtime = " / ".join(loop_and_parser())
+    # Create / migrate the database once, not concurrently from every process
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    asyncio.run(init_db())
+
+    if not model_variants:
+        print(f"\n🚀 Starting Loqui on http://{args.host}:{args.port} ({runtime})\n")
+        os.execv(sys.executable, uvicorn_command(args.host, args.port, args))
+
+    local = "127.0.0.1" if args.host in ("0.0.0.0", "::") else args.host
+    # Authenticates the model workers to the API process
+    os.environ.setdefault("LOQUI_CLUSTER_TOKEN", secrets.token_urlsafe(32))
+    cores = os.cpu_count() or 1
+    procs = []
+    worker_urls = []
+    for i, variant in enumerate(model_variants):
+        port = args.port + 1 + i
+        url = f"http://127.0.0.1:{port}"
+        worker_urls.append(url)
+        env = {
+            **os.environ,
+            "LOQUI_ROLE": "worker",
+            "LOQUI_WORKER_URL": url,
+            "LOQUI_COORDINATOR_URL": f"http://{local}:{args.port}",
+            "LOQUI_PRELOAD_VARIANT": variant,
+            "LOQUI_MODEL_IDLE_UNLOAD_SECONDS": "0",
+            "LOQUI_DATA_DIR": str(DATA_DIR / f"worker-{port}"),
+        }
+        # Split the cores between CPU-backend workers instead of oversubscribing
+        env.setdefault("LOQUI_CPU_THREADS", str(max(1, cores // len(model_variants))))
+        print(f"🧠 Model worker {url} → {variant}")
+        procs.append(subprocess.Popen(
+            uvicorn_command("127.0.0.1", port, args), env=env, start_new_session=True,
+        ))
+
+    env = {
+        **os.environ,
+        "LOQUI_ROLE": "coordinator",
+        "LOQUI_HOST_MODELS": "0",
+        "LOQUI_CLUSTER_WORKERS": ",".join(worker_urls),
+    }
+    print(f"\n🚀 Starting Loqui on http://{args.host}:{args.port} ({runtime})\n")
+    procs.append(subprocess.Popen(
+        uvicorn_command(args.host, args.port, args), env=env, start_new_session=True,
+    ))
+    supervise(procs)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Loqui TTS Launcher")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
+    parser.add_argument("--production", action="store_true", help="No reload; uvloop / httptools when available")
+    parser.add_argument(
+        "--model-workers", default="",
+        help="Comma-separated variants, one model-hosting process each (--production)",
+    )
+    parser.add_argument("--keep-alive", type=int, default=75, help="Keep-alive timeout in seconds (--production)")
+    parser.add_argument("--backlog", type=int, default=2048, help="Pending connection backlog (--production)")
     args = parser.parse_args()
 
+    if args.production:
+        sys.path.insert(0, str(ROOT))
+        from backend.config import MODEL_VARIANTS
+
+        unknown = [v for v in args.model_workers.split(",") if v and v not in MODEL_VARIANTS]
+        if unknown:
+            parser.error(f"unknown variants for --model-workers: {', '.join(unknown)}")
+
+    # Re-executed inside the venv by a previous launch (production mode)
+    if os.environ.get("LOQUI_LAUNCHER") == "venv":
+        return serve_production(args)
+
     print("\n🗣️  Loqui TTS - Made with ♥️ by Rumi\n")
 
     ensure_venv()
@@ -68,6 +248,11 @@ def main():
 
     python = venv_python()
 
+    if args.production:
+        # Supervise from the venv, where psutil and the backend config import
+        os.environ["LOQUI_LAUNCHER"] = "venv"
+        os.execv(python, [python, str(Path(__file__).resolve()), *sys.argv[1:]])
+
     print(f"\n🚀 Starting Loqui on http://{args.host}:{args.port}\n")
 
     os.execv(
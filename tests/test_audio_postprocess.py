@@ -0,0 +1,31 @@
+"""Post-processing of generated audio."""
+
+import numpy as np
+
+from backend.services.audio_postprocess import PostProcessConfig, PostProcessor, trim_silence
+
+SR = 24000
+
+
+def tone(seconds: float, amplitude: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR), dtype=np.float32) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_trim_silence_removes_leading_and_trailing_silence():
+    silence = np.zeros(SR, dtype=np.float32)
+    x = np.concatenate([silence, tone(1.0, 0.5), silence])
+    trimmed = trim_silence(x, SR, pad_ms=0)
+    assert abs(len(trimmed) - SR) <= SR // 100
+
+
+def test_trim_silence_keeps_a_clip_with_nothing_above_the_threshold():
+    quiet = tone(1.0, 1e-4)  # about -83 dBFS
+    assert len(trim_silence(quiet, SR, threshold_db=-50.0)) == len(quiet)
+
+
+def test_stream_passes_a_quiet_generation_through():
+    post = PostProcessor(PostProcessConfig(trim_silence=True, trim_threshold_db=-50.0), SR)
+    chunks = [tone(0.5, 1e-4), tone(0.5, 1e-4)]
+    out = np.concatenate(list(post.stream(chunks)))
+    assert len(out) == SR